@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+对齐锁验证基准：
+
+- batch：逐项目启动进程 verify vs 单进程 --roots-from 批量验证（冷缓存 / 热缓存），并校验结果一致
+- large：大文件（默认 100MB 的 STATE.md）上 set / verify / check / clear 的耗时、峰值内存与写入字节，
+         对比旧实现（整文件读入 + splitlines + 整文件重写），并校验哈希与结果文件一致
+- watch：每次查询启动 verify 进程 vs 读取 watch 守护进程的状态文件；inotify / 轮询两种后端下
+         从文件变更到状态文件更新的延迟
+
+用法：python benchmarks/alignment_lock_bench.py --projects 2000 [--only large --size-mb 100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "alignment_lock.py"
+sys.path.insert(0, str(SCRIPT.parent))
+
+from alignment_lock import (  # noqa: E402
+    LOCK_KEYS,
+    AlignmentLock,
+    atomic_write_text,
+    clear_lock,
+    inspect_file,
+    parse_lock,
+    read_lock,
+    remove_lock_lines,
+    write_lock,
+)
+
+LOCK = AlignmentLock(is_locked=True, done_at="2026-10-01", scope="大文件基准")
+
+
+def build_projects(base: Path, projects: int) -> List[Path]:
+    """生成若干项目：docs/PRD.md + docs/STATE.md，约 5% 锁后内容被修改、5% 无锁。"""
+    roots = []
+    body = "".join(f"- 需求条目 {i}：字段、分页、输出格式说明\n" for i in range(200))
+    for i in range(projects):
+        root = base / f"project_{i:05d}"
+        docs = root / "docs"
+        docs.mkdir(parents=True)
+        for name in ("PRD.md", "STATE.md"):
+            path = docs / name
+            path.write_text(f"# {name} {i}\n\n{body}", encoding="utf-8")
+            if i % 20 != 1:
+                write_lock(path, AlignmentLock(is_locked=True, done_at=date.today().isoformat()))
+            if i % 20 == 2:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("锁后追加的改动\n")
+        roots.append(root)
+
+    # mtime 回拨到缓存的 racy 窗口之外
+    past = time.time() - 60
+    for root in roots:
+        for path in (root / "docs").iterdir():
+            os.utime(path, (past, past))
+    return roots
+
+
+def run(*args: str) -> Tuple[float, int, str]:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(SCRIPT), *args], capture_output=True, text=True, encoding="utf-8")
+    return time.perf_counter() - started, proc.returncode, proc.stdout
+
+
+def bench_batch(base: Path, roots: List[Path], sample: int) -> None:
+    """逐项目进程 vs 批量模式。"""
+    per_process: Dict[str, bool] = {}
+    started = time.perf_counter()
+    for root in roots[:sample]:
+        _seconds, code, _out = run("--root", str(root), "verify", "--target", "both")
+        per_process[str(root.resolve())] = code == 0
+    per_seconds = (time.perf_counter() - started) / sample * len(roots)
+    print(f"  逐项目进程    : {per_seconds:.2f}s（按 {sample} 个项目外推）")
+
+    roots_file = base / "roots.txt"
+    roots_file.write_text("\n".join(str(root) for root in roots) + "\n", encoding="utf-8")
+    cache_file = base / "lock_cache.json"
+    outputs = []
+    for label in ("批量（冷缓存）", "批量（热缓存）"):
+        seconds, _code, out = run(
+            "verify", "--target", "both", "--roots-from", str(roots_file), "--hash-cache", str(cache_file),
+        )
+        records = [json.loads(line) for line in out.splitlines()]
+        summary = records[-1]
+        print(f"  {label}: {seconds:.2f}s，命中缓存 {summary['cache_hits']}/{summary['files']}")
+        outputs.append(records[:-1])
+
+    batch: Dict[str, bool] = {}
+    for record in outputs[0]:
+        batch[record["root"]] = batch.get(record["root"], True) and record["valid"]
+    strip = [{k: v for k, v in r.items() if k != "cached"} for r in outputs[0]]
+    if any(batch[root] != valid for root, valid in per_process.items()) or strip != [
+        {k: v for k, v in r.items() if k != "cached"} for r in outputs[1]
+    ]:
+        raise SystemExit("❌ 批量验证结果与逐项目验证不一致")
+    invalid = sum(1 for valid in batch.values() if not valid)
+    print(f"  结果一致：{len(batch)} 个项目中 {invalid} 个锁无效")
+
+
+def legacy_hash(content: str) -> str:
+    """旧实现的内容哈希：整文件 splitlines 后拼接。"""
+    lines = [line for line in content.splitlines() if not any(line.startswith(key) for key in LOCK_KEYS)]
+    return hashlib.md5("\n".join(lines).strip().encode("utf-8")).hexdigest()[:8]
+
+
+def legacy_set(path: Path) -> str:
+    content = remove_lock_lines(path.read_text(encoding="utf-8")).rstrip()
+    content_hash = legacy_hash(content)
+    lock = AlignmentLock(**{**vars(LOCK), "content_hash": content_hash})
+    atomic_write_text(path, content + "\n\n" + lock.to_block() + "\n")
+    return content_hash
+
+
+def legacy_verify(path: Path) -> str:
+    content = path.read_text(encoding="utf-8")
+    parse_lock(content)
+    return legacy_hash(content)
+
+
+def legacy_check(path: Path) -> str:
+    return str(parse_lock(path.read_text(encoding="utf-8")).is_locked)
+
+
+def legacy_clear(path: Path) -> str:
+    atomic_write_text(path, remove_lock_lines(path.read_text(encoding="utf-8")).rstrip() + "\n")
+    return ""
+
+
+def stream_set(path: Path) -> str:
+    lock = AlignmentLock(**vars(LOCK))
+    write_lock(path, lock)
+    return lock.content_hash or ""
+
+
+LARGE_OPS: Dict[str, Dict[str, Callable[[Path], str]]] = {
+    "旧实现": {
+        "set": legacy_set,
+        "verify": legacy_verify,
+        "check": legacy_check,
+        "clear": legacy_clear,
+    },
+    "流式": {
+        "set": stream_set,
+        "verify": lambda path: inspect_file(path)[1],
+        "check": lambda path: str(read_lock(path).is_locked),
+        "clear": lambda path: str(clear_lock(path) and ""),
+    },
+}
+
+
+def written_bytes() -> Optional[int]:
+    """当前进程累计写入字节（Linux /proc/self/io），其他平台返回 None。"""
+    try:
+        with open("/proc/self/io", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure_op(mode: str, op: str, path: str, queue) -> None:
+    """子进程：执行单个操作，回报耗时、进程峰值 RSS（MB，含解释器本身）与写入字节。"""
+    import resource
+
+    base_written = written_bytes()
+    started = time.perf_counter()
+    result = LARGE_OPS[mode][op](Path(path))
+    seconds = time.perf_counter() - started
+    after_written = written_bytes()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({
+        "result": result,
+        "seconds": seconds,
+        # Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+        "rss_mb": peak / (1024 * 1024 if sys.platform == "darwin" else 1024),
+        "written": None if base_written is None else after_written - base_written,
+    })
+
+
+def build_large_file(path: Path, size_mb: int) -> None:
+    """生成约 size_mb 的 STATE.md：运行日志正文 + 末尾锁块。"""
+    line = "- 2026-10-01T12:00:00 run=%07d 抓取 /api/items?page=%d 状态 200 耗时 123ms 新增 20 条\n"
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("# STATE\n\n")
+        i = 0
+        while written < target:
+            chunk = "".join(line % (i + j, (i + j) % 500) for j in range(10000))
+            f.write(chunk)
+            written += len(chunk.encode("utf-8"))
+            i += 10000
+    write_lock(path, AlignmentLock(is_locked=True, done_at="2026-09-01"))
+
+
+def format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "n/a"
+    return f"{value / 1e6:.1f}MB" if value >= 1e6 else f"{value}B"
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bench_large(base: Path, size_mb: int) -> None:
+    """旧实现 vs 流式实现：每个操作在独立子进程中执行，以测得各自的峰值内存。"""
+    fixture = base / "fixture.md"
+    build_large_file(fixture, size_mb)
+    print(f"  文件：{fixture.stat().st_size / 1e6:.1f}MB")
+
+    ctx = multiprocessing.get_context("spawn")
+    results: Dict[str, Dict[str, dict]] = {}
+    digests: Dict[str, Dict[str, str]] = {}
+    for mode in LARGE_OPS:
+        path = base / f"{mode}.md"
+        shutil.copyfile(fixture, path)
+        results[mode] = {}
+        digests[mode] = {}
+        for op in ("set", "verify", "check", "clear"):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=measure_op, args=(mode, op, str(path), queue))
+            proc.start()
+            results[mode][op] = queue.get()
+            proc.join()
+            digests[mode][op] = file_digest(path)
+        path.unlink()
+
+    for op in ("set", "verify", "check", "clear"):
+        for mode in LARGE_OPS:
+            r = results[mode][op]
+            print(f"  {op:<6} {mode:<4}：{r['seconds']:.2f}s，峰值 RSS {r['rss_mb']:.0f}MB，"
+                  f"写入 {format_bytes(r['written'])}")
+
+    legacy, stream = results["旧实现"], results["流式"]
+    if legacy["set"]["result"] != stream["set"]["result"] or legacy["verify"]["result"] != stream["verify"]["result"]:
+        raise SystemExit("❌ 流式哈希与旧实现不一致")
+    if legacy["set"]["result"] != legacy["verify"]["result"]:
+        raise SystemExit("❌ set 写入的哈希与 verify 计算的不一致")
+    if digests["旧实现"] != digests["流式"]:
+        raise SystemExit("❌ 原地改写后的文件与旧实现整文件重写的结果不一致")
+    print(f"  哈希一致（{stream['set']['result']}），各步骤结果文件逐字节一致")
+
+
+def read_status(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None  # 尚未写入
+
+
+def wait_status(path: Path, predicate: Callable[[dict], bool], timeout: float = 10.0) -> float:
+    """轮询状态文件直到满足条件，返回耗时。"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        status = read_status(path)
+        if status is not None and predicate(status):
+            return time.perf_counter() - started
+        time.sleep(0.002)
+    raise SystemExit(f"❌ {timeout:.0f}s 内状态文件未更新：{path}")
+
+
+def bench_watch(base: Path, size_mb: int, rounds: int) -> None:
+    """查询成本与变更传播延迟。"""
+    root = base / "watch"
+    docs = root / "docs"
+    docs.mkdir(parents=True)
+    (docs / "PRD.md").write_text("# PRD\n\n正文\n", encoding="utf-8")
+    write_lock(docs / "PRD.md", AlignmentLock(**vars(LOCK)))
+    state = docs / "STATE.md"
+    build_large_file(state, size_mb)
+    write_lock(state, AlignmentLock(**vars(LOCK)))
+    print(f"  STATE.md {state.stat().st_size / 1e6:.1f}MB")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        run("--root", str(root), "verify", "--target", "both")
+    print(f"  查询：verify 进程 {(time.perf_counter() - started) / rounds * 1000:.1f}ms/次")
+
+    status_path = docs / ".alignment_status.json"
+    for backend in ("inotify", "poll"):
+        status_path.unlink(missing_ok=True)
+        daemon = subprocess.Popen(
+            [sys.executable, str(SCRIPT), "--root", str(root), "watch", "--backend", backend, "--interval", "0.5"],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_status(status_path, lambda status: status["valid"])
+            if backend == "inotify":
+                started = time.perf_counter()
+                for _ in range(1000):
+                    read_status(status_path)
+                print(f"  查询：读取状态文件 {(time.perf_counter() - started):.3f}ms/次")
+
+            latencies = []
+            for i in range(rounds):
+                with open(state, "a", encoding="utf-8") as f:
+                    f.write(f"- 追加日志 {backend} {i}\n")
+                latencies.append(wait_status(status_path, lambda status: not status["files"][1]["valid"]))
+                write_lock(state, AlignmentLock(**vars(LOCK)))
+                latencies.append(wait_status(status_path, lambda status: status["valid"]))
+        finally:
+            daemon.terminate()
+            daemon.wait()
+        if read_status(status_path)["running"]:
+            raise SystemExit("❌ 守护进程退出后状态文件仍为 running")
+        latencies.sort()
+        print(
+            f"  变更 → 状态更新（{backend}）：p50 {latencies[len(latencies) // 2] * 1000:.0f}ms，"
+            f"max {latencies[-1] * 1000:.0f}ms（{len(latencies)} 次，含重新哈希）"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对齐锁验证基准")
+    parser.add_argument("--projects", type=int, default=2000, help="项目数")
+    parser.add_argument("--sample", type=int, default=50, help="逐项目进程模式实际运行的项目数")
+    parser.add_argument("--size-mb", type=int, default=100, help="large 基准的文件大小（MB）")
+    parser.add_argument("--watch-size-mb", type=int, default=20, help="watch 基准中 STATE.md 的大小（MB）")
+    parser.add_argument("--rounds", type=int, default=5, help="watch 基准的重复次数")
+    parser.add_argument("--only", choices=["batch", "large", "watch"], help="只运行指定基准")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pc-lock-bench-") as tmp_dir:
+        base = Path(tmp_dir)
+        if args.only in (None, "batch"):
+            roots = build_projects(base / "projects", args.projects)
+            print(f"📦 {args.projects} 个项目（PRD.md + STATE.md）")
+            print("\n[batch] 批量验证")
+            bench_batch(base, roots, min(args.sample, args.projects))
+        if args.only in (None, "large"):
+            print(f"\n[large] {args.size_mb}MB 文件")
+            bench_large(base, args.size_mb)
+        if args.only in (None, "watch"):
+            print("\n[watch] 常驻监听")
+            bench_watch(base, args.watch_size_mb, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+对齐锁并发压测：多进程同时 set / clear / 追加正文，校验无丢失更新并统计锁竞争延迟。
+
+- locked：当前实现（咨询锁 + 唯一临时文件）
+- legacy：旧实现（无锁读改写 + 固定 .tmp 临时文件），作为对照
+
+用法：python benchmarks/alignment_lock_stress.py --workers 16 --iterations 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from alignment_lock import (  # noqa: E402
+    LOCK_KEYS,
+    AlignmentLock,
+    atomic_write_text,
+    clear_lock,
+    file_lock,
+    remove_lock_lines,
+    write_lock,
+)
+
+OPS = ("set", "clear", "append")
+
+
+def is_lock_line(line: str) -> bool:
+    stripped = line.strip()
+    return any(stripped.startswith(key) for key in LOCK_KEYS) or stripped in (
+        "ALREADY_ALIGNED_DO_NOT_REALIGN", "===ALIGNMENT_LOCKED===",
+    )
+
+
+def append_record(content: str, record: str) -> str:
+    """在正文末尾追加一行，锁块（如有）保持在文件末尾。"""
+    lines = content.splitlines()
+    body = "\n".join(line for line in lines if not is_lock_line(line)).rstrip()
+    block = [line for line in lines if is_lock_line(line)]
+    new_content = body + "\n" + record + "\n"
+    if block:
+        new_content += "\n" + "\n".join(block) + "\n"
+    return new_content
+
+
+def legacy_write(path: Path, content: str) -> None:
+    """旧实现的写入方式：固定临时文件名，无锁。"""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(content, encoding="utf-8")
+    tmp.replace(path)
+
+
+def run_op(mode: str, op: str, path: Path, tag: str) -> None:
+    if mode == "locked":
+        if op == "set":
+            write_lock(path, AlignmentLock(is_locked=True, scope=tag), create=True, timeout=30)
+        elif op == "clear":
+            clear_lock(path, timeout=30)
+        else:
+            with file_lock(path, timeout=30):
+                atomic_write_text(path, append_record(path.read_text(encoding="utf-8"), tag))
+        return
+
+    content = path.read_text(encoding="utf-8")
+    if op == "set":
+        body = remove_lock_lines(content).rstrip()
+        legacy_write(path, body + "\n\n" + AlignmentLock(is_locked=True, scope=tag).to_block() + "\n")
+    elif op == "clear":
+        legacy_write(path, remove_lock_lines(content).rstrip() + "\n")
+    else:
+        legacy_write(path, append_record(content, tag))
+
+
+def worker(args: Tuple[str, str, int, int]) -> Dict[str, object]:
+    """子进程：按轮次执行 set / clear / append，返回各操作耗时、成功追加的记录与异常数。"""
+    mode, path_str, index, iterations = args
+    path = Path(path_str)
+    latencies: Dict[str, List[float]] = {op: [] for op in OPS}
+    appended = []
+    errors = 0
+    for j in range(iterations):
+        op = OPS[(index + j) % len(OPS)]
+        tag = f"- 记录 w{index}-{j}"
+        started = time.perf_counter()
+        try:
+            run_op(mode, op, path, tag)
+        except OSError:
+            errors += 1  # 旧实现：临时文件被其他进程抢先替换
+            continue
+        latencies[op].append(time.perf_counter() - started)
+        if op == "append":
+            appended.append(tag)
+    return {"latencies": latencies, "appended": appended, "errors": errors}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_mode(mode: str, workers: int, iterations: int) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix="pc-lock-stress-") as tmp_dir:
+        path = Path(tmp_dir) / "docs" / "PRD.md"
+        path.parent.mkdir(parents=True)
+        path.write_text("# PRD\n\n正文\n", encoding="utf-8")
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(worker, [(mode, str(path), i, iterations) for i in range(workers)])
+        wall = time.perf_counter() - started
+
+        content = path.read_text(encoding="utf-8")
+        present = set(line for line in content.splitlines() if line.startswith("- 记录 "))
+        appended = [tag for r in results for tag in r["appended"]]
+        lost = sum(1 for tag in appended if tag not in present)
+        duplicated_keys = [
+            key for key in LOCK_KEYS if sum(line.startswith(key) for line in content.splitlines()) > 1
+        ]
+        leftovers = [p.name for p in path.parent.iterdir() if p.name.endswith(".tmp")]
+
+    latencies: Dict[str, List[float]] = {op: [] for op in OPS}
+    for r in results:
+        for op in OPS:
+            latencies[op].extend(r["latencies"][op])
+    return {
+        "wall": wall,
+        "ops": sum(len(v) for v in latencies.values()),
+        "errors": sum(r["errors"] for r in results),
+        "appended": len(appended),
+        "lost": lost,
+        "duplicated_keys": duplicated_keys,
+        "leftovers": leftovers,
+        "latencies": latencies,
+    }
+
+
+def report(mode: str, result: Dict[str, object]) -> None:
+    print(f"\n[{mode}] {result['ops']} 次操作，{result['wall']:.2f}s，异常 {result['errors']} 次")
+    print(f"  追加 {result['appended']} 条，丢失 {result['lost']} 条；"
+          f"重复锁行 {result['duplicated_keys'] or '无'}；残留临时文件 {len(result['leftovers'])} 个")
+    for op, values in result["latencies"].items():
+        print(
+            f"  {op:<6}: p50 {percentile(values, 0.5) * 1000:.1f}ms，"
+            f"p95 {percentile(values, 0.95) * 1000:.1f}ms，"
+            f"max {max(values, default=0) * 1000:.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="对齐锁并发压测")
+    parser.add_argument("--workers", type=int, default=16, help="并发进程数")
+    parser.add_argument("--iterations", type=int, default=60, help="每个进程的操作次数")
+    parser.add_argument("--mode", choices=["locked", "legacy", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["legacy", "locked"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        result = run_mode(mode, args.workers, args.iterations)
+        report(mode, result)
+        if mode == "locked" and (
+            result["lost"] or result["errors"] or result["duplicated_keys"] or result["leftovers"]
+        ):
+            raise SystemExit("❌ 加锁实现出现丢失更新或文件损坏")
+    print("\n✅ 加锁实现无丢失更新")
+
+
+if __name__ == "__main__":
+    main()
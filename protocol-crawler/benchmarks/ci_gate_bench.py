@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+ci_gate 基准（合成项目树）：
+
+- io   ：旧读取模式（每个检查项各自打开文件）vs 单次读取分析，对比打开次数、读取字节与系统调用
+- jobs ：串行 vs --jobs 并行，并校验两者输出与退出码完全一致
+- cache：--no-cache 全量 vs 冷缓存 vs 热缓存，并校验输出一致、修改单文件后只重查该文件
+- jsonl：text vs --format jsonl 耗时，校验记录数与汇总计数，并打印最慢的检查项
+- git  ：全量 vs --staged / --changed-since（临时 git 仓库），并校验只检查变更文件、项目级检查仍执行
+
+用法：python benchmarks/ci_gate_bench.py --files 10000 --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+CI_GATE = Path(__file__).resolve().parent.parent / "scripts" / "ci_gate.py"
+sys.path.insert(0, str(CI_GATE.parent))
+
+import ci_gate  # noqa: E402
+
+
+def python_source(rng: random.Random, funcs: int, body: int) -> str:
+    """生成含若干函数的 Python 源码。"""
+    parts = ['"""合成模块"""\n\n']
+    for i in range(funcs):
+        parts.append(f"def func_{i}(x):\n")
+        parts.append(f'    """函数 {i}"""\n')
+        for j in range(body):
+            parts.append(f"    x = x + {rng.randint(0, 9)}  # 步骤 {j}\n")
+        parts.append("    return x\n\n\n")
+    return "".join(parts)
+
+
+def js_source(rng: random.Random, funcs: int, body: int) -> str:
+    """生成含若干函数的 JS 源码。"""
+    parts = []
+    for i in range(funcs):
+        parts.append(f"function fn{i}(a) {{\n")
+        for j in range(body):
+            parts.append(f"  a = a + {rng.randint(0, 9)}; // 步骤 {j}\n")
+        parts.append("  return a;\n}\n\n")
+    return "".join(parts)
+
+
+def build_tree(root: Path, files: int, seed: int = 7) -> None:
+    """生成合成项目树：约 1% 文件含超限/编码/命名问题。"""
+    rng = random.Random(seed)
+    (root / ".gitignore").write_text("debug/\ntmp/\n.env\n", encoding="utf-8")
+    for i in range(files):
+        folder = root / "src" / f"pkg_{i % 50:02d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        roll = rng.random()
+        if roll < 0.6:
+            path = folder / f"mod_{i}.py"
+            content = python_source(rng, funcs=rng.randint(1, 8), body=rng.randint(3, 30))
+        else:
+            path = folder / f"mod_{i}.js"
+            content = js_source(rng, funcs=rng.randint(1, 8), body=rng.randint(3, 30))
+
+        if i % 100 == 1:
+            path = folder / f"long_{i}.py"
+            content = python_source(rng, funcs=1, body=260)
+        elif i % 100 == 2:
+            path = folder / f"big_{i}.js"
+            content = js_source(rng, funcs=40, body=30)
+        elif i % 100 == 3:
+            path = folder / f"mod_{i}_old.py"
+
+        if i % 100 == 4:
+            path.write_bytes(content.encode("gbk", errors="replace") + "中文".encode("gbk"))
+        else:
+            path.write_text(content, encoding="utf-8")
+
+    # mtime 回拨到缓存的 racy 窗口之外，模拟已存在一段时间的项目
+    past = time.time() - 60
+    for path in root.rglob("*"):
+        os.utime(path, (past, past))
+
+
+def run_gate(root: Path, *extra: str) -> Tuple[float, int, str]:
+    """运行一次 ci_gate，返回 (耗时, 退出码, 标准输出)。"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(CI_GATE), str(root), *extra],
+        capture_output=True, text=True, encoding="utf-8",
+    )
+    return time.perf_counter() - started, proc.returncode, proc.stdout
+
+
+def proc_io() -> Dict[str, int]:
+    """读取 /proc/self/io 计数（仅 Linux，其他平台返回空）。"""
+    try:
+        text = Path("/proc/self/io").read_text(encoding="ascii")
+    except OSError:
+        return {}
+    return {key: int(value) for key, value in (line.split(": ") for line in text.splitlines())}
+
+
+def legacy_read_pattern(filepath: Path) -> int:
+    """复现旧版 ci_gate 的读取方式：行数、编码、函数扫描各自打开一次文件。返回打开次数。"""
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        sum(1 for _ in f)
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            f.read(4096)
+    except UnicodeDecodeError:
+        pass
+    if filepath.suffix == ".py":
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            f.readlines()
+        return 3
+    return 2
+
+
+def measure(label: str, func, files: List[Path]) -> None:
+    """执行一轮并打印耗时、打开次数与 /proc/self/io 增量。"""
+    before = proc_io()
+    started = time.perf_counter()
+    opens = sum(func(path) for path in files)
+    seconds = time.perf_counter() - started
+    after = proc_io()
+    io_text = ""
+    if before:
+        io_text = (
+            f"，读取 {(after['rchar'] - before['rchar']) / 1e6:.1f}MB"
+            f"，read 调用 {after['syscr'] - before['syscr']}"
+        )
+    print(f"  {label}: {seconds:.2f}s，打开 {opens} 次{io_text}")
+
+
+def bench_io(root: Path) -> None:
+    """旧读取模式 vs 单次读取分析。"""
+    files = list(ci_gate.iter_candidate_files(root, all_text_files=False))
+
+    def single_pass(path: Path) -> int:
+        ci_gate.analyze_file(path, keep_lines=path.suffix == ".py")
+        return 1
+
+    measure("旧读取模式  ", legacy_read_pattern, files)
+    measure("单次读取分析", single_pass, files)
+
+
+def bench_jobs(root: Path, jobs: List[int]) -> None:
+    """串行 vs 并行：耗时对比 + 输出一致性校验。"""
+    base_seconds, base_code, base_out = run_gate(root, "--no-cache")
+    print(f"  串行        : {base_seconds:.2f}s（退出码 {base_code}）")
+    for n in jobs:
+        seconds, code, out = run_gate(root, "--no-cache", "--jobs", str(n))
+        same = code == base_code and out == base_out
+        print(f"  --jobs {n:<5}: {seconds:.2f}s，输出{'一致' if same else '不一致'}")
+        if not same:
+            raise SystemExit(f"❌ --jobs {n} 输出与串行模式不一致")
+
+
+def bench_cache(root: Path) -> None:
+    """全量 vs 冷缓存 vs 热缓存，并校验缓存失效。"""
+    full_seconds, full_code, full_out = run_gate(root, "--no-cache")
+    cold_seconds, cold_code, cold_out = run_gate(root)
+    warm_seconds, warm_code, warm_out = run_gate(root)
+    print(f"  --no-cache  : {full_seconds:.2f}s")
+    print(f"  冷缓存      : {cold_seconds:.2f}s")
+    print(f"  热缓存      : {warm_seconds:.2f}s")
+    if not (full_code == cold_code == warm_code and full_out == cold_out == warm_out):
+        raise SystemExit("❌ 缓存模式输出与全量模式不一致")
+
+    # 修改一个文件使其超限：热缓存必须重查并报告该文件
+    target = next((root / "src" / "pkg_00").glob("mod_*.py"))
+    target.write_text("x = 1\n" * 1200, encoding="utf-8")
+    past = time.time() - 60
+    os.utime(target, (past, past))
+    _seconds, _code, out = run_gate(root)
+    if "1200 行" not in out:
+        raise SystemExit("❌ 文件修改后缓存未失效")
+    print("  修改单文件后缓存正确失效")
+
+
+def bench_jsonl(root: Path) -> None:
+    """text vs jsonl：计时开销 + 记录完整性。"""
+    text_seconds, text_code, text_out = run_gate(root, "--no-cache")
+    jsonl_seconds, jsonl_code, jsonl_out = run_gate(root, "--no-cache", "--format", "jsonl")
+    records = [json.loads(line) for line in jsonl_out.splitlines()]
+    summary = records[-1]
+    files = [r for r in records[:-1] if r["type"] == "file"]
+    print(f"  text  : {text_seconds:.2f}s")
+    print(f"  jsonl : {jsonl_seconds:.2f}s，{len(files)} 条文件记录，{summary['files_per_second']} 文件/秒")
+    scanned = sum(1 for r in files if r["status"] != "binary")
+    if (
+        summary["type"] != "summary" or jsonl_code != text_code or summary["exit_code"] != text_code
+        or scanned != summary["scanned"] or f"扫描文件：{scanned}" not in text_out
+        or f"❌ 失败：{summary['failed']}" not in text_out
+    ):
+        raise SystemExit("❌ jsonl 记录与 text 输出不一致")
+    for check in summary["slowest_checks"][:3]:
+        print(f"    {check['check']:<15}: {check['seconds']:.3f}s / {check['calls']} 次")
+
+
+def git(root: Path, *args: str) -> None:
+    """在临时仓库中执行 git 命令。"""
+    subprocess.run(
+        # gc.auto=0：大量松散对象会触发后台 gc，与临时目录清理冲突
+        ["git", "-C", str(root), "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+         "-c", "gc.auto=0", *args],
+        check=True, capture_output=True,
+    )
+
+
+def bench_git(root: Path) -> None:
+    """全量 vs git 变更范围：耗时对比 + 检查范围校验。"""
+    git(root, "init", "-q")
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", "init")
+    full_seconds, _code, _out = run_gate(root, "--no-cache")
+
+    # 一个超限文件进暂存区，一个未跟踪的禁用后缀文件只在工作区
+    staged = root / "src" / "pkg_01" / "staged_change.py"
+    staged.write_text("x = 1\n" * 1200, encoding="utf-8")
+    git(root, "add", str(staged))
+    (root / "src" / "pkg_02" / "helper_old.py").write_text("x = 1\n", encoding="utf-8")
+    (root / "debug").mkdir()  # 项目级检查：debug/ 已在 .gitignore 中，不应报错
+
+    staged_seconds, code, out = run_gate(root, "--no-cache", "--staged")
+    print(f"  全量            : {full_seconds:.3f}s")
+    print(f"  --staged        : {staged_seconds:.3f}s")
+    if code != 1 or "staged_change.py" not in out or "helper_old.py" in out or "扫描文件：1" not in out:
+        raise SystemExit("❌ --staged 检查范围不正确")
+
+    # 暂存后工作区又改短：--staged 检查的是将要提交的暂存区内容
+    staged.write_text("x = 1\n", encoding="utf-8")
+    _seconds, code, out = run_gate(root, "--no-cache", "--staged")
+    if code != 1 or "文件超限：1200 行" not in out:
+        raise SystemExit("❌ --staged 检查了工作区文件而不是暂存区内容")
+    staged.write_text("x = 1\n" * 1200, encoding="utf-8")
+
+    since_seconds, code, out = run_gate(root, "--no-cache", "--changed-since", "HEAD")
+    print(f"  --changed-since : {since_seconds:.3f}s")
+    if code != 1 or "staged_change.py" not in out or "helper_old.py" not in out or "扫描文件：2" not in out:
+        raise SystemExit("❌ --changed-since 检查范围不正确")
+
+    (root / ".gitignore").write_text("tmp/\n.env\n", encoding="utf-8")
+    _seconds, _code, out = run_gate(root, "--no-cache", "--staged")
+    if "debug/ 目录未添加到 .gitignore" not in out:
+        raise SystemExit("❌ 变更范围模式未执行项目级检查")
+    print("  只检查变更文件，项目级检查仍执行")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ci_gate 基准")
+    parser.add_argument("--files", type=int, default=10_000, help="合成文件数")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[2, 4], help="并行进程数列表")
+    parser.add_argument("--only", choices=["io", "jobs", "cache", "jsonl", "git"], help="只运行指定基准")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pc-ci-gate-bench-") as tmp_dir:
+        root = Path(tmp_dir)
+        build_tree(root, args.files)
+        print(f"📦 合成项目：{args.files} 个文件")
+        if args.only in (None, "io"):
+            print("\n[io] 单文件读取")
+            bench_io(root)
+        if args.only in (None, "jobs"):
+            print("\n[jobs] 串行 vs 并行")
+            bench_jobs(root, args.jobs)
+        if args.only in (None, "cache"):
+            print("\n[cache] 增量缓存")
+            bench_cache(root)
+        if args.only in (None, "jsonl"):
+            print("\n[jsonl] 机器可读输出")
+            bench_jsonl(root)
+        if args.only in (None, "git"):
+            print("\n[git] 变更范围")
+            bench_git(root)
+
+
+if __name__ == "__main__":
+    main()
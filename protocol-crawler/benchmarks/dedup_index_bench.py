@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+去重索引基准：续跑启动耗时与峰值 RSS，set 全量解析 vs DedupIndex；
+以及从 JSONL 重建索引时，按记录数预设容量 vs 爬虫默认容量（逐次扩容）的耗时与峰值 RSS。
+
+用法：python benchmarks/dedup_index_bench.py --records 1000000
+数据生成与每种加载方式都在独立子进程中运行，峰值 RSS 互不干扰。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from dedup_index import DedupIndex  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    """当前进程峰值 RSS（MB），不支持的平台返回 -1。"""
+    try:
+        import resource
+    except ImportError:
+        return -1.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_existing_ids(jsonl_path: Path) -> set:
+    """error-checkpoint.md 中的基线实现。"""
+    ids = set()
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                ids.add(json.loads(line).get("id"))
+    return ids
+
+
+def build_fixture(root: Path, records: int) -> None:
+    """生成 JSONL 及对应索引。"""
+    data_path = root / "data.jsonl"
+    with open(data_path, "w", encoding="utf-8") as f:
+        for i in range(records):
+            item = {"id": f"item-{i:09d}", "title": f"标题 {i}", "tags": ["a", "b"], "score": i % 97}
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    index = DedupIndex(root / "data.idx", data_path=data_path, capacity=int(records / 0.6))
+    index.close()
+
+
+def run_mode(mode: str, root: Path, probes: int) -> dict:
+    """子进程入口：执行一次续跑加载 + 查询。"""
+    started = time.perf_counter()
+    if mode == "set":
+        seen = load_existing_ids(root / "data.jsonl")
+    else:
+        seen = DedupIndex(root / "data.idx", data_path=root / "data.jsonl")
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hits = sum(1 for i in range(probes) if f"item-{i * 7:09d}" in seen)
+    probe_seconds = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "load_seconds": round(load_seconds, 4),
+        "probe_us": round(probe_seconds / probes * 1e6, 2),
+        "hits": hits,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_build(mode: str, root: Path, records: int) -> dict:
+    """子进程入口：从 JSONL 重建一份新索引；grow 使用 DemoCrawler 的默认容量，随写入多次扩容。"""
+    capacity = int(records / 0.6) if mode == "presized" else 1 << 16
+    started = time.perf_counter()
+    index = DedupIndex(root / f"{mode}.idx", data_path=root / "data.jsonl", capacity=capacity)
+    build_seconds = time.perf_counter() - started
+    result = {
+        "mode": mode,
+        "build_seconds": round(build_seconds, 3),
+        "capacity": index.capacity,
+        "count": len(index),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    index.close()
+    return result
+
+
+def run_child(mode: str, root: Path, args: argparse.Namespace) -> str:
+    """在子进程中执行指定阶段，返回其标准输出。"""
+    cmd = [
+        sys.executable, __file__, "--child", mode, "--root", str(root),
+        "--records", str(args.records), "--probes", str(args.probes),
+    ]
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="去重索引基准")
+    parser.add_argument("--records", type=int, default=500_000, help="JSONL 记录数")
+    parser.add_argument("--probes", type=int, default=100_000, help="查询次数")
+    parser.add_argument("--child", choices=["build", "set", "index", "presized", "grow"], help=argparse.SUPPRESS)
+    parser.add_argument("--root", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "build":
+        build_fixture(args.root, args.records)
+        return
+    if args.child in ("presized", "grow"):
+        print(json.dumps(run_build(args.child, args.root, args.records)))
+        return
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.root, args.probes)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="pc-dedup-bench-") as tmp_dir:
+        root = Path(tmp_dir)
+        started = time.perf_counter()
+        run_child("build", root, args)
+        print(f"📦 生成 {args.records} 条记录 + 索引：{time.perf_counter() - started:.1f}s")
+        print(f"   data.jsonl {(root / 'data.jsonl').stat().st_size / 1e6:.1f}MB，"
+              f"data.idx {(root / 'data.idx').stat().st_size / 1e6:.1f}MB")
+
+        for mode in ("set", "index"):
+            result = json.loads(run_child(mode, root, args))
+            print(
+                f"{mode:>6}: 启动 {result['load_seconds']:.3f}s，查询 {result['probe_us']:.2f}µs/次，"
+                f"命中 {result['hits']}，峰值 RSS {result['peak_rss_mb']}MB"
+            )
+
+        print("重建索引：")
+        for mode in ("presized", "grow"):
+            result = json.loads(run_child(mode, root, args))
+            print(
+                f"{mode:>9}: {result['build_seconds']:.2f}s，容量 {result['capacity']}，"
+                f"峰值 RSS {result['peak_rss_mb']}MB"
+            )
+            if result["count"] != args.records:
+                raise SystemExit(f"❌ {mode} 重建条数不符：{result['count']}")
+
+
+if __name__ == "__main__":
+    main()
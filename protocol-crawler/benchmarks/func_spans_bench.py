@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+函数行范围分析基准（ci_gate 检查项 2）：
+
+- cases ：手写正确性用例（Python 与花括号语言），并对比旧版缩进启发式在同一用例上的结果
+- corpus：在真实语料上对比 ast 与旧启发式（超限判定差异、耗时），默认语料为当前解释器的标准库；
+          ci_gate 的用法（全文行数预筛 + 逻辑行扫描只解析可能超限的函数）须与全文 ast 判定一致
+
+用法：python benchmarks/func_spans_bench.py [--corpus DIR] [--limit 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import sysconfig
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from func_spans import (  # noqa: E402
+    SUPPORTED_SUFFIXES,
+    function_spans,
+    python_spans,
+    python_spans_heuristic,
+)
+
+Span = Tuple[str, int, int]
+
+# (后缀, 源码, 期望的 (函数名, 起始行, 结束行) 列表)
+CASES: List[Tuple[str, str, List[Span]]] = [
+    (".py", '''
+def outer():
+    def inner():
+        return 1
+    value = inner()
+
+    return value
+''', [("outer", 2, 7), ("inner", 3, 4)]),
+    (".py", '''
+def render():
+    template = """
+def fake():
+    pass
+"""
+    return template
+''', [("render", 2, 7)]),
+    (".py", '''
+class Service:
+    @property
+    async def load(self):
+        items = [
+    1, 2]
+# 顶格注释不结束函数
+        return items
+
+
+x = 1
+''', [("load", 4, 8)]),
+    (".js", '''
+// function fake() {
+const re = /[{]/g;
+function foo(a, b) {
+  const s = "}";
+  if (a) {
+    return `x ${a} }`;
+  }
+}
+class A extends B {
+  async load(id: string): Promise<void> {
+    items.forEach((it) => {
+      console.log(it);
+    });
+  }
+}
+const handler = async (req, res) => {
+  res.end();
+};
+''', [("foo", 4, 9), ("load", 11, 15), ("<anonymous>", 12, 14), ("handler", 17, 19)]),
+    (".go", '''
+type H func(int)
+var x = struct {
+  a int
+}{1}
+func (s *Srv) Handle(w http.ResponseWriter,
+    r *http.Request) (int, error) {
+  if err := f(); err != nil {
+    return 0, err
+  }
+  raw := `}`
+  return 1, nil
+}
+''', [("Handle", 6, 13)]),
+    (".rs", '''
+struct S<'a> { x: &'a str }
+impl<'a> S<'a> {
+    pub fn new(x: &'a str) -> Self {
+        let c = '}';
+        let r = r#"}"#;
+        Self { x }
+    }
+}
+''', [("new", 4, 8)]),
+    (".java", '''
+public class Foo {
+    static { init(); }
+    @Override
+    public String toString() throws IOException {
+        String s = """
+          }
+          """;
+        if (x) { }
+        return s;
+    }
+    record P(int x) { }
+}
+''', [("toString", 5, 11)]),
+]
+
+
+def as_tuples(spans) -> List[Span]:
+    return [(span.name, span.start, span.end) for span in spans]
+
+
+def run_cases() -> None:
+    """逐条校验期望结果；Python 用例同时展示旧启发式的偏差。"""
+    for index, (suffix, source, expected) in enumerate(CASES, 1):
+        got = as_tuples(function_spans(source, suffix))
+        if got != expected:
+            raise SystemExit(f"❌ 用例 {index}（{suffix}）期望 {expected}，实际 {got}")
+        note = ""
+        if suffix == ".py":
+            # 给定 min_length 时走逻辑行预筛，结果须与全文 ast 过滤后相同
+            pruned = as_tuples(function_spans(source, suffix, 2))
+            if pruned != [span for span in expected if span[2] - span[1] + 1 > 2]:
+                raise SystemExit(f"❌ 用例 {index} 逻辑行预筛结果不符：{pruned}")
+            legacy = as_tuples(python_spans_heuristic(source.splitlines()))
+            note = "，旧启发式一致" if legacy == expected else f"，旧启发式：{legacy}"
+        print(f"  ✅ 用例 {index} {suffix}{note}")
+
+
+def iter_corpus(root: Path) -> List[Path]:
+    return sorted(
+        path for path in root.rglob("*")
+        if path.suffix in SUPPORTED_SUFFIXES and path.is_file() and "site-packages" not in path.parts
+    )
+
+
+def run_corpus(root: Path, limit: int) -> None:
+    """ast/花括号分析 vs 旧启发式：超限判定差异与耗时。"""
+    files = iter_corpus(root)
+    texts: Dict[Path, str] = {}
+    for path in files:
+        try:
+            texts[path] = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+    total_mb = sum(len(text) for text in texts.values()) / 1e6
+    print(f"  语料：{root}（{len(texts)} 个文件，{total_mb:.1f}MB）")
+
+    timings: Dict[str, float] = {}
+    verdicts: Dict[str, Dict[Path, set]] = {}
+    for label, analyze in (
+        ("旧启发式", lambda path, text: python_spans_heuristic(text.splitlines())
+         if path.suffix == ".py" else []),
+        ("精确分析", lambda path, text: function_spans(text, path.suffix)),
+        ("精确分析 + 逻辑行预筛", lambda path, text: function_spans(text, path.suffix, limit)
+         if text.count("\n") + 1 > limit else []),
+    ):
+        started = time.perf_counter()
+        result = {}
+        for path, text in texts.items():
+            result[path] = {
+                (span.name, span.start) for span in analyze(path, text) if span.length > limit
+            }
+        timings[label] = time.perf_counter() - started
+        verdicts[label] = result
+        print(
+            f"  {label}：{timings[label]:.2f}s（{total_mb / timings[label]:.1f}MB/s），"
+            f"超限函数 {sum(map(len, result.values()))} 个"
+        )
+
+    exact = verdicts["精确分析"]
+    if verdicts["精确分析 + 逻辑行预筛"] != exact:
+        raise SystemExit("❌ 逻辑行预筛改变了判定结果")
+
+    legacy = verdicts["旧启发式"]
+    python_files = [path for path in texts if path.suffix == ".py"]
+    false_pos = [(p, s) for p in python_files for s in legacy[p] - exact[p]]
+    false_neg = [(p, s) for p in python_files for s in exact[p] - legacy[p]]
+    print(f"  旧启发式误报 {len(false_pos)} 个、漏报 {len(false_neg)} 个（以 ast 为准）")
+    for path, (name, start) in (false_pos + false_neg)[:5]:
+        spans = [s for s in python_spans(texts[path]) if s.name == name and s.start == start]
+        actual = f"{spans[0].length} 行" if spans else "非函数"
+        print(f"    {path.relative_to(root)}:{start} {name}()，实际 {actual}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="函数行范围分析基准")
+    parser.add_argument("--corpus", type=Path, default=Path(sysconfig.get_paths()["stdlib"]),
+                        help="语料目录（默认当前解释器标准库）")
+    parser.add_argument("--limit", type=int, default=200, help="函数行数上限")
+    args = parser.parse_args()
+
+    print("[cases] 正确性用例")
+    run_cases()
+    print("\n[corpus] 语料对比")
+    run_corpus(args.corpus, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+协商缓存基准：重爬缓慢变化的列表页时，无缓存 vs HttpCache 的下载量、模拟传输耗时与解析耗时。
+
+- nocache    ：每页完整下载并 json 解析
+- cache      ：HttpCache 带 If-None-Match 请求，未变页 304 直接用缓存（内存中已解析）
+- cache-cold ：同一缓存目录重启后重爬（内存为空，命中页从磁盘解析一次）
+- cache-small：max_bytes 只有页面总量的一半，顺序重爬时 LRU 会淘汰掉下一轮要用的页
+
+传输耗时按 RTT + 字节数 / 带宽模拟（304 只计 RTT）；处理耗时为真实耗时，
+含缓存查找与读写盘、json 解析、条目写入 JsonlSink（304 页同样写出，爬虫中由去重索引过滤重复）。
+
+用法：python benchmarks/http_cache_bench.py --pages 400 --change-rate 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from http_cache import HttpCache, cache_key  # noqa: E402
+from jsonl_sink import JsonlSink  # noqa: E402
+from mock_clients import API_URL  # noqa: E402
+
+
+class BytesResponse:
+    """带原始响应体的模拟响应：json() 每次真实解析。"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str]) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class ListingServer:
+    """按页生成列表数据的服务端：mutate() 随机改动一部分页面，ETag 为响应体摘要。"""
+
+    def __init__(self, pages: int, items_per_page: int, seed: int) -> None:
+        self.rng = random.Random(seed)
+        self.pages = pages
+        self.items_per_page = items_per_page
+        self.bodies = [self._render(page, 0) for page in range(pages)]
+        self.revisions = [0] * pages
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def _render(self, page: int, revision: int) -> bytes:
+        items = [
+            {"id": f"{page}-{i}", "title": f"item {page}-{i} rev {revision}", "body": "lorem ipsum " * 20}
+            for i in range(self.items_per_page)
+        ]
+        next_cursor = str(page + 1) if page + 1 < self.pages else None
+        return json.dumps({"items": items, "next_cursor": next_cursor}).encode("utf-8")
+
+    def mutate(self, rate: float) -> int:
+        changed = self.rng.sample(range(len(self.bodies)), int(len(self.bodies) * rate))
+        for page in changed:
+            self.revisions[page] += 1
+            self.bodies[page] = self._render(page, self.revisions[page])
+        return len(changed)
+
+    def get(self, _url: str, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> BytesResponse:
+        self.requests += 1
+        body = self.bodies[int(params["page"])]
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if (headers or {}).get("If-None-Match") == etag:
+            return BytesResponse(304, b"", {"ETag": etag})
+        self.bytes_sent += len(body)
+        return BytesResponse(200, body, {"ETag": etag, "Content-Type": "application/json"})
+
+
+def crawl(server: ListingServer, pages: int, cache: Optional[HttpCache], sink: JsonlSink) -> float:
+    """抓取全部页面并写出条目，返回客户端处理耗时（秒）；304 页省掉解析，条目照常写出。"""
+    parse_seconds = 0.0
+    for page in range(pages):
+        params = {"page": page}
+        key = cache_key(API_URL, params)
+        resp = server.get(API_URL, params, cache.request_headers(key) if cache is not None else None)
+        started = time.perf_counter()
+        if cache is not None:
+            resp = cache.resolve(key, resp)
+        data = resp.json()
+        sink.write_many(data["items"])
+        parse_seconds += time.perf_counter() - started
+    started = time.perf_counter()
+    sink.commit()
+    return parse_seconds + time.perf_counter() - started
+
+
+def run_mode(args: argparse.Namespace, root: Path, cached: bool, max_bytes: int, restart: bool) -> Dict[str, Any]:
+    server = ListingServer(args.pages, args.items, args.seed)
+    cache = HttpCache(root / "cache", max_bytes=max_bytes) if cached else None
+    sink = JsonlSink(root / "data.jsonl")
+    crawl(server, args.pages, cache, sink)
+    server.mutate(args.change_rate)
+    if cache is not None and restart:
+        cache.close()
+        cache = HttpCache(root / "cache", max_bytes=max_bytes)
+    before = cache.stats() if cache is not None else {"hits": 0}
+    sent_before, requests_before = server.bytes_sent, server.requests
+    parse_seconds = crawl(server, args.pages, cache, sink)
+    sink.close()
+    downloaded = server.bytes_sent - sent_before
+    requests = server.requests - requests_before
+    transfer = requests * args.rtt_ms / 1000 + downloaded / (args.bandwidth_mb * 1024 * 1024)
+    result = {"downloaded": downloaded, "transfer": transfer, "parse": parse_seconds, "hit_rate": 0.0, "bytes": 0}
+    if cache is not None:
+        after = cache.stats()
+        cache.close()
+        # 只统计重爬这一轮
+        result["hit_rate"] = (after["hits"] - before["hits"]) / requests
+        result["bytes"] = after["bytes"]
+    return result
+
+
+def report(label: str, result: Dict[str, Any]) -> None:
+    print(
+        f"  {label:<11}: 下载 {result['downloaded'] / 1024 / 1024:6.2f} MB，模拟传输 {result['transfer']:6.2f}s，"
+        f"处理 {result['parse'] * 1000:6.1f}ms，命中率 {result['hit_rate']:.0%}，"
+        f"缓存占用 {result['bytes'] / 1024 / 1024:.2f} MB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="协商缓存基准")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--items", type=int, default=40, help="每页条目数")
+    parser.add_argument("--change-rate", type=float, default=0.1, help="两轮之间内容变化的页面比例")
+    parser.add_argument("--rtt-ms", type=float, default=80.0)
+    parser.add_argument("--bandwidth-mb", type=float, default=2.0, help="带宽（MB/s）")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    page_bytes = len(ListingServer(1, args.items, args.seed).bodies[0])
+    total = page_bytes * args.pages
+    print(
+        f"📦 {args.pages} 页 × {args.items} 条（每页约 {page_bytes / 1024:.0f} KB），"
+        f"两轮间 {args.change_rate:.0%} 页面变化，RTT {args.rtt_ms:g}ms，带宽 {args.bandwidth_mb:g} MB/s"
+    )
+    with tempfile.TemporaryDirectory(prefix="pc-cache-bench-") as tmp:
+        nocache = run_mode(args, Path(tmp) / "nocache", False, 0, restart=False)
+        report("nocache", nocache)
+        cached = run_mode(args, Path(tmp) / "warm", True, total * 2, restart=False)
+        report("cache", cached)
+        cold = run_mode(args, Path(tmp) / "cold", True, total * 2, restart=True)
+        report("cache-cold", cold)
+        small = run_mode(args, Path(tmp) / "small", True, total // 2, restart=False)
+        report("cache-small", small)
+
+    ratio = cached["downloaded"] / nocache["downloaded"]
+    speedup = (nocache["transfer"] + nocache["parse"]) / (cached["transfer"] + cached["parse"])
+    print(
+        f"\n  cache 重爬下载量为 nocache 的 {ratio:.0%}，处理耗时为 {cached['parse'] / nocache['parse']:.0%}，"
+        f"传输 + 处理快 {speedup:.1f}x"
+    )
+    if small["bytes"] > total // 2:
+        raise SystemExit("❌ 缓存占用超出 max_bytes")
+    if cached["hit_rate"] < 1 - args.change_rate - 0.01 or ratio > args.change_rate * 1.5:
+        raise SystemExit("❌ 协商缓存未生效")
+    # 条目照常写出（写出占处理耗时的大头），缓存查找与变化页落盘的开销应远小于省下的下载
+    if cached["parse"] > nocache["parse"] * 1.5:
+        raise SystemExit("❌ 缓存模式处理耗时明显高于无缓存")
+
+
+if __name__ == "__main__":
+    main()
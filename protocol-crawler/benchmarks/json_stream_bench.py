@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+流式 JSON 提取基准：单页几十 MB 的响应，整页解析 vs StreamExtractor 边下载边写出。
+
+- full   ：读完整个响应体 → json.loads → 取 data.items 写入 JsonlSink（真实抓取路径的做法）
+- stream ：iter_content(64KB) 逐块喂入 StreamExtractor，条目批次直接写入 JsonlSink
+
+每种模式在独立子进程（spawn）中运行，峰值内存为该进程 ru_maxrss 相对导入完成后的增量；
+响应体按 --bandwidth-mb 限速逐块"下载"，首条写出时间反映整页解析要等全部下载完。
+
+用法：python benchmarks/json_stream_bench.py --mb 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from json_stream import StreamExtractor  # noqa: E402
+from jsonl_sink import JsonlSink  # noqa: E402
+from mock_clients import API_URL, LargePageMockClient  # noqa: E402
+
+CHUNK = 64 * 1024
+BODY_BYTES = 1000
+
+
+def max_rss_mb() -> float:
+    # Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def paced(chunks: Iterator[bytes], bandwidth: float) -> Iterator[bytes]:
+    """按带宽限速产出分块，模拟网络下载。"""
+    started = time.perf_counter()
+    received = 0
+    for chunk in chunks:
+        received += len(chunk)
+        if bandwidth:
+            delay = started + received / bandwidth - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield chunk
+
+
+def run_mode(mode: str, items: int, bandwidth: float, out: str, results: Any) -> None:
+    client = LargePageMockClient(pages=1, items_per_page=items, body_bytes=BODY_BYTES)
+    sink = JsonlSink(Path(out) / f"{mode}.jsonl")
+    base = max_rss_mb()
+    started = time.perf_counter()
+    first = None
+    resp = client.get(API_URL, params={}, stream=True)
+    chunks = paced(resp.iter_content(chunk_size=CHUNK), bandwidth)
+    written = 0
+    if mode == "full":
+        import json
+
+        payload = json.loads(b"".join(chunks))
+        first = time.perf_counter() - started
+        written = len(payload["data"]["items"])
+        sink.write_many(payload["data"]["items"])
+        del payload
+    else:
+        extractor = StreamExtractor("data.items[*]", ("next_cursor",))
+        for chunk in chunks:
+            batch = extractor.feed(chunk)
+            if batch:
+                first = first if first is not None else time.perf_counter() - started
+                written += len(batch)
+                sink.write_many(batch)
+        written += len(extractor.close())
+    sink.close()
+    elapsed = time.perf_counter() - started
+    results.put({"elapsed": elapsed, "first": first, "rss": max_rss_mb() - base, "items": written})
+
+
+def measure(mode: str, items: int, bandwidth: float, out: str) -> Dict[str, Any]:
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=run_mode, args=(mode, items, bandwidth, out, results))
+    proc.start()
+    result = results.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="流式 JSON 提取基准")
+    parser.add_argument("--mb", type=float, default=50.0, help="单页响应体大小（MB，近似）")
+    parser.add_argument("--bandwidth-mb", type=float, default=200.0, help="模拟下载带宽（MB/s），0 为不限速")
+    args = parser.parse_args()
+
+    sample = LargePageMockClient(pages=1, items_per_page=1, body_bytes=BODY_BYTES)
+    per_item = len(b"".join(sample.page_pieces(0)))
+    items = int(args.mb * 1024 * 1024 / per_item)
+    bandwidth = args.bandwidth_mb * 1024 * 1024
+    print(f"📦 单页 {items} 条（约 {args.mb:g} MB），分块 {CHUNK // 1024} KB，模拟带宽 {args.bandwidth_mb:g} MB/s")
+    with tempfile.TemporaryDirectory(prefix="pc-stream-bench-") as tmp:
+        full = measure("full", items, bandwidth, tmp)
+        stream = measure("stream", items, bandwidth, tmp)
+    for label, result in (("full", full), ("stream", stream)):
+        print(
+            f"  {label:<6}: 峰值内存 +{result['rss']:7.1f} MB，首条写出 {result['first'] * 1000:7.1f}ms，"
+            f"总耗时 {result['elapsed']:5.2f}s，写出 {result['items']} 条"
+        )
+    ratio = full["rss"] / max(stream["rss"], 1.0)
+    print(f"\n  流式峰值内存约为整页解析的 1/{ratio:.0f}，首条写出提前 {(full['first'] - stream['first']) * 1000:.0f}ms")
+    if stream["items"] != full["items"] or ratio < 5:
+        raise SystemExit("❌ 流式提取未降低峰值内存或条目不一致")
+
+
+if __name__ == "__main__":
+    main()
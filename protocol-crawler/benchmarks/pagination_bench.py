@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+分页基准：offset 分页逐页 vs K 页并发窗口，cursor 链写出 / 断点提交在抓取路径上 vs 写线程流水线。
+
+- offset-K ：DemoCrawler(fanout=K) 抓取 offset + limit 分页（模拟请求延迟），K=1 即逐页
+- async-K  ：AsyncDemoCrawler(fanout=K, per_host=K)
+- cursor   ：DemoCrawler 单条 cursor 链，每页写出后组提交 fsync + 写断点；pipeline 时交给写线程
+  （收益上限为每页写出 + fsync 的耗时，取决于磁盘）
+
+用法：python benchmarks/pagination_bench.py --rows 4000 --latency-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from async_crawler import AsyncDemoCrawler, CrawlTask  # noqa: E402
+from demo_crawler import DemoCrawler  # noqa: E402
+from mock_clients import API_URL, AsyncPagedMockClient, ChainMockClient, MockSession, PagedMockClient  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from smoke_test import read_jsonl_ids  # noqa: E402
+
+PAGE_SIZE = 20
+
+
+def unlimited() -> RateLimiter:
+    """基准只比较抓取结构，限速放到足够高。"""
+    return RateLimiter(rate=1e6, burst=1000, max_rate=1e6)
+
+
+def bench_offset(root: Path, rows: int, latency: float, fanout: int) -> Dict[str, Any]:
+    client = PagedMockClient(total=rows, latency=latency)
+    crawler = DemoCrawler(
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        client=client,
+        rate_limiter=unlimited(),
+        fanout=fanout,
+    )
+    started = time.perf_counter()
+    crawler.run_tasks([CrawlTask("offset", API_URL, {"offset": 0, "limit": PAGE_SIZE})])
+    elapsed = time.perf_counter() - started
+    crawler.close()
+    if len(read_jsonl_ids(root / "output" / "data.jsonl")) != rows:
+        raise SystemExit("❌ offset 分页输出缺失")
+    stats = crawler.window_stats["offset"]
+    return {"elapsed": elapsed, "requests": client.calls, "wasted": stats.wasted, "peak": client.peak_in_flight}
+
+
+def bench_async(root: Path, rows: int, latency: float, fanout: int) -> Dict[str, Any]:
+    client = AsyncPagedMockClient(total=rows, latency=latency, with_total=True)
+    crawler = AsyncDemoCrawler(
+        client=client,
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        per_host=fanout,
+        max_in_flight=fanout,
+        fanout=fanout,
+    )
+    started = time.perf_counter()
+    asyncio.run(crawler.run([CrawlTask("page", API_URL, {"page": 1, "page_size": PAGE_SIZE})]))
+    elapsed = time.perf_counter() - started
+    if len(crawler.results) != rows:
+        raise SystemExit("❌ page 分页输出缺失")
+    stats = crawler.window_stats["page"]
+    return {"elapsed": elapsed, "requests": client.calls, "wasted": stats.wasted, "peak": client.peak_in_flight}
+
+
+def bench_cursor(root: Path, pages: int, latency: float, pipeline: bool) -> Dict[str, Any]:
+    # 单条游标链：MockSession 只负责注入每次请求的延迟
+    client = MockSession(ChainMockClient({"chain": 0}, pages_per_task=pages), handshake=0.0, latency=latency)
+    crawler = DemoCrawler(
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        client=client,
+        rate_limiter=unlimited(),
+        pipeline=pipeline,
+    )
+    started = time.perf_counter()
+    crawler.run_tasks([CrawlTask("chain", API_URL, {"task": "chain"})])
+    elapsed = time.perf_counter() - started
+    crawler.close()
+    if len(read_jsonl_ids(root / "output" / "data.jsonl")) != pages:
+        raise SystemExit("❌ cursor 链输出缺失")
+    return {"elapsed": elapsed, "requests": client.requests, "wasted": 0, "peak": 1}
+
+
+def report(label: str, result: Dict[str, Any], baseline: float) -> None:
+    print(
+        f"  {label:<11}: {result['elapsed']:6.2f}s（{baseline / result['elapsed']:4.1f}x），"
+        f"请求 {result['requests']}，越过末页 {result['wasted']}，在途峰值 {result['peak']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="分页窗口 / 写出流水线基准")
+    parser.add_argument("--rows", type=int, default=4000, help="offset / page 分页总条数（每页 20 条）")
+    parser.add_argument("--cursor-pages", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(
+        f"📦 offset / page 分页 {args.rows // PAGE_SIZE} 页，cursor 链 {args.cursor_pages} 页，"
+        f"请求延迟 {args.latency_ms:g}ms"
+    )
+    with tempfile.TemporaryDirectory(prefix="pc-page-bench-") as tmp:
+        root = Path(tmp)
+        serial = bench_offset(root / "offset-1", args.rows, latency, 1)
+        report("offset-1", serial, serial["elapsed"])
+        windows = {}
+        for fanout in (4, 8, 16):
+            windows[fanout] = bench_offset(root / f"offset-{fanout}", args.rows, latency, fanout)
+            report(f"offset-{fanout}", windows[fanout], serial["elapsed"])
+        for fanout in (1, 8):
+            result = bench_async(root / f"async-{fanout}", args.rows, latency, fanout)
+            report(f"async-{fanout}", result, serial["elapsed"])
+
+        inline = bench_cursor(root / "cursor-inline", args.cursor_pages, latency, pipeline=False)
+        report("cursor", inline, inline["elapsed"])
+        piped = bench_cursor(root / "cursor-pipe", args.cursor_pages, latency, pipeline=True)
+        report("cursor-pipe", piped, inline["elapsed"])
+
+    speedup = serial["elapsed"] / windows[8]["elapsed"]
+    pipe_speedup = inline["elapsed"] / piped["elapsed"]
+    print(f"\n  offset-8 为逐页的 {speedup:.1f}x；cursor 写线程流水线为抓取路径写出的 {pipe_speedup:.2f}x")
+    if speedup < 4 or windows[8]["wasted"] > 8:
+        raise SystemExit("❌ 分页窗口未生效")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+自适应限速基准：MockClient 带服务端配额（令牌桶，超额返回 429 + Retry-After），对比三种节奏：
+
+- fixed    ：每请求 random.uniform(2, 5) 固定间隔（error-checkpoint.md 的参考实现）
+- unlimited：不限速，遇到 429 就地等待 Retry-After（DemoCrawler 旧实现）
+- aimd     ：RateLimiter，同步线程与 asyncio 协程共用同一个实例
+
+用法：python benchmarks/rate_limiter_bench.py --quota 20 --seconds 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from rate_limiter import RateLimiter  # noqa: E402
+from mock_clients import API_URL, MockClient, ServerQuota  # noqa: E402
+
+LATENCY = 0.005  # 模拟单次请求耗时
+
+
+class Recorder:
+    """按时间记录每次请求结果，供计算稳态吞吐与 429 比例。"""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.events: List[tuple] = []  # (相对时刻, 状态码)
+        self._lock = threading.Lock()
+
+    def add(self, status: int) -> None:
+        with self._lock:
+            self.events.append((time.monotonic() - self.started, status))
+
+    def window(self, start: float, end: float) -> Dict[str, float]:
+        picked = [status for at, status in self.events if start <= at < end]
+        ok = sum(1 for status in picked if status == 200)
+        return {"ok_rate": ok / (end - start), "throttled": len(picked) - ok, "requests": len(picked)}
+
+
+def run_threads(workers: int, seconds: float, loop: Callable[[float], None]) -> None:
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=loop, args=(deadline,)) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def bench_fixed(client: MockClient, recorder: Recorder, workers: int, seconds: float) -> None:
+    def loop(deadline: float) -> None:
+        while True:
+            delay = random.uniform(2, 5)
+            if time.monotonic() + delay >= deadline:
+                return
+            time.sleep(delay)
+            time.sleep(LATENCY)
+            recorder.add(client.get(API_URL).status_code)
+
+    run_threads(workers, seconds, loop)
+
+
+def bench_unlimited(client: MockClient, recorder: Recorder, workers: int, seconds: float) -> None:
+    def loop(deadline: float) -> None:
+        while time.monotonic() < deadline:
+            time.sleep(LATENCY)
+            resp = client.get(API_URL)
+            recorder.add(resp.status_code)
+            if resp.status_code == 429:
+                time.sleep(min(float(resp.headers["Retry-After"]), max(0.0, deadline - time.monotonic())))
+
+    run_threads(workers, seconds, loop)
+
+
+def bench_aimd(
+    client: MockClient, recorder: Recorder, limiter: RateLimiter, workers: int, seconds: float
+) -> List[float]:
+    """一半并发为同步线程、一半为 asyncio 协程，共用一个限速器；返回每秒采样的速率。"""
+    def sync_loop(deadline: float) -> None:
+        while True:
+            ticket = limiter.acquire(API_URL)
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(LATENCY)
+            resp = client.get(API_URL)
+            limiter.feedback(ticket, resp.status_code, resp.headers)
+            recorder.add(resp.status_code)
+
+    async def async_worker(deadline: float) -> None:
+        while True:
+            ticket = await limiter.acquire_async(API_URL)
+            if time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(LATENCY)
+            resp = client.get(API_URL)
+            limiter.feedback(ticket, resp.status_code, resp.headers)
+            recorder.add(resp.status_code)
+
+    async def async_main(deadline: float) -> None:
+        await asyncio.gather(*(async_worker(deadline) for _ in range(workers - workers // 2)))
+
+    samples: List[float] = []
+    deadline = time.monotonic() + seconds
+    threads = [threading.Thread(target=sync_loop, args=(deadline,)) for _ in range(workers // 2)]
+    threads.append(threading.Thread(target=lambda: asyncio.run(async_main(deadline))))
+    for thread in threads:
+        thread.start()
+    while time.monotonic() < deadline:
+        time.sleep(1.0)
+        samples.append(limiter.bucket(("api.example.com", None)).rate)
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def report(label: str, recorder: Recorder, quota: ServerQuota, seconds: float) -> Dict[str, float]:
+    total = recorder.window(0, seconds)
+    steady = recorder.window(seconds / 2, seconds)
+    ratio = total["throttled"] / total["requests"] if total["requests"] else 0.0
+    print(
+        f"  {label:<10}: 成功 {total['ok_rate']:.2f}/s（后半程 {steady['ok_rate']:.2f}/s，"
+        f"配额 {quota.rate:g}/s 的 {steady['ok_rate'] / quota.rate:.0%}），"
+        f"429 {total['throttled']}/{total['requests']}（{ratio:.1%}）"
+    )
+    return {"steady": steady["ok_rate"], "ratio": ratio}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="自适应限速基准")
+    parser.add_argument("--quota", type=float, default=20.0, help="服务端配额（次/秒）")
+    parser.add_argument("--burst", type=int, default=5, help="服务端配额的突发容量")
+    parser.add_argument("--seconds", type=float, default=30.0, help="每种节奏的运行时长")
+    parser.add_argument("--workers", type=int, default=8, help="并发数（aimd 中一半线程、一半协程）")
+    parser.add_argument("--only", choices=["fixed", "unlimited", "aimd"], help="只运行指定节奏")
+    args = parser.parse_args()
+
+    print(f"📦 服务端配额 {args.quota:g}/s（突发 {args.burst}），{args.workers} 并发，每种 {args.seconds:g}s")
+    results = {}
+    for mode in ("fixed", "unlimited", "aimd"):
+        if args.only not in (None, mode):
+            continue
+        quota = ServerQuota(args.quota, args.burst)
+        client = MockClient(quota=quota)
+        recorder = Recorder()
+        if mode == "fixed":
+            bench_fixed(client, recorder, args.workers, args.seconds)
+        elif mode == "unlimited":
+            bench_unlimited(client, recorder, args.workers, args.seconds)
+        else:
+            limiter = RateLimiter(
+                rate=2.0, max_rate=args.quota * 5, increase=args.quota / 50, decrease=0.7, success_window=5
+            )
+            samples = bench_aimd(client, recorder, limiter, args.workers, args.seconds)
+            trace = " → ".join(f"{rate:.1f}" for rate in samples[:: max(1, len(samples) // 10)])
+            print(f"  aimd 速率轨迹（次/秒）：{trace}")
+            print(f"  aimd 限速器统计：{limiter.stats()}")
+        results[mode] = report(mode, recorder, quota, args.seconds)
+
+    aimd = results.get("aimd")
+    if aimd is not None and (aimd["steady"] < args.quota * 0.6 or aimd["ratio"] > 0.1):
+        raise SystemExit("❌ 自适应限速未收敛到配额附近")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+分段压缩输出基准：同一批嵌套记录（serializer_bench 的生成器）写入单个 JSONL vs SegmentedSink。
+
+- write  ：每 500 条 commit 一次（同抓取时每页写断点），分段模式含滚动与等待后台压缩完成的耗时
+- disk   ：输出目录占用（分段模式只有活动段为明文）
+- resume ：下游从某个 id 之后继续读取 —— 单文件只能从头逐行解析找到该 id；
+           分段按 manifest 的首末 id 定位到所在段，之前的段整段跳过
+- dedup  ：删除去重索引后 DedupIndex 重建（跨压缩段解压读取）
+
+用法：python benchmarks/segment_sink_bench.py --records 50000 --segment-mb 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from dedup_index import DedupIndex  # noqa: E402
+from jsonl_sink import JsonlSink  # noqa: E402
+from segment_sink import (  # noqa: E402
+    SegmentedSink,
+    SegmentPolicy,
+    iter_lines,
+    load_manifest,
+    resolve_compression,
+)
+from serializer_bench import make_record  # noqa: E402
+
+COMMIT_EVERY = 500
+
+
+def disk_usage(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def write(sink: Any, records: List[Dict[str, Any]]) -> Tuple[float, float]:
+    """返回 (写入与提交耗时, close 耗时)；分段模式 close 需等待最后几段压缩完成。"""
+    started = time.perf_counter()
+    for i in range(0, len(records), COMMIT_EVERY):
+        sink.write_many(records[i : i + COMMIT_EVERY])
+        sink.commit()
+    written = time.perf_counter()
+    sink.close()
+    return written - started, time.perf_counter() - written
+
+
+def lines_after(lines: Iterator[bytes], item_id: str) -> int:
+    """逐行解析直到遇到 item_id，返回其后的记录数。"""
+    found, count = False, 0
+    for raw in lines:
+        if found:
+            count += 1
+        elif json.loads(raw)["id"] == item_id:
+            found = True
+    return count
+
+
+def resume_segmented(directory: Path, item_id: str) -> int:
+    """id 单调递增：按 manifest 首末 id 找到所在段，从该段开头读取。"""
+    manifest = load_manifest(directory)
+    offset = 0
+    for entry in manifest["segments"]:
+        if entry["last_id"] >= item_id:
+            offset = entry["offset"]
+            break
+        offset = entry["offset"] + entry["bytes"]
+    return lines_after(iter_lines(directory, offset), item_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="分段压缩输出基准")
+    parser.add_argument("--records", type=int, default=50_000)
+    parser.add_argument("--segment-mb", type=float, default=8.0)
+    parser.add_argument("--compression", default="auto", help="auto / gzip / zstd")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    records = [make_record(rng, i) for i in range(args.records)]
+    resume_id = records[int(len(records) * 0.9)]["id"]
+    compression = resolve_compression(args.compression)
+    policy = SegmentPolicy(max_bytes=int(args.segment_mb * 1024 * 1024), compression=compression)
+
+    with tempfile.TemporaryDirectory(prefix="pc-segment-bench-") as tmp:
+        root = Path(tmp)
+        plain_file = root / "plain" / "data.jsonl"
+        plain_write = write(JsonlSink(plain_file), records)
+        segmented = SegmentedSink(root / "segmented" / "data", policy)
+        segmented_write = write(segmented, records)
+        plain_disk = disk_usage(root / "plain")
+        segmented_disk = disk_usage(root / "segmented")
+        print(
+            f"📦 {args.records} 条嵌套记录，明文 {plain_disk / 1e6:.1f} MB；分段上限 {args.segment_mb:g} MB，"
+            f"压缩 {compression}，滚动 {segmented.rotations} 次"
+        )
+        print(
+            f"  write  : 单文件 {plain_write[0]:5.2f}s，分段 {segmented_write[0]:5.2f}s（压缩在后台线程），"
+            f"close 等待剩余压缩 {segmented_write[1]:5.2f}s"
+        )
+        print(
+            f"  disk   : 单文件 {plain_disk / 1e6:7.1f} MB，分段 {segmented_disk / 1e6:7.1f} MB"
+            f"（{plain_disk / segmented_disk:.1f}x）"
+        )
+
+        started = time.perf_counter()
+        plain_tail = lines_after(iter_lines(plain_file), resume_id)
+        plain_resume = time.perf_counter() - started
+        started = time.perf_counter()
+        segmented_tail = resume_segmented(segmented.path, resume_id)
+        segmented_resume = time.perf_counter() - started
+        print(
+            f"  resume : 从 90% 处的 id 之后读取 {segmented_tail} 条 — 单文件 {plain_resume * 1000:7.1f}ms，"
+            f"分段 {segmented_resume * 1000:7.1f}ms（{plain_resume / segmented_resume:.1f}x）"
+        )
+
+        timings = {}
+        for label, data_path in (("plain", plain_file), ("segmented", segmented.path)):
+            started = time.perf_counter()
+            index = DedupIndex(root / f"{label}.idx", data_path=data_path)
+            timings[label] = time.perf_counter() - started
+            if len(index) != args.records:
+                raise SystemExit(f"❌ {label} 去重索引重建条数不符：{len(index)}")
+            index.close()
+        print(f"  dedup  : 索引重建 单文件 {timings['plain']:5.2f}s，分段 {timings['segmented']:5.2f}s")
+
+    if plain_tail != segmented_tail:
+        raise SystemExit("❌ 续读结果不一致")
+    if segmented_disk * 3 > plain_disk or segmented_resume * 3 > plain_resume:
+        raise SystemExit("❌ 分段压缩未减少磁盘占用或续读未跳过之前的段")
+
+
+if __name__ == "__main__":
+    main()
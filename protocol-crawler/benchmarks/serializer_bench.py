@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+序列化后端微基准：贴近真实抓取结果的嵌套记录（中文 / emoji 文本、作者、统计、图片、评论列表）。
+
+- line    ：JSONL 一行，对比旧写法 json.dumps(item, ensure_ascii=False) 与各后端 Serializer.line()
+- compact ：签名用紧凑格式，对比 json.dumps(separators=(",", ":")) 与各后端 Serializer.compact()，
+            并逐条校验字节一致；少量记录带科学记数法浮点，快后端需回退标准库
+- sink    ：JsonlSink 写出 N 条并 close()（含 fsync）的端到端耗时
+
+用法：python benchmarks/serializer_bench.py --records 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from jsonl_sink import JsonlSink  # noqa: E402
+from serializer import _portable, available_backends, get_serializer  # noqa: E402
+
+WORDS = ["好物分享", "今日穿搭", "探店", "旅行攻略", "护肤", "summer", "vlog", "😀", "✨", "测评"]
+
+
+def make_record(rng: random.Random, i: int) -> Dict[str, Any]:
+    comments = [
+        {
+            "cid": f"c{i}_{j}",
+            "user": {"uid": rng.randrange(10**9), "nickname": rng.choice(WORDS) + str(j)},
+            "text": " ".join(rng.choices(WORDS, k=rng.randint(3, 12))),
+            "likes": rng.randrange(5000),
+            "created_at": 1_700_000_000 + rng.randrange(10**7),
+            "is_author": rng.random() < 0.1,
+            "reply_to": None,
+        }
+        for j in range(rng.randint(0, 8))
+    ]
+    return {
+        "id": f"note_{i:08d}",
+        "title": " ".join(rng.choices(WORDS, k=4)),
+        "desc": "".join(rng.choices(WORDS, k=20)) + "\n#话题#",
+        "author": {
+            "uid": rng.randrange(10**12),
+            "name": rng.choice(WORDS),
+            "verified": rng.random() < 0.2,
+            "followers": rng.randrange(10**7),
+        },
+        "stats": {
+            "likes": rng.randrange(10**6),
+            "collects": rng.randrange(10**5),
+            "ratio": round(rng.random(), 4),
+            # 约 2% 的记录带极小浮点（标准库输出科学记数法），快后端 compact 需回退
+            "score": rng.random() * 1e-5 if rng.random() < 0.02 else round(rng.uniform(0, 100), 2),
+        },
+        "tags": rng.choices(WORDS, k=rng.randint(1, 6)),
+        "images": [
+            {"url": f"https://img.example.com/{i}/{k}.jpg", "width": 1080, "height": 1440, "live": False}
+            for k in range(rng.randint(1, 9))
+        ],
+        "comments": comments,
+        "location": None if rng.random() < 0.5 else {"city": "上海", "lat": 31.2304, "lng": 121.4737},
+        "created_at": 1_700_000_000 + i,
+    }
+
+
+def timed(fn: Callable[[Any], bytes], records: List[Dict[str, Any]], repeat: int = 3) -> Dict[str, float]:
+    """取 repeat 轮中最快的一轮。"""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = sum(len(fn(record)) for record in records)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    return {"elapsed": elapsed, "per_record": elapsed / len(records) * 1e6, "mb_s": size / elapsed / 1e6}
+
+
+def report(label: str, result: Dict[str, float], baseline: float) -> None:
+    print(
+        f"  {label:<18}: {result['per_record']:6.2f}µs/条，{result['mb_s']:7.1f} MB/s，"
+        f"{baseline / result['elapsed']:5.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="序列化后端微基准")
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    records = [make_record(rng, i) for i in range(args.records)]
+    avg = sum(len(json.dumps(r, ensure_ascii=False).encode("utf-8")) for r in records) / len(records)
+    fallback = sum(1 for r in records if not _portable(r)) / len(records)
+    backends = {name: get_serializer(name) for name in available_backends()}
+    print(f"📦 {args.records} 条嵌套记录（平均 {avg:.0f} 字节），已安装后端：{', '.join(backends)}")
+
+    print("\n[line] JSONL 行")
+    old_line = timed(lambda r: (json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8"), records)
+    report("json.dumps", old_line, old_line["elapsed"])
+    lines = {}
+    for name, backend in backends.items():
+        lines[name] = timed(backend.line, records)
+        report(name, lines[name], old_line["elapsed"])
+
+    print(f"\n[compact] 签名紧凑格式（{fallback:.1%} 的记录需回退标准库）")
+    compact_dumps = lambda r: json.dumps(r, separators=(",", ":"), ensure_ascii=False).encode("utf-8")  # noqa: E731
+    old_compact = timed(compact_dumps, records)
+    report("json.dumps", old_compact, old_compact["elapsed"])
+    compacts = {}
+    for name, backend in backends.items():
+        compacts[name] = timed(backend.compact, records)
+        report(name, compacts[name], old_compact["elapsed"])
+        if any(backend.compact(r) != compact_dumps(r) for r in records):
+            raise SystemExit(f"❌ {name} 紧凑格式与 json.dumps 不一致")
+
+    print("\n[sink] JsonlSink 写出 + close")
+    with tempfile.TemporaryDirectory(prefix="pc-serializer-bench-") as tmp:
+        sink_elapsed = {}
+        for name, backend in backends.items():
+            started = time.perf_counter()
+            sink = JsonlSink(Path(tmp) / f"{name}.jsonl", serializer=backend)
+            sink.write_many(records)
+            sink.close()
+            sink_elapsed[name] = time.perf_counter() - started
+            with open(sink.path, encoding="utf-8") as f:
+                if [json.loads(line) for line in f] != json.loads(json.dumps(records)):
+                    raise SystemExit(f"❌ {name} 写出的 JSONL 读回不一致")
+        for name, elapsed in sink_elapsed.items():
+            print(f"  {name:<18}: {elapsed:5.2f}s，{args.records / elapsed:9.0f} 条/s")
+
+    fastest = available_backends()[0]
+    print(
+        f"\n  {fastest} 后端 JSONL 行为 json.dumps 的 {old_line['elapsed'] / lines[fastest]['elapsed']:.1f}x，"
+        f"紧凑格式 {old_compact['elapsed'] / compacts[fastest]['elapsed']:.1f}x 且逐字节一致"
+    )
+    if fastest != "stdlib" and old_line["elapsed"] / lines[fastest]["elapsed"] < 3:
+        raise SystemExit("❌ 快后端未明显快于标准库")
+
+
+if __name__ == "__main__":
+    main()
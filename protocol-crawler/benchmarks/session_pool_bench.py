@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+会话池基准：轮换 dl × impersonate × 账号时，每请求新建会话 vs SessionPool / AsyncSessionPool。
+
+握手与请求耗时为模拟值（MockSession 首个请求 sleep 一次握手耗时），默认握手 60ms、请求 15ms。
+
+- adhoc     ：每个请求新建会话（参考代码中 requests.get(..., impersonate=...) 的写法）
+- pool-N    ：SessionPool(max_size=N)，N 小于 key 数时可看到 LRU 淘汰对复用率的影响
+- async     ：AsyncSessionPool，同一 key 的协程共享一个会话
+
+用法：python benchmarks/session_pool_bench.py --requests 960 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from mock_clients import API_URL, MockAsyncSession, MockResponse, MockSession  # noqa: E402
+from session_pool import AsyncSessionPool, SessionKey, SessionPool  # noqa: E402
+
+PROXIES = [f"http://p{i}.example.net:8000" for i in range(4)]
+PROFILES = ["chrome110", "safari17_0"]
+ACCOUNTS = ["acc0", "acc1", "acc2"]
+
+
+class EchoClient:
+    """固定返回 200 的内层客户端，请求耗时由会话模拟。"""
+
+    def get(self, _url: str, **_kwargs: Any) -> MockResponse:
+        return MockResponse(200, {"items": []}, {})
+
+
+class AsyncEchoClient:
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def get(self, _url: str, **_kwargs: Any) -> MockResponse:
+        await asyncio.sleep(self.latency)
+        return MockResponse(200, {"items": []}, {})
+
+
+def request_keys(count: int, seed: int) -> List[SessionKey]:
+    """每个请求随机轮换 dl、impersonate 与账号（24 个 key）。"""
+    rng = random.Random(seed)
+    return [SessionKey(rng.choice(PROXIES), rng.choice(PROFILES), rng.choice(ACCOUNTS)) for _ in range(count)]
+
+
+def run_threads(keys: List[SessionKey], workers: int, send: Callable[[SessionKey], None]) -> float:
+    chunks = [keys[i::workers] for i in range(workers)]
+    threads = [threading.Thread(target=lambda chunk=chunk: [send(key) for key in chunk]) for chunk in chunks]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def bench_adhoc(keys: List[SessionKey], workers: int, handshake: float, latency: float) -> Dict[str, Any]:
+    handshakes = [0]
+    lock = threading.Lock()
+
+    def send(_key: SessionKey) -> None:
+        session = MockSession(EchoClient(), handshake=handshake, latency=latency)
+        session.get(API_URL)
+        session.close()
+        with lock:
+            handshakes[0] += session.handshakes
+
+    elapsed = run_threads(keys, workers, send)
+    return {"elapsed": elapsed, "handshakes": handshakes[0], "reuse_rate": 0.0}
+
+
+def bench_pool(
+    keys: List[SessionKey], workers: int, handshake: float, latency: float, max_size: int
+) -> Dict[str, Any]:
+    sessions: List[MockSession] = []
+    pool = SessionPool(
+        lambda key, jar: sessions.append(MockSession(EchoClient(), handshake, latency)) or sessions[-1],
+        max_size=max_size,
+    )
+
+    def send(key: SessionKey) -> None:
+        with pool.lease(key) as session:
+            session.get(API_URL)
+
+    elapsed = run_threads(keys, workers, send)
+    pool.close()
+    stats = pool.stats()
+    return {"elapsed": elapsed, "handshakes": sum(s.handshakes for s in sessions), **stats}
+
+
+def bench_async(keys: List[SessionKey], concurrency: int, handshake: float, latency: float) -> Dict[str, Any]:
+    sessions: List[MockAsyncSession] = []
+    client = AsyncEchoClient(latency)
+    pool = AsyncSessionPool(lambda key, jar: sessions.append(MockAsyncSession(client, handshake)) or sessions[-1])
+
+    async def worker(chunk: List[SessionKey]) -> None:
+        for key in chunk:
+            async with pool.lease(key) as session:
+                await session.get(API_URL)
+
+    async def main() -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(keys[i::concurrency]) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        await pool.close()
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    return {"elapsed": elapsed, "handshakes": sum(s.handshakes for s in sessions), **pool.stats()}
+
+
+def report(label: str, result: Dict[str, Any], requests: int, concurrency: int) -> None:
+    per_request = result["elapsed"] * concurrency / requests * 1000
+    print(
+        f"  {label:<9}: 总耗时 {result['elapsed']:.2f}s，单请求约 {per_request:.0f}ms，"
+        f"握手 {result['handshakes']} 次，复用率 {result['reuse_rate']:.0%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="会话池基准（模拟握手）")
+    parser.add_argument("--requests", type=int, default=960)
+    parser.add_argument("--workers", type=int, default=8, help="同步线程数")
+    parser.add_argument("--concurrency", type=int, default=32, help="异步协程数")
+    parser.add_argument("--handshake-ms", type=float, default=60.0)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    handshake, latency = args.handshake_ms / 1000, args.latency_ms / 1000
+    keys = request_keys(args.requests, args.seed)
+    key_count = len(set(keys))
+    print(
+        f"📦 {args.requests} 个请求轮换 {key_count} 个 (dl, impersonate, 账号)，"
+        f"握手 {args.handshake_ms:g}ms，请求 {args.latency_ms:g}ms"
+    )
+
+    adhoc = bench_adhoc(keys, args.workers, handshake, latency)
+    report("adhoc", adhoc, args.requests, args.workers)
+    pools = {}
+    for max_size in (key_count // 3, key_count):
+        pools[max_size] = bench_pool(keys, args.workers, handshake, latency, max_size)
+        report(f"pool-{max_size}", pools[max_size], args.requests, args.workers)
+    async_result = bench_async(keys, args.concurrency, handshake, latency)
+    report("async", async_result, args.requests, args.concurrency)
+
+    sized = pools[key_count]
+    print(f"\n  pool-{key_count} 总耗时为 adhoc 的 {sized['elapsed'] / adhoc['elapsed']:.0%}")
+    if sized["reuse_rate"] < 0.9 or sized["elapsed"] > adhoc["elapsed"] * 0.5:
+        raise SystemExit("❌ 会话复用未生效")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+租约任务队列基准：N 个 worker 进程共享一个 SQLite 队列抓取游标链 task（每页模拟一次请求延迟）。
+
+- scale-N ：N 个进程从队列领取 task，对比 1 个进程的吞吐
+- kill    ：运行中 SIGKILL 一个 worker，其持有的 task 在租约过期后由其他 worker 从已保存的进度接手；
+            校验全部 task 恰好完成一次、输出无缺失（重复行只来自被杀 worker 最后一页已写出但进度未保存的部分）
+
+每页先组提交数据再 save_progress()，进度不超前于已落盘数据。
+
+用法：python benchmarks/task_queue_bench.py --tasks 48 --pages 4 --latency-ms 25
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from jsonl_sink import JsonlSink  # noqa: E402
+from smoke_test import read_jsonl_ids  # noqa: E402
+from task_queue import DONE, Lease, LeaseLost, TaskQueue, run_worker  # noqa: E402
+
+ITEMS_PER_PAGE = 5
+
+
+def worker_main(db: str, out_dir: str, worker: str, args: argparse.Namespace, results: Any) -> None:
+    queue = TaskQueue(Path(db), lease_seconds=args.lease)
+    sink = JsonlSink(Path(out_dir) / f"{worker}.jsonl")
+
+    def handle(lease: Lease) -> Dict[str, Any]:
+        state = lease.progress or {"page": 0, "saved": 0}
+        while state["page"] < args.pages:
+            if lease.lost.is_set():
+                raise LeaseLost(lease.task_id)
+            time.sleep(args.latency_ms / 1000)  # 模拟一次请求
+            items = [{"id": f"{lease.task_id}-{state['page']}-{i}"} for i in range(ITEMS_PER_PAGE)]
+            sink.write_many(items)
+            sink.commit()
+            state = {"page": state["page"] + 1, "saved": state["saved"] + len(items)}
+            if not queue.save_progress(lease, state):
+                raise LeaseLost(lease.task_id)
+        return state
+
+    completed = run_worker(queue, worker, handle, poll_interval=args.lease / 4)
+    sink.close()
+    queue.close()
+    results.put((worker, completed))
+
+
+def run(root: Path, args: argparse.Namespace, workers: int, kill_after: Optional[float] = None) -> Dict[str, Any]:
+    root.mkdir(parents=True)
+    db = root / "queue.db"
+    queue = TaskQueue(db, lease_seconds=args.lease)
+    queue.enqueue((f"task_{i:03d}", {"pages": args.pages}) for i in range(args.tasks))
+    queue.close()
+
+    results: Any = mp.Queue()
+    procs = [
+        mp.Process(target=worker_main, args=(str(db), str(root), f"w{i}", args, results)) for i in range(workers)
+    ]
+    started = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    if kill_after is not None:
+        time.sleep(kill_after)
+        procs[0].kill()
+    reported = [results.get() for _ in range(workers - (1 if kill_after is not None else 0))]
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - started
+
+    queue = TaskQueue(db, lease_seconds=args.lease)
+    counts = queue.counts()
+    owners = Counter(queue.get(f"task_{i:03d}")["owner"] for i in range(args.tasks))
+    reassigned = sum(1 for i in range(args.tasks) if queue.get(f"task_{i:03d}")["attempts"] > 1)
+    queue.close()
+    ids: List[str] = []
+    for i in range(workers):
+        ids.extend(read_jsonl_ids(root / f"w{i}.jsonl"))
+    expected = {
+        f"task_{t:03d}-{p}-{i}" for t in range(args.tasks) for p in range(args.pages) for i in range(ITEMS_PER_PAGE)
+    }
+    if counts[DONE] != args.tasks or set(ids) != expected:
+        raise SystemExit(f"❌ 队列未全部完成或输出缺失：{counts}")
+    # 被杀的 worker 无法回报，其完成数以队列中的 owner 为准
+    killed_done = owners["w0"] if kill_after is not None else 0
+    if sum(done for _, done in reported) + killed_done != args.tasks:
+        raise SystemExit("❌ 完成标记次数与 task 数不符")
+    return {"elapsed": elapsed, "duplicates": len(ids) - len(expected), "owners": owners, "reassigned": reassigned}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="租约任务队列多进程基准")
+    parser.add_argument("--tasks", type=int, default=48)
+    parser.add_argument("--pages", type=int, default=4, help="每个 task 的页数")
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    parser.add_argument("--lease", type=float, default=0.6, help="租期（秒）")
+    args = parser.parse_args()
+
+    serial = args.tasks * args.pages * args.latency_ms / 1000
+    print(
+        f"📦 {args.tasks} 个 task × {args.pages} 页，请求延迟 {args.latency_ms:g}ms（单进程理论 {serial:.2f}s），"
+        f"租期 {args.lease:g}s"
+    )
+    with tempfile.TemporaryDirectory(prefix="pc-queue-bench-") as tmp:
+        root = Path(tmp)
+        scaled = {}
+        for workers in (1, 2, 4, 8):
+            result = scaled[workers] = run(root / f"scale-{workers}", args, workers)
+            print(
+                f"  scale-{workers:<2}: {result['elapsed']:5.2f}s（{scaled[1]['elapsed'] / result['elapsed']:4.1f}x，"
+                f"理想 {workers}x），各 worker 完成 {sorted(result['owners'].values())}"
+            )
+
+        killed = run(root / "kill", args, 4, kill_after=serial / 4 / 3)
+        print(
+            f"  kill     : {killed['elapsed']:5.2f}s，w0 被杀后 {killed['reassigned']} 个 task 转交，"
+            f"重复行 {killed['duplicates']}，各 worker 完成 {dict(sorted(killed['owners'].items()))}"
+        )
+
+    speedup = scaled[1]["elapsed"] / scaled[8]["elapsed"]
+    print(f"\n  8 进程为单进程的 {speedup:.1f}x；杀掉 worker 后全部 task 恰好完成一次、输出无缺失")
+    if speedup < 4:
+        raise SystemExit("❌ 多进程未随 worker 数扩展")
+    if not killed["reassigned"] or killed["duplicates"] > killed["reassigned"] * ITEMS_PER_PAGE:
+        raise SystemExit("❌ 被杀 worker 的 task 未转交或重复超出一页")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+时间窗口分片基准：多年时间窗口上的偏斜数据（越近越密 + 一段突发），单窗口逐页 vs 分片并行。
+
+- linear   ：整个窗口一次查询逐页翻到底（接口不限翻页深度时的顺序遍历）
+- linear-K ：同一查询 K 页并发窗口（pagination.py），但接口限制单次查询最多 page_cap 页，只能取到开头一段
+- sharded  ：同样的翻页上限下，ShardPlanner 探测 total 后二分 / 合并，分片并行
+
+请求延迟 = latency + depth × (页码 - 1)，模拟深翻页越来越慢。
+
+用法：python benchmarks/time_shards_bench.py --rows 10000 --latency-ms 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+EXAMPLES_DIR = Path(__file__).resolve().parent.parent / "examples"
+sys.path.insert(0, str(EXAMPLES_DIR))
+
+from async_crawler import AsyncDemoCrawler, CrawlTask  # noqa: E402
+from mock_clients import API_URL, AsyncTimeRangeMockClient, skewed_timestamps  # noqa: E402
+from time_shards import ShardPlanner  # noqa: E402
+
+PAGE_SIZE = 100
+YEARS = 5
+SPAN = YEARS * 365 * 86400
+
+
+def bench(
+    root: Path,
+    timestamps: List[int],
+    args: argparse.Namespace,
+    fanout: int,
+    planner: Optional[ShardPlanner],
+    capped: bool = True,
+) -> Dict[str, Any]:
+    client = AsyncTimeRangeMockClient(
+        timestamps,
+        latency=args.latency_ms / 1000,
+        page_cap=args.page_cap if capped else None,
+        depth_latency=args.depth_ms / 1000,
+    )
+    crawler = AsyncDemoCrawler(
+        client=client,
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        max_in_flight=args.concurrency,
+        per_host=args.concurrency,
+        fanout=fanout,
+        sharder=planner,
+    )
+    params = {"start_time": 0, "end_time": SPAN, "page": 1, "limit": PAGE_SIZE}
+    started = time.perf_counter()
+    asyncio.run(crawler.run([CrawlTask("events", API_URL, params)]))
+    elapsed = time.perf_counter() - started
+    if len({item["id"] for item in crawler.results}) != len(crawler.results):
+        raise SystemExit("❌ 输出重复")
+    return {
+        "elapsed": elapsed,
+        "requests": client.calls,
+        "peak": client.peak_in_flight,
+        "coverage": len(crawler.results) / len(timestamps),
+        "stats": planner.stats["events"] if planner is not None else None,
+    }
+
+
+def report(label: str, result: Dict[str, Any], baseline: float) -> None:
+    line = (
+        f"  {label:<9}: {result['elapsed']:6.2f}s（{baseline / result['elapsed']:4.1f}x），"
+        f"请求 {result['requests']}，在途峰值 {result['peak']}，取到 {result['coverage']:.0%}"
+    )
+    stats = result["stats"]
+    if stats is not None:
+        line += f"，分片 {stats.shards}（探测 {stats.probes}、二分 {stats.splits}、合并 {stats.merges}）"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="时间窗口分片基准")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--depth-ms", type=float, default=0.2, help="每深一页增加的延迟")
+    parser.add_argument("--page-cap", type=int, default=20, help="单次查询最多可翻的页数（linear 不受限）")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    timestamps = skewed_timestamps(args.rows, 0, SPAN)
+    print(
+        f"📦 {YEARS} 年窗口 {args.rows} 条（每页 {PAGE_SIZE} 条，越近越密 + 突发），请求延迟 {args.latency_ms:g}ms"
+        f" + 每页深度 {args.depth_ms:g}ms，单次查询最多 {args.page_cap} 页，并发 {args.concurrency}"
+    )
+    with tempfile.TemporaryDirectory(prefix="pc-shard-bench-") as tmp:
+        root = Path(tmp)
+        linear = bench(root / "linear", timestamps, args, 1, None, capped=False)
+        report("linear", linear, linear["elapsed"])
+        windowed = bench(root / "window", timestamps, args, args.concurrency, None)
+        report(f"linear-{args.concurrency}", windowed, linear["elapsed"])
+        planner = ShardPlanner(concurrency=args.concurrency, page_cap=args.page_cap)
+        sharded = bench(root / "sharded", timestamps, args, 1, planner)
+        report("sharded", sharded, linear["elapsed"])
+
+    speedup = linear["elapsed"] / sharded["elapsed"]
+    print(
+        f"\n  分片并行为单窗口逐页的 {speedup:.1f}x；翻页上限下单窗口只取到 {windowed['coverage']:.0%}，"
+        f"分片取到 {sharded['coverage']:.0%}"
+    )
+    if speedup < 3 or sharded["coverage"] < 1 or sharded["stats"].capped:
+        raise SystemExit("❌ 分片未生效")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+pc 异步并发抓取引擎：多 task 游标并行，每 host 信号量 + 全局在途上限；offset / page 分页按窗口并发；
+带时间 / ID 区间参数的 task 可按 ShardPlanner 拆成子窗口并行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from checkpoint_store import CheckpointStore
+from dedup_index import DedupIndex
+from http_cache import HttpCache, cache_key
+from jsonl_sink import JsonlSink
+from pagination import CURSOR, PageStyle, WindowStats, aiter_pages, detect_page_style, payload_total
+from rate_limiter import RateLimiter
+from retry_scheduler import RETRYABLE_STATUS, retry_delay
+from segment_sink import SegmentedSink, SegmentPolicy
+from serializer import Serializer
+from session_pool import AsyncSessionPool, SessionKey
+from time_shards import ShardPlanner
+
+
+@dataclass
+class CrawlTask:
+    """单个 task 游标链：task_id 对应进度文件 tasks 中的一项。"""
+
+    task_id: str
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    account: Optional[str] = None  # 限速按 (host, 账号) 分桶
+
+
+def new_task_progress() -> Dict[str, Any]:
+    """生成与 error-checkpoint.md 进度文件结构一致的初始 task 进度。"""
+    return {
+        "cursor": None,
+        "page": 0,
+        "saved": 0,
+        "has_next": True,
+        "completed": False,
+        "last_error": None,
+        "retry_count": 0,
+    }
+
+
+class HostLimiter:
+    """并发闸门：先占 host 槽位再占全局槽位，避免慢 host 占满全局在途额度。"""
+
+    def __init__(self, max_in_flight: int = 16, per_host: int = 4) -> None:
+        # 信号量需在事件循环内创建，因此只能在协程中实例化
+        self._global = asyncio.Semaphore(max_in_flight)
+        self._per_host = per_host
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = asyncio.Semaphore(self._per_host)
+            self._hosts[host] = sem
+        return sem
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """占用一个请求槽位，退出时释放。"""
+        async with self._host_semaphore(urlsplit(url).netloc):
+            async with self._global:
+                yield
+
+
+class AsyncDemoCrawler:
+    """异步版 DemoCrawler：并发推进多个 task 游标，429 退避只挂起当前 task。"""
+
+    def __init__(
+        self,
+        client: Any,
+        output_dir: Path,
+        checkpoint_file: Path,
+        max_in_flight: int = 16,
+        per_host: int = 4,
+        max_retries: int = 3,
+        retry_scale: float = 0.01,
+        rate_limiter: Optional[RateLimiter] = None,
+        session_pool: Optional[AsyncSessionPool] = None,
+        impersonate: str = "chrome110",
+        http_cache: Optional[HttpCache] = None,
+        fanout: int = 1,
+        sharder: Optional[ShardPlanner] = None,
+        serializer: Optional[Serializer] = None,
+        segments: Optional[SegmentPolicy] = None,
+    ) -> None:
+        self.client = client
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = CheckpointStore(checkpoint_file)
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.max_retries = max_retries
+        # 退避时长缩放系数（自检时压缩等待时间），同 DemoCrawler.backoff_scale
+        self.retry_scale = retry_scale
+        # 可与同步抓取共用同一个限速器实例；未提供时只受并发闸门约束
+        self.rate_limiter = rate_limiter
+        # 提供会话池时请求经按 (dl, impersonate, 账号) 共享的异步会话发出，client 不再使用
+        self.session_pool = session_pool
+        self.impersonate = impersonate
+        # 协商缓存（磁盘读写为同步调用，单条响应体很小，直接在事件循环内执行）
+        self.http_cache = http_cache
+        # offset / page 分页的并发窗口页数（同时受 per_host 约束）；1 时逐页推进
+        self.fanout = fanout
+        self.window_stats: Dict[str, WindowStats] = {}
+        # 时间 / ID 区间分片：根 task 先探测并展开为分片 task，再与其他 task 一起并发
+        self.sharder = sharder
+        # JSONL 序列化后端，默认标准库；提供 segments 时输出到 output/data/ 分段目录
+        if segments is None:
+            self.sink = JsonlSink(self.output_dir / "data.jsonl", serializer=serializer)
+        else:
+            self.sink = SegmentedSink(self.output_dir / "data", segments, serializer=serializer)
+        # 与 DemoCrawler 共用去重索引格式：重爬时 304 页的条目、断点之后重抓的条目按 id 过滤
+        self.dedup = DedupIndex(self.output_dir / "data.idx", data_path=self.sink.path)
+        self.results: List[Dict[str, Any]] = []
+        self.limiter: Optional[HostLimiter] = None
+
+    async def run(self, tasks: List[CrawlTask]) -> None:
+        """并发执行全部 task，已完成的 task 直接跳过。"""
+        self.limiter = HostLimiter(self.max_in_flight, self.per_host)
+        try:
+            if self.sharder is not None:
+                groups = await _gather_or_cancel([self._shard(task) for task in tasks])
+                tasks = [shard for group in groups for shard in group]
+            await _gather_or_cancel([self._run_task(task) for task in tasks])
+        finally:
+            self.sink.close()
+            self.dedup.commit(self.sink.durable_bytes)
+            self.dedup.close()
+            self.checkpoint.close()
+            if self.session_pool is not None:
+                await self.session_pool.close()
+            if self.http_cache is not None:
+                self.http_cache.close()
+
+    async def _shard(self, task: CrawlTask) -> List[CrawlTask]:
+        assert self.sharder is not None
+        if not self.sharder.applies(task):
+            return [task]
+        template: Dict[str, Any] = {"limit": 20, **task.params}
+
+        async def count(params: Dict[str, Any]) -> Optional[int]:
+            # 探测请求的 429 退避计数不记入任何分片的进度
+            resp, _ = await self._fetch_page(task, params, new_task_progress())
+            return None if resp is None else payload_total(resp.json())
+
+        return await self.sharder.shard(task, template, detect_page_style(template), count, self.checkpoint)
+
+    async def _run_task(self, task: CrawlTask) -> None:
+        state = dict(self.checkpoint.get_task(task.task_id) or new_task_progress())
+        if state["completed"]:
+            return
+
+        template: Dict[str, Any] = {"limit": 20, **task.params}
+        style = detect_page_style(template)
+        if style.mode != CURSOR:
+            await self._run_windowed(task, template, style, state)
+        else:
+            await self._run_cursor(task, template, state)
+
+    async def _run_cursor(self, task: CrawlTask, template: Dict[str, Any], state: Dict[str, Any]) -> None:
+        fetch = asyncio.ensure_future(self._fetch_page(task, self._cursor_params(template, state["cursor"]), state))
+        try:
+            while True:
+                resp, status = await fetch
+                if resp is None:
+                    self._fail(task, state, status)
+                    return
+
+                data = resp.json()
+                cursor = data.get("next_cursor")
+                if cursor is not None:
+                    # 先发出下一页请求再写出本页，写盘与断点提交和下一页的网络等待重叠
+                    params = self._cursor_params(template, cursor)
+                    fetch = asyncio.ensure_future(self._fetch_page(task, params, state))
+                    await asyncio.sleep(0)
+                self._record_page(task, state, resp, data, cursor)
+                if cursor is None:
+                    return
+        finally:
+            # 本 task 被取消或出错时，预取的下一页不能在 run() 关闭输出后继续执行
+            fetch.cancel()
+
+    async def _run_windowed(
+        self, task: CrawlTask, template: Dict[str, Any], style: PageStyle, state: Dict[str, Any]
+    ) -> None:
+        """K 页并发窗口，结果按页序写出；断点 cursor 记录下一页的 index。"""
+        failed_status = [0]
+
+        async def fetch(params: Dict[str, Any]) -> Optional[Any]:
+            resp, status = await self._fetch_page(task, params, state)
+            if resp is None:
+                failed_status[0] = status
+            return resp
+
+        stats = self.window_stats[task.task_id] = WindowStats()
+        start = int(state["cursor"] or 0)
+        async for page in aiter_pages(fetch, style, template, self.fanout, start, stats):
+            if page.response is None:
+                self._fail(task, state, failed_status[0])
+                return
+            self._record_page(task, state, page.response, page.payload, None if page.done else str(page.index + 1))
+        if not state["completed"]:
+            # 末页恰为整页、由 total 推出结束
+            state.update(cursor=None, has_next=False, completed=True)
+            self._save_checkpoint(task.task_id, state)
+
+    @staticmethod
+    def _cursor_params(template: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+        return {**template, "cursor": cursor} if cursor else dict(template)
+
+    def _record_page(
+        self, task: CrawlTask, state: Dict[str, Any], resp: Any, data: Dict[str, Any], cursor: Optional[str]
+    ) -> None:
+        # 304 换来的缓存页同样写出条目（上次可能在写出前崩溃，或输出目录是新的），重复的由去重索引过滤
+        saved = self._save_items(data.get("items", []))
+        state["cursor"] = cursor
+        state["page"] += 1
+        state["saved"] += saved
+        state["has_next"] = cursor is not None
+        state["completed"] = cursor is None
+        state["last_error"] = None
+        # 同 DemoCrawler：重试次数按页计，本页成功即清零
+        state["retry_count"] = 0
+        self._save_checkpoint(task.task_id, state)
+
+    def _fail(self, task: CrawlTask, state: Dict[str, Any], status: int) -> None:
+        state["last_error"] = f"HTTP {status}" if status else "连接失败"
+        self._save_checkpoint(task.task_id, state)
+
+    async def _fetch_page(
+        self, task: CrawlTask, params: Dict[str, Any], state: Dict[str, Any]
+    ) -> Tuple[Optional[Any], int]:
+        assert self.limiter is not None
+        status = 0
+        for attempt in range(self.max_retries + 1):
+            # 先等令牌再占槽位，等待令牌期间不占用并发额度
+            ticket = None
+            if self.rate_limiter is not None:
+                ticket = await self.rate_limiter.acquire_async(task.url, task.account)
+            try:
+                async with self.limiter.slot(task.url):
+                    resp = await self._send(task, params)
+            except OSError:
+                # 连接失败、超时（asyncio.TimeoutError 也是 OSError）：不回报限速器，退避后重试
+                resp, status = None, 0
+            else:
+                status = resp.status_code
+                if ticket is not None:
+                    self.rate_limiter.feedback(ticket, status, resp.headers)
+                if status == 200:
+                    return resp, status
+            # 与同步爬虫相同：连接失败与 RETRYABLE_STATUS（429 / 5xx）重试，其余状态直接失败
+            if (status != 0 and status not in RETRYABLE_STATUS) or attempt == self.max_retries:
+                break
+
+            # 退避期间已释放槽位，其他 task 可继续占用；有限速器时 429 由其按 Retry-After 暂停该 host
+            state["retry_count"] += 1
+            if self.rate_limiter is None or status != 429:
+                # 429 走 handle_429（Retry-After 秒数或 HTTP 日期），连接失败与 5xx 走指数退避
+                headers = resp.headers if resp is not None else None
+                await asyncio.sleep(retry_delay(status, headers, attempt) * self.retry_scale)
+        return None, status
+
+    async def _send(self, task: CrawlTask, params: Dict[str, Any]) -> Any:
+        if self.http_cache is None:
+            return await self._get(task, params, None)
+        key = cache_key(task.url, params, task.account)
+        resp = await self._get(task, params, self.http_cache.request_headers(key))
+        return self.http_cache.resolve(key, resp)
+
+    async def _get(self, task: CrawlTask, params: Dict[str, Any], headers: Optional[Dict[str, str]]) -> Any:
+        kwargs: Dict[str, Any] = {"params": params}
+        if headers:
+            kwargs["headers"] = headers
+        if self.session_pool is None:
+            return await self.client.get(task.url, **kwargs)
+        async with self.session_pool.lease(SessionKey(None, self.impersonate, task.account)) as session:
+            return await session.get(task.url, **kwargs)
+
+    def _save_items(self, items: List[Dict[str, Any]]) -> int:
+        """写出去重后的条目并返回条数；单线程事件循环内同步写入，多个 task 的行不会交错。"""
+        # 有 id 的记录按去重索引过滤，无 id 的记录照常写入
+        fresh = [item for item in items if item.get("id") is None or self.dedup.add(item["id"])]
+        self.sink.write_many(fresh)
+        self.results.extend(fresh)
+        return len(fresh)
+
+    def _save_checkpoint(self, task_id: str, state: Dict[str, Any]) -> None:
+        # 断点不能超前于已落盘数据；WAL 只追加当前 task 一行
+        self.sink.commit()
+        self.dedup.commit(self.sink.durable_bytes)
+        self.checkpoint.update_task(task_id, state)
+
+
+async def _gather_or_cancel(coros: List[Any]) -> List[Any]:
+    """
+    并发执行并按顺序返回结果；任一协程抛出异常（或本身被取消）时，先取消并等待其余协程退出再抛出，
+    调用方随后在 finally 中关闭输出与断点时不会再有写入。
+    """
+    futures = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*futures)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        await asyncio.gather(*futures, return_exceptions=True)
+        raise
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""pc 增量断点存储：snapshot + 追加式 task 增量日志（WAL），定期压缩。"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CheckpointStore:
+    """
+    增量断点存储，进度结构与 error-checkpoint.md 的 progress 文件一致。
+
+    - update_task() 只向 `<progress>.wal` 追加一行该 task 的完整状态，写入量与 task 总数无关
+    - WAL 行数达到 compact_every 时压缩：原子写 snapshot，再截断 WAL
+    - 启动时加载 snapshot 并重放 WAL 尾部；每行是完整 task 状态，重放幂等
+    - 崩溃导致的半行只可能出现在 WAL 末尾，加载时丢弃；丢弃过字节时同样压缩、清空 WAL，
+      否则之后追加的行都接在半行之后，下次重放在半行处停止而全部丢失
+    """
+
+    def __init__(self, path: Path, compact_every: int = 1000) -> None:
+        self.path = path
+        self.wal_path = path.with_suffix(path.suffix + ".wal")
+        self.compact_every = compact_every
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data = self._load_snapshot()
+        self.wal_records, torn = self._replay_wal()
+        if self.wal_records or torn:
+            self.compact()
+        self._wal = open(self.wal_path, "ab", buffering=0)
+        self.bytes_written = 0
+
+    # ===== 读取 =====
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """获取 task 进度（不存在返回 None）。"""
+        return self.data["tasks"].get(task_id)
+
+    def list_incomplete_tasks(self) -> List[str]:
+        """列出未完成的 task。"""
+        return [tid for tid, state in self.data["tasks"].items() if not state.get("completed")]
+
+    # ===== 写入 =====
+
+    def update_task(self, task_id: str, state: Dict[str, Any]) -> None:
+        """记录 task 最新状态：追加一行 WAL，必要时触发压缩。"""
+        record = dict(state)
+        record["updated_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        self.data["tasks"][task_id] = record
+
+        line = json.dumps({"task_id": task_id, "state": record}, ensure_ascii=False) + "\n"
+        payload = line.encode("utf-8")
+        self._wal.write(payload)
+        self.bytes_written += len(payload)
+        self.wal_records += 1
+        if self.wal_records >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        """把当前内存状态原子写成 snapshot，然后截断 WAL。"""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.path)
+        # snapshot 已包含全部 WAL 内容；截断前崩溃只会导致下次重放幂等记录
+        with open(self.wal_path, "wb"):
+            pass
+        self.wal_records = 0
+
+    def close(self) -> None:
+        """压缩并关闭 WAL 句柄，snapshot 即为最终进度文件。"""
+        if self._wal.closed:
+            return
+        self.compact()
+        self._wal.close()
+
+    def abort(self) -> None:
+        """不压缩直接关闭（模拟崩溃）。"""
+        self._wal.close()
+
+    # ===== 加载 =====
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            data.setdefault("tasks", {})
+            return data
+        return {"version": 1, "tasks": {}}
+
+    def _replay_wal(self) -> Tuple[int, bool]:
+        """重放 WAL，返回 (重放行数, 是否丢弃了末尾半行)。"""
+        if not self.wal_path.exists():
+            return 0, False
+        replayed, raw = 0, b"\n"
+        with open(self.wal_path, "rb") as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    return replayed, True  # 末尾半行：崩溃时未写完，丢弃
+                self.data["tasks"][entry["task_id"]] = entry["state"]
+                replayed += 1
+        # 末行完整但缺换行：内容已重放，WAL 仍需清空，否则下一行会接在其后
+        return replayed, not raw.endswith(b"\n")
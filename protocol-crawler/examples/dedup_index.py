@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""pc 持久化去重索引：定长开放寻址哈希表（mmap），续跑时只加载索引不扫描 JSONL。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Optional, Set, Tuple
+
+from segment_sink import iter_lines, logical_size
+
+MAGIC = b"PCDX"
+VERSION = 1
+# magic, version, 保留, capacity, count, 已收录的数据文件字节数
+HEADER = struct.Struct("<4sHHQQQ")
+SLOT = struct.Struct("<Q")
+MAX_LOAD = 0.7
+CATCH_UP_BATCH = 1 << 20
+GROW_CHUNK = 1 << 16  # 扩容时每次从旧表读出的槽数
+
+
+def fingerprint(item_id: Any) -> int:
+    """id → 64 位指纹（0 保留为空槽）。"""
+    digest = hashlib.blake2b(str(item_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class DedupIndex:
+    """
+    与 JSONL 输出配套的持久化去重索引。
+
+    - 文件 = 定长 header + capacity 个 8 字节指纹槽，线性探测，mmap 访问，常驻内存只有被访问的页
+    - add() 只进入内存 pending 集合；commit() 在数据 fsync 之后才写入表，保证索引不超前于已落盘数据
+    - header 记录已收录的数据文件字节数：打开时只补扫数据尾部；数据比索引短则整体重建
+    - data_path 可以是 JSONL 文件或 SegmentedSink 的段目录（字节数按逻辑偏移计）
+    - 装载率超过 MAX_LOAD 时容量翻倍，旧表逐块散列进新文件，额外内存与表大小无关
+    - 只存 64 位指纹：两个不同 id 指纹相同时，后到的新记录会被当作重复丢弃。n 条记录中出现碰撞的概率
+      约 n² / 2⁶⁵（5000 万条约 7e-5）；不能接受任何漏写时，应在下游按 id 原文复核
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        data_path: Optional[Path] = None,
+        capacity: int = 1 << 16,
+        id_field: str = "id",
+    ) -> None:
+        self.path = path
+        self.id_field = id_field
+        self._pending: Set[int] = set()
+        if not path.exists():
+            self._create(path, _round_capacity(capacity))
+        self._open()
+        if data_path is not None:
+            self._catch_up(data_path)
+
+    # ===== 查询与写入 =====
+
+    def __contains__(self, item_id: Any) -> bool:
+        key = fingerprint(item_id)
+        return key in self._pending or self._probe(key)[1]
+
+    def __len__(self) -> int:
+        return self.count + len(self._pending)
+
+    def add(self, item_id: Any) -> bool:
+        """登记 id，返回是否为新 id。"""
+        key = fingerprint(item_id)
+        if key in self._pending or self._probe(key)[1]:
+            return False
+        self._pending.add(key)
+        return True
+
+    def commit(self, data_size: int) -> None:
+        """把 pending 写入表并记录数据文件字节数；必须在数据 fsync 之后调用。"""
+        if (self.count + len(self._pending)) > self.capacity * MAX_LOAD:
+            self._grow(self.count + len(self._pending))
+        for key in self._pending:
+            offset, found = self._probe(key)
+            if not found:
+                SLOT.pack_into(self._mm, offset, key)
+                self.count += 1
+        self._pending.clear()
+        self.data_size = data_size
+        self._write_header()
+        self._mm.flush()
+
+    def close(self) -> None:
+        """关闭索引（未 commit 的 pending 直接丢弃）。"""
+        if self._mm.closed:
+            return
+        self._mm.close()
+        self._file.close()
+
+    # ===== 内部实现 =====
+
+    def _probe(self, key: int) -> Tuple[int, bool]:
+        return _probe(self._mm, self.capacity, key)
+
+    @staticmethod
+    def _create(path: Path, capacity: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, capacity, 0, 0))
+            f.truncate(HEADER.size + capacity * SLOT.size)
+
+    def _open(self) -> None:
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, version, _reserved, capacity, count, data_size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"去重索引格式不匹配：{self.path}")
+        self.capacity = capacity
+        self.count = count
+        self.data_size = data_size
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, 0, self.capacity, self.count, self.data_size)
+
+    def _grow(self, needed: int) -> None:
+        """扩容：逐块读旧表，键直接散列进新文件的 mmap，完成后原子替换；不在内存中收集全部键。"""
+        capacity = self.capacity
+        while needed > capacity * MAX_LOAD:
+            capacity *= 2
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        self._create(tmp, capacity)
+        with open(tmp, "r+b") as f, mmap.mmap(f.fileno(), 0) as new:
+            count = 0
+            step = GROW_CHUNK * SLOT.size
+            end = HEADER.size + self.capacity * SLOT.size
+            for start in range(HEADER.size, end, step):
+                for (key,) in SLOT.iter_unpack(self._mm[start : min(start + step, end)]):
+                    if key:
+                        SLOT.pack_into(new, _probe(new, capacity, key)[0], key)
+                        count += 1
+            HEADER.pack_into(new, 0, MAGIC, VERSION, 0, capacity, count, self.data_size)
+            new.flush()
+        self.close()
+        os.replace(tmp, self.path)
+        self._open()
+
+    def _reset(self) -> None:
+        self.close()
+        self._create(self.path, self.capacity)
+        self._open()
+
+    def _catch_up(self, data_path: Path) -> None:
+        """补扫索引之后新增的数据尾部（分段目录跳过已收录的整段）；数据比索引记录短时整体重建。"""
+        size = logical_size(data_path)
+        if size < self.data_size:
+            self._reset()
+        if size == self.data_size:
+            return
+        offset = self.data_size
+        for raw in iter_lines(data_path, offset):
+            offset += len(raw)
+            try:
+                item_id = json.loads(raw).get(self.id_field)
+            except ValueError:
+                continue  # 末尾半行
+            if item_id is not None:
+                self.add(item_id)
+            # 分批提交，重建大文件时 pending 不会无限增长
+            if len(self._pending) >= CATCH_UP_BATCH:
+                self.commit(offset)
+        self.commit(size)
+
+
+def _probe(mm: mmap.mmap, capacity: int, key: int) -> Tuple[int, bool]:
+    """线性探测，返回 (槽偏移, 是否已存在)。"""
+    mask = capacity - 1
+    slot = key & mask
+    while True:
+        offset = HEADER.size + slot * SLOT.size
+        current = SLOT.unpack_from(mm, offset)[0]
+        if current == 0:
+            return offset, False
+        if current == key:
+            return offset, True
+        slot = (slot + 1) & mask
+
+
+def _round_capacity(capacity: int) -> int:
+    """容量取 2 的幂，便于掩码取槽。"""
+    size = 1
+    while size < capacity:
+        size <<= 1
+    return size
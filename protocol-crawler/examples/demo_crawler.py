@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""pc 同步示例爬虫：多 task 游标交替推进（延迟堆重试）、offset / page 分页窗口、大页流式提取、去重写出与断点，可接 dl 池 / 会话池 / 协商缓存。"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from async_crawler import CrawlTask
+from checkpoint_store import CheckpointStore
+from dedup_index import DedupIndex
+from http_cache import HttpCache, cache_key
+from json_stream import StreamExtractor, value_at
+from jsonl_sink import JsonlSink
+from mock_clients import API_URL, MockClient, MockResponse
+from pagination import CURSOR, PageStyle, WindowStats, detect_page_style, iter_pages
+from proxy_pool import PROXY_FAILURE_STATUS, ProxyPool, ProxyPoolExhausted
+from rate_limiter import RateLimiter
+from retry_scheduler import RETRYABLE_STATUS, RetryScheduler, retry_delay
+from segment_sink import SegmentedSink, SegmentPolicy
+from serializer import Serializer
+from session_pool import SessionKey, SessionPool
+
+
+@dataclass
+class PageRequest:
+    """调度单元：某个 task 的下一页请求及该页已重试次数。"""
+
+    task: CrawlTask
+    cursor: Optional[str]
+    retry_count: int = 0
+
+
+DEFAULT_TASK = "default"
+
+
+class DemoCrawler:
+    """最小可运行爬虫，覆盖分页、429 重试、输出与断点写入。"""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        checkpoint_file: Path,
+        flush_records: int = 500,
+        rate_limiter: Optional[RateLimiter] = None,
+        client: Optional[Any] = None,
+        backoff_scale: float = 0.01,
+        proxy_pool: Optional[ProxyPool] = None,
+        session_pool: Optional[SessionPool] = None,
+        impersonate: str = "chrome110",
+        http_cache: Optional[HttpCache] = None,
+        fanout: int = 1,
+        pipeline: bool = False,
+        stream_items: Optional[str] = None,
+        stream_chunk: int = 64 * 1024,
+        serializer: Optional[Serializer] = None,
+        segments: Optional[SegmentPolicy] = None,
+    ) -> None:
+        self.client = client or MockClient()
+        # 提供会话池时请求经池中按 (dl, impersonate, 账号) 复用的会话发出，client 不再使用
+        self.session_pool = session_pool
+        self.impersonate = impersonate
+        # 自检压缩等待：放宽速率，Retry-After 与退避时长缩放为 1%
+        self.rate_limiter = rate_limiter or RateLimiter(rate=100.0, burst=5, max_rate=100.0, retry_after_scale=0.01)
+        self.backoff_scale = backoff_scale
+        self.proxy_pool = proxy_pool
+        # 协商缓存：重爬时带 If-None-Match / If-Modified-Since，304 页沿用缓存中的游标
+        self.http_cache = http_cache
+        # offset / page 分页的并发窗口页数；1 时逐页推进
+        self.fanout = fanout
+        if session_pool is not None and session_pool.max_per_key < fanout:
+            # 窗口内各页用同一个 key 借会话：每 key 少于 fanout 个时窗口线程排队等同一会话，并发退化为逐页
+            raise ValueError(f"session_pool.max_per_key（{session_pool.max_per_key}）需不小于 fanout（{fanout}）")
+        self.window_stats: Dict[str, WindowStats] = {}
+        self._window_status: Dict[str, int] = {}
+        # 条目所在路径（如 "data.items[*]"）：设置后 cursor 分页以 stream=True 请求，边下载边提取条目写出，
+        # 不把整页解析成 dict；有协商缓存或走分页窗口时仍整页解析，按同一路径取条目
+        self.stream_items = stream_items
+        self.stream_chunk = stream_chunk
+        # pipeline 时条目写出与断点提交交给单个写线程，抓取线程解析出游标即发下一页
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="pc-writer") if pipeline else None
+        self._write_error: Optional[BaseException] = None
+        self.scheduler: RetryScheduler[PageRequest] = RetryScheduler()
+        self.failed: Dict[str, int] = {}  # 重试耗尽或不可重试的 task → 最后一次状态码
+        self.output_dir = output_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = CheckpointStore(checkpoint_file)
+        # JSONL 序列化后端，默认标准库；get_serializer("auto") 在装了 orjson / msgspec 时换快后端
+        if segments is None:
+            self.sink = JsonlSink(self.output_dir / "data.jsonl", flush_records=flush_records, serializer=serializer)
+        else:
+            # 分段输出：output/data/ 下按大小 / 条数滚动并压缩已关闭的段，写入、提交与去重语义不变
+            self.sink = SegmentedSink(
+                self.output_dir / "data", segments, flush_records=flush_records, serializer=serializer
+            )
+        self.dedup = DedupIndex(self.output_dir / "data.idx", data_path=self.sink.path)
+        self.results = []
+        self.saved_base = 0  # 断点恢复时已落盘的记录数
+        self.max_retries = 3
+
+    def run(self, resume: bool = False) -> None:
+        self.run_tasks([CrawlTask(DEFAULT_TASK, API_URL)], resume=resume)
+
+    def run_tasks(self, tasks: List[CrawlTask], resume: bool = False) -> None:
+        """
+        多个 task 游标链交替推进：某个游标退避时停放在调度器中，其余 task 照常抓取。
+        offset / page 分页的 task 先逐个按 fanout 页并发窗口抓取。
+        """
+        for task in tasks:
+            cursor, retry_count, completed = self._load_checkpoint(task.task_id) if resume else (None, 0, False)
+            if completed:
+                continue
+            style = detect_page_style(self._template(task))
+            if style.mode != CURSOR:
+                self._run_windowed(task, style, int(cursor or 0))
+            else:
+                self.scheduler.submit(PageRequest(task, cursor, retry_count))
+        while self.scheduler:
+            self._step(self.scheduler.pop())
+        self._drain_writes()
+
+    @staticmethod
+    def _template(task: CrawlTask) -> Dict[str, Any]:
+        return {"limit": 20, **task.params}
+
+    def _run_windowed(self, task: CrawlTask, style: PageStyle, start: int) -> None:
+        """K 页并发窗口，结果按页序写出；断点 cursor 记录下一页的 index。"""
+        stats = self.window_stats[task.task_id] = WindowStats()
+        with ThreadPoolExecutor(self.fanout, thread_name_prefix="pc-page") as executor:
+            fetch = lambda params: self._fetch_window_page(task, params)  # noqa: E731
+            for page in iter_pages(fetch, style, self._template(task), executor, self.fanout, start, stats):
+                if page.response is None:
+                    self._fail(task.task_id, str(page.index), self._window_status.get(task.task_id, 0))
+                    continue
+                # 304 换来的缓存页同样写出条目（上次可能未写入或输出目录是新的），重复的由去重索引过滤
+                self._write(self._save_items, self._page_items(page.payload))
+                # 末页（含由 total 推出结束的整页）写完成断点，恢复时跳过该 task
+                next_index = None if page.done else str(page.index + 1)
+                self._write(self._save_checkpoint, task.task_id, next_index, 0, page.done)
+
+    def _fetch_window_page(self, task: CrawlTask, params: Dict[str, Any]) -> Optional[MockResponse]:
+        """窗口工作线程内抓取一页：阻塞式限速，失败在本线程内退避重试，不影响窗口中其他页。"""
+        status, headers = 0, None
+        for retry in range(self.max_retries + 1):
+            ticket = self.rate_limiter.acquire(task.url, task.account)
+            try:
+                resp = self._request(task, params)
+            except ProxyPoolExhausted as e:
+                time.sleep(e.retry_in * self.backoff_scale)
+                continue
+            except OSError:
+                status, headers = 0, None
+            else:
+                self.rate_limiter.feedback(ticket, resp.status_code, resp.headers)
+                status, headers = resp.status_code, resp.headers
+                if status == 200:
+                    return resp
+                proxy_failed = self.proxy_pool is not None and status in PROXY_FAILURE_STATUS
+                if status not in RETRYABLE_STATUS and not proxy_failed:
+                    break
+            time.sleep(retry_delay(status, headers, retry) * self.backoff_scale)
+        self._window_status[task.task_id] = status
+        return None
+
+    def _step(self, request: PageRequest) -> None:
+        # 限速等待同样交给调度器，不计入重试次数
+        ticket, wait = self.rate_limiter.try_acquire(request.task.url, request.task.account)
+        if ticket is None:
+            self.scheduler.defer(request, wait)
+            return
+        try:
+            resp = self._fetch_page(request)
+        except ProxyPoolExhausted as e:
+            # dl 全部隔离：等到最早一个可复检，不计入重试次数
+            self.scheduler.defer(request, e.retry_in)
+            return
+        except OSError:
+            # 连接失败、超时：不回报限速器，按指数退避重试（有 dl 池时会换一个 dl）
+            self._schedule_retry(request, 0, None)
+            return
+        self.rate_limiter.feedback(ticket, resp.status_code, resp.headers)
+        # 有 dl 池时 403 等 dl 故障也重试，下次会选到别的 dl
+        proxy_failed = self.proxy_pool is not None and resp.status_code in PROXY_FAILURE_STATUS
+        if resp.status_code in RETRYABLE_STATUS or proxy_failed:
+            self._schedule_retry(request, resp.status_code, resp.headers)
+            return
+        if resp.status_code != 200:
+            # 404 等不可重试的状态：记为失败，断点保留本页游标
+            self._fail(request.task.task_id, request.cursor, resp.status_code, request.retry_count)
+            return
+
+        if self.stream_items is not None and hasattr(resp, "iter_content"):
+            # 条目边到边写出，翻页字段在整页读完后得到
+            try:
+                data = self._stream_page(resp)
+            except (OSError, ValueError):
+                # 断流或响应体不完整：按连接失败重试本页
+                self._schedule_retry(request, 0, None)
+                return
+        else:
+            data = resp.json()
+            # 304 换来的缓存页同样写出条目，重复的由去重索引过滤
+            self._write(self._save_items, self._page_items(data))
+        cursor = data.get("next_cursor")
+        if cursor is not None:
+            self.scheduler.submit(PageRequest(request.task, cursor))
+        self._write(self._save_checkpoint, request.task.task_id, cursor, 0, cursor is None)
+
+    def _stream_page(self, resp: Any) -> Dict[str, Any]:
+        """
+        流式提取一页，返回翻页字段；中途断流时已写出的条目保留，重试本页时由去重索引过滤。
+
+        curl_cffi / requests 的响应均提供 iter_content()；异步客户端对应 aiter_content() / content.iter_chunked()。
+        """
+        extractor = StreamExtractor(self.stream_items, ("next_cursor",))
+        for chunk in resp.iter_content(chunk_size=self.stream_chunk):
+            items = extractor.feed(chunk)
+            if items:
+                self._write(self._save_items, items)
+        self._write(self._save_items, extractor.close())
+        return extractor.meta
+
+    def _page_items(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        items = value_at(data, self.stream_items) if self.stream_items else data.get("items")
+        return items or []
+
+    def _fetch_page(self, request: PageRequest) -> MockResponse:
+        params = self._template(request.task)
+        if request.cursor:
+            params["cursor"] = request.cursor
+        return self._request(request.task, params)
+
+    def _request(self, task: CrawlTask, params: Dict[str, Any]) -> MockResponse:
+        if self.proxy_pool is None:
+            return self._send(task, params, None)
+
+        proxy = self.proxy_pool.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            resp = self._send(task, params, proxy)
+            ok = resp.status_code not in PROXY_FAILURE_STATUS
+            return resp
+        finally:
+            # 任何异常都按失败回报：复检中的 dl 未回报会一直留在 _probing，不再被选中
+            self.proxy_pool.report(proxy, ok, time.monotonic() - started)
+
+    def _send(self, task: CrawlTask, params: Dict[str, Any], proxy: Optional[str]) -> MockResponse:
+        if self.http_cache is None:
+            return self._get(task, params, proxy, None)
+        key = cache_key(task.url, params, task.account)
+        resp = self._get(task, params, proxy, self.http_cache.request_headers(key))
+        return self.http_cache.resolve(key, resp)
+
+    def _get(
+        self, task: CrawlTask, params: Dict[str, Any], proxy: Optional[str], headers: Optional[Dict[str, str]]
+    ) -> MockResponse:
+        kwargs: Dict[str, Any] = {"params": params}
+        if headers:
+            kwargs["headers"] = headers
+        if self.stream_items is not None:
+            kwargs["stream"] = True
+        if self.session_pool is not None:
+            # 会话已绑定 dl，切换 dl / 账号只会换到对应的已建连会话，不必重新握手
+            with self.session_pool.lease(SessionKey(proxy, self.impersonate, task.account)) as session:
+                return session.get(task.url, **kwargs)
+        if proxy is not None:
+            kwargs["proxies"] = {"http": proxy, "https": proxy}
+        return self.client.get(task.url, **kwargs)
+
+    def _schedule_retry(
+        self, request: PageRequest, status_code: int, headers: Optional[Dict[str, str]]
+    ) -> None:
+        """按 handle_429 / 指数退避停放请求；重试次数先写入断点，重启后沿用而不是清零。"""
+        if request.retry_count >= self.max_retries:
+            self._fail(request.task.task_id, request.cursor, status_code, request.retry_count)
+            return
+        delay = retry_delay(status_code, headers, request.retry_count) * self.backoff_scale
+        request.retry_count += 1
+        self._write(self._save_checkpoint, request.task.task_id, request.cursor, request.retry_count)
+        self.scheduler.defer(request, delay)
+
+    def _fail(self, task_id: str, cursor: Optional[str], status_code: int, retry_count: int = 0) -> None:
+        """记录失败 task：断点保留失败页游标与重试次数且不标记完成，恢复时从该页重新请求。"""
+        self.failed[task_id] = status_code
+        error = f"HTTP {status_code}" if status_code else "连接失败"
+        self._write(self._save_checkpoint, task_id, cursor, retry_count, False, error)
+
+    def _write(self, fn: Callable[..., None], *args: Any) -> None:
+        """写出与断点提交：pipeline 时按提交顺序在写线程执行，某次失败后其后的写入全部跳过，保证断点不超前。"""
+        if self._writer is None:
+            fn(*args)
+            return
+        if self._write_error is not None:
+            raise self._write_error
+        self._writer.submit(self._guarded_write, fn, args)
+
+    def _guarded_write(self, fn: Callable[..., None], args: Tuple[Any, ...]) -> None:
+        if self._write_error is not None:
+            return
+        try:
+            fn(*args)
+        except BaseException as e:  # noqa: BLE001 — 交给抓取线程在下次写入 / 收尾时抛出
+            self._write_error = e
+
+    def _drain_writes(self) -> None:
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+            if self._write_error is not None:
+                raise self._write_error
+
+    def _save_items(self, items: list[Dict[str, Any]]) -> None:
+        # 有 id 的记录按去重索引过滤，无 id 的记录照常写入
+        fresh = [item for item in items if item.get("id") is None or self.dedup.add(item["id"])]
+        self.sink.write_many(fresh)
+        self.results.extend(fresh)
+
+    def _save_checkpoint(
+        self,
+        task_id: str,
+        cursor: Optional[str],
+        retry_count: int = 0,
+        completed: bool = False,
+        last_error: Optional[str] = None,
+    ) -> None:
+        # 先组提交数据再写断点，保证断点游标不超前于已落盘数据
+        count = self.saved_base + self.sink.commit()
+        self.dedup.commit(self.sink.durable_bytes)
+        state = {
+            "cursor": cursor,
+            "count": count,
+            "retry_count": retry_count,
+            "completed": completed,
+            "last_error": last_error,
+        }
+        self.checkpoint.update_task(task_id, state)
+
+    def _load_checkpoint(self, task_id: str) -> Tuple[Optional[str], int, bool]:
+        state = self.checkpoint.get_task(task_id)
+        if state is None:
+            return None, 0, False
+        # count 是写断点时的全局落盘条数，取各 task 中最大者
+        self.saved_base = max(self.saved_base, state["count"])
+        return state["cursor"], state.get("retry_count", 0), state.get("completed", False)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+        self.sink.close()
+        self.dedup.commit(self.sink.durable_bytes)
+        self.dedup.close()
+        self.checkpoint.close()
+        self.client.close()
+        if self.proxy_pool is not None:
+            self.proxy_pool.close()
+        if self.session_pool is not None:
+            self.session_pool.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
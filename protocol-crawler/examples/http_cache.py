@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+pc 协商缓存：按 URL + 参数缓存响应体与校验器（ETag / Last-Modified），304 时直接返回缓存中已解析的数据。
+
+- request_headers() 给出 If-None-Match / If-Modified-Since；resolve() 把 304 换成缓存响应，并存下带校验器的 200
+- 响应体落盘，总大小超过 max_bytes 按 LRU 淘汰；索引原子写入，下次运行沿用
+- 最近用过的条目在内存中保留解析结果，命中时免读盘、免反序列化
+- stats() 统计命中（304）、未命中（无缓存）与内容已变（带校验器请求但返回 200）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+from rate_limiter import get_header
+
+BODY_SUFFIX = ".body"
+
+
+def cache_key(url: str, params: Optional[Mapping[str, Any]] = None, vary: Optional[str] = None) -> str:
+    """缓存键：URL + 排序后的参数 + vary（如账号，不同账号看到的内容可能不同）。"""
+    query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    raw = f"{url}?{query}#{vary or ''}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0  # 304，直接使用缓存
+    misses: int = 0  # 无缓存条目，普通请求
+    changed: int = 0  # 带校验器请求，但内容已变（200）
+    stored: int = 0
+    evicted: int = 0
+    bytes_saved: int = 0  # 304 免下载的响应体字节数
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses + self.changed
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def miss_rate(self) -> float:
+        return self.misses / self.lookups if self.lookups else 0.0
+
+    @property
+    def revalidate_rate(self) -> float:
+        """带校验器发出的请求占比（命中 + 内容已变）。"""
+        return (self.hits + self.changed) / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for name in ("hit_rate", "miss_rate", "revalidate_rate"):
+            data[name] = round(getattr(self, name), 4)
+        return data
+
+
+@dataclass
+class _Entry:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    file: str
+
+
+class CachedResponse:
+    """resolve() 返回的响应：json() 直接给出已解析的数据；from_cache 表示由 304 换来，内容与上次相同。"""
+
+    def __init__(self, payload: Any, headers: Dict[str, str], from_cache: bool) -> None:
+        self.status_code = 200
+        self.payload = payload
+        self.headers = headers
+        self.from_cache = from_cache
+
+    def json(self) -> Any:
+        return self.payload
+
+
+class HttpCache:
+    """
+    磁盘协商缓存，线程安全：
+
+        headers = cache.request_headers(key)
+        resp = cache.resolve(key, client.get(url, params=params, headers=headers))
+
+    只缓存带 ETag 或 Last-Modified 的 200 响应；其他状态码原样返回，由调用方按原逻辑重试。
+    304 表示内容与上次相同（省下载与解析）；调用方仍应写出其中的条目，由去重索引过滤重复。
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 64 * 1024 * 1024,
+        memory_entries: int = 1024,
+        save_every: int = 50,
+    ) -> None:
+        self.root = root
+        self.bodies = root / "bodies"
+        self.bodies.mkdir(parents=True, exist_ok=True)
+        self.index_path = root / "index.json"
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.save_every = save_every
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()  # 最久未用在前
+        self._payloads: "OrderedDict[str, Any]" = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    # ===== 请求与响应 =====
+
+    def request_headers(self, key: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """在 headers 基础上附加缓存校验头；无缓存时原样返回副本。"""
+        merged = dict(headers or {})
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            if entry.etag:
+                merged["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                merged["If-Modified-Since"] = entry.last_modified
+        return merged
+
+    def resolve(self, key: str, resp: Any) -> Any:
+        """304 换成缓存响应，200 解析并存储；其他状态码（或 304 时条目恰被淘汰）原样返回。"""
+        if resp.status_code == 304:
+            with self._lock:
+                cached = self._hit_locked(key)
+            return cached if cached is not None else resp
+        if resp.status_code != 200:
+            return resp
+
+        payload = resp.json()
+        content = getattr(resp, "content", None)
+        if not isinstance(content, (bytes, bytearray)):
+            content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = dict(resp.headers or {})
+        with self._lock:
+            if key in self._entries:
+                self._stats.changed += 1
+            else:
+                self._stats.misses += 1
+            self._store_locked(key, headers, bytes(content), payload)
+        return CachedResponse(payload, headers, from_cache=False)
+
+    def _hit_locked(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        payload = self._payloads.get(key)
+        if payload is None:
+            # 内存中没有（如重启后）才读盘解析一次
+            try:
+                payload = json.loads((self.bodies / entry.file).read_bytes())
+            except FileNotFoundError:
+                self._drop_locked(key)
+                return None
+        self._entries.move_to_end(key)
+        self._remember_locked(key, payload)
+        self._stats.hits += 1
+        self._stats.bytes_saved += entry.size
+        validators = (("ETag", entry.etag), ("Last-Modified", entry.last_modified))
+        headers = {name: value for name, value in validators if value}
+        return CachedResponse(payload, headers, from_cache=True)
+
+    # ===== 存储与淘汰 =====
+
+    def _store_locked(self, key: str, headers: Dict[str, str], content: bytes, payload: Any) -> None:
+        etag = get_header(headers, "ETag")
+        last_modified = get_header(headers, "Last-Modified")
+        if (not etag and not last_modified) or len(content) > self.max_bytes:
+            # 不可协商或单条超过上限：旧条目已过期，一并删除
+            self._drop_locked(key)
+            return
+        # 文件名带校验器摘要：覆盖写入的是新文件，崩溃后旧索引不会把新内容当成旧校验器的缓存
+        tag = hashlib.sha256(f"{etag}|{last_modified}".encode("utf-8")).hexdigest()[:8]
+        entry = _Entry(etag, last_modified, len(content), f"{key}-{tag}{BODY_SUFFIX}")
+        # 写到一半崩溃的文件不会出现在已保存的索引中（索引总在写完之后保存），启动时作为孤儿清理
+        (self.bodies / entry.file).write_bytes(content)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+            if old.file != entry.file:
+                (self.bodies / old.file).unlink(missing_ok=True)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._remember_locked(key, payload)
+        self._stats.stored += 1
+        while self._bytes > self.max_bytes:
+            self._drop_locked(next(iter(self._entries)))
+            self._stats.evicted += 1
+        self._mark_dirty()
+
+    def _remember_locked(self, key: str, payload: Any) -> None:
+        self._payloads[key] = payload
+        self._payloads.move_to_end(key)
+        while len(self._payloads) > self.memory_entries:
+            self._payloads.popitem(last=False)
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        self._payloads.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        (self.bodies / entry.file).unlink(missing_ok=True)
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self._save_locked()
+
+    # ===== 统计与持久化 =====
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats.as_dict(), "entries": len(self._entries), "bytes": self._bytes}
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def close(self) -> None:
+        self.save()
+
+    def _save_locked(self) -> None:
+        # 缓存丢失只会多一次完整下载，不做 fsync
+        rows = {key: [e.etag, e.last_modified, e.size, e.file] for key, e in self._entries.items()}
+        data = {"version": 1, "entries": rows}
+        tmp = self.index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.index_path)
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        """按 LRU 顺序恢复索引；丢弃缺文件的条目，清理索引外的孤儿文件（上次崩溃前未保存的写入）。"""
+        saved: Dict[str, Any] = {}
+        if self.index_path.exists():
+            saved = json.loads(self.index_path.read_text(encoding="utf-8")).get("entries", {})
+        for key, row in saved.items():
+            entry = _Entry(*row)
+            if (self.bodies / entry.file).exists():
+                self._entries[key] = entry
+                self._bytes += entry.size
+        known = {entry.file for entry in self._entries.values()}
+        for path in self.bodies.iterdir():
+            if path.name not in known:
+                path.unlink(missing_ok=True)
+        while self._bytes > self.max_bytes:
+            self._drop_locked(next(iter(self._entries)))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+pc 流式 JSON 提取：大响应（几十 / 几百 MB 的单页）边下载边产出条目，不把整页解析成 dict。
+
+- item_path 指定条目所在数组，如 "data.items[*]"、"items[*]"、"[*]"（根数组）
+- fields 指定顺带提取的翻页字段，如 "next_cursor"、"data.page_info.end_cursor"，整页读完后在 meta 中
+- 只在通往条目数组的路径上逐字符跟踪结构；每个条目（及路径外的其他值）整体交给 json 的 C 解码器，
+  解析速度与 json.loads 相当，内存只与单个条目和分块大小有关
+- 路径外的大值（如与条目并列的巨大数组）仍需完整缓冲后解码一次
+- 仅依赖标准库；条目数组之外的内容不校验重复 key 等细节
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+_WS = re.compile(r"[ \t\n\r]*")
+_NUMBER_START = "-0123456789"
+_NUMBER_CHARS = re.compile(r"[-+0-9.eE]*")
+
+_OBJ, _ARR = "{", "["
+_KEY, _COLON, _VALUE, _NEXT = range(4)
+
+Path = Tuple[str, ...]
+
+
+def parse_path(path: str) -> Path:
+    """"data.items[*]" → ("data", "items", "*")；键名中不能含 "." 或 "["。"""
+    parts: List[str] = []
+    for part in path.split("."):
+        name, _, rest = part.partition("[")
+        if name:
+            parts.append(name)
+        parts.extend("*" for _ in range(rest.count("*]")))
+    return tuple(parts)
+
+
+def value_at(payload: Any, path: str) -> Any:
+    """已解析 payload 上取 path 对应的值（"[*]" 段取整个数组），不存在为 None；供整页解析时沿用同一配置。"""
+    value = payload
+    for part in parse_path(path):
+        if part == "*":
+            break
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(part)
+    return value
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "state", "key")
+
+    def __init__(self, kind: str, path: Path) -> None:
+        self.kind = kind
+        self.path = path
+        self.state = _KEY if kind == _OBJ else _VALUE
+        self.key = ""
+
+
+class StreamExtractor:
+    """
+    增量解析器：
+
+        extractor = StreamExtractor("data.items[*]", ("next_cursor",))
+        for chunk in resp.iter_content(chunk_size=65536):
+            sink.write_many(extractor.feed(chunk))
+        sink.write_many(extractor.close())
+        cursor = extractor.meta.get("next_cursor")
+
+    JSON 格式错误（或 close() 时仍不完整）抛出 ValueError。
+    """
+
+    def __init__(self, item_path: str = "items[*]", fields: Sequence[str] = ("next_cursor",)) -> None:
+        self.target = parse_path(item_path)
+        if not self.target or self.target[-1] != "*":
+            raise ValueError(f"item_path 需以 [*] 结尾：{item_path}")
+        self.fields = {name: parse_path(name) for name in fields}
+        self.meta: Dict[str, Any] = {}
+        self.count = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._chunks: List[str] = []
+        self._buffered = 0
+        self._need = 0  # 当前待解码的值至少还需缓冲到的字符数（失败后翻倍，避免大值反复重试）
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._finished = False
+
+    # ===== 输入 =====
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """喂入一段响应体，返回其中已完整的条目。"""
+        text = self._decoder.decode(chunk)
+        if text:
+            self._chunks.append(text)
+            self._buffered += len(text)
+        if self._buffered < self._need:
+            return []
+        return self._parse(eof=False)
+
+    def close(self) -> List[Any]:
+        """响应体结束：返回剩余条目，校验 JSON 完整。"""
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self._chunks.append(text)
+            self._buffered += len(text)
+        items = self._parse(eof=True)
+        if not self._finished:
+            raise ValueError("JSON 不完整：响应体提前结束")
+        return items
+
+    # ===== 解析 =====
+
+    def _parse(self, eof: bool) -> List[Any]:
+        buf = "".join(self._chunks)
+        pos = 0
+        items: List[Any] = []
+        while True:
+            pos = _WS.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if self._finished:
+                raise ValueError(f"JSON 结束后仍有内容：{buf[pos:pos + 20]!r}")
+            if not self._stack:
+                end = self._value(buf, pos, (), eof, items)
+            else:
+                end = self._step(self._stack[-1], buf, pos, eof, items)
+            if end is None:
+                break
+            pos = end
+            if self._started and not self._stack:
+                self._finished = True
+        # 只保留未处理完的尾部
+        rest = buf[pos:]
+        self._chunks = [rest] if rest else []
+        self._buffered = len(rest)
+        return items
+
+    def _step(self, frame: _Frame, buf: str, pos: int, eof: bool, items: List[Any]) -> Optional[int]:
+        ch = buf[pos]
+        closer = "}" if frame.kind == _OBJ else "]"
+        if frame.state == _NEXT:
+            if ch == ",":
+                frame.state = _KEY if frame.kind == _OBJ else _VALUE
+                return pos + 1
+            if ch != closer:
+                raise ValueError(f"位置 {pos} 处应为 ',' 或 '{closer}'，实际为 {ch!r}")
+            self._stack.pop()
+            return pos + 1
+        if ch == closer and frame.state in (_KEY, _VALUE):
+            # 空对象 / 空数组（"[1,]" 之类的尾逗号不做校验）
+            self._stack.pop()
+            return pos + 1
+        if frame.state == _KEY:
+            if ch != '"':
+                raise ValueError(f"位置 {pos} 处应为键名，实际为 {ch!r}")
+            try:
+                frame.key, end = scanstring(buf, pos + 1)
+            except ValueError:
+                if eof:
+                    raise
+                return None
+            frame.state = _COLON
+            return end
+        if frame.state == _COLON:
+            if ch != ":":
+                raise ValueError(f"位置 {pos} 处应为 ':'，实际为 {ch!r}")
+            frame.state = _VALUE
+            return pos + 1
+        path = frame.path + ((frame.key,) if frame.kind == _OBJ else ("*",))
+        end = self._value(buf, pos, path, eof, items)
+        if end is not None:
+            frame.state = _NEXT
+        return end
+
+    def _value(self, buf: str, pos: int, path: Path, eof: bool, items: List[Any]) -> Optional[int]:
+        """处理 path 处的一个值：条目整体解码产出，通往条目数组的容器入栈，其余整体解码（按需记入 meta）。"""
+        ch = buf[pos]
+        if path != self.target and ch in "{[" and len(path) < len(self.target) and self.target[: len(path)] == path:
+            self._started = True
+            # 父帧先置为 _NEXT，子容器出栈后直接等待 ',' 或结束符
+            if self._stack:
+                self._stack[-1].state = _NEXT
+            self._stack.append(_Frame(_OBJ if ch == "{" else _ARR, path))
+            return pos + 1
+        decoded = self._decode(buf, pos, eof)
+        if decoded is None:
+            return None
+        value, end = decoded
+        self._started = True
+        if path == self.target:
+            items.append(value)
+            self.count += 1
+        else:
+            self._capture(path, value)
+        return end
+
+    def _decode(self, buf: str, pos: int, eof: bool) -> Optional[Tuple[Any, int]]:
+        if not eof and len(buf) - pos < self._need:
+            return None
+        try:
+            value, end = self._json.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise
+            self._need = 2 * (len(buf) - pos)
+            return None
+        if not eof and buf[pos] in _NUMBER_START and _NUMBER_CHARS.match(buf, pos).end() == len(buf):
+            # 数字字符一直延续到分块末尾（如 "2."、"1e"、"12"），可能还没读完
+            self._need = len(buf) - pos + 1
+            return None
+        self._need = 0
+        return value, end
+
+    def _capture(self, path: Path, value: Any) -> None:
+        for name, field_path in self.fields.items():
+            if field_path[: len(path)] != path:
+                continue
+            found = value
+            for part in field_path[len(path):]:
+                if not isinstance(found, Mapping) or part not in found:
+                    break
+                found = found[part]
+            else:
+                self.meta[name] = found
+
+
+def iter_stream(chunks: Iterable[bytes], extractor: StreamExtractor) -> Iterator[List[Any]]:
+    """按分块产出条目批次（空批次跳过），结束时校验完整；翻页字段见 extractor.meta。"""
+    for chunk in chunks:
+        items = extractor.feed(chunk)
+        if items:
+            yield items
+    items = extractor.close()
+    if items:
+        yield items
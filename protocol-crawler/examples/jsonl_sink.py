@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""pc JSONL 输出写入器：长连接文件句柄 + 缓冲批量写 + 组提交 fsync，序列化后端可替换（serializer.py）。"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from serializer import Serializer
+
+
+class JsonlSink:
+    """
+    长生命周期 JSONL 写入器。
+
+    - 记录先进内存缓冲，达到条数/字节/时间阈值才写入 OS（flush）
+    - fsync 只在 commit() 时执行（组提交），由调用方在写断点前调用
+    - 约束：断点游标只能在 commit() 之后写入，保证断点不超前于已落盘数据
+    - 打开时截掉末尾不以换行结尾的半行（上次 flush 只部分落盘），新记录不会接在半行之后
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_records: int = 500,
+        flush_bytes: int = 1 << 20,
+        flush_interval: float = 1.0,
+        serializer: Optional[Serializer] = None,
+    ) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_records = flush_records
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        # 默认标准库，输出与 json.dumps(item, ensure_ascii=False) 逐字节一致；get_serializer("auto") 换快后端
+        self.serializer = serializer or Serializer()
+        # 无缓冲句柄：未 flush 的数据只存在于 _buffer，进程崩溃即丢失，行为可预期
+        truncate_torn_tail(path)
+        self._file = open(path, "ab", buffering=0)
+        self._buffer: List[bytes] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+        self.written = 0  # 已交给 OS 的记录数
+        self.durable = 0  # 已 fsync 的记录数
+        self._written_bytes = os.fstat(self._file.fileno()).st_size
+        self.durable_bytes = self._written_bytes  # 已 fsync 的文件字节数
+        self.fsync_count = 0
+
+    def write(self, item: Dict[str, Any]) -> None:
+        """追加一条记录（进入缓冲）。"""
+        line = self.serializer.line(item)
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        if self._should_flush():
+            self.flush()
+
+    def write_many(self, items: Iterable[Dict[str, Any]]) -> None:
+        """批量追加记录。"""
+        for item in items:
+            self.write(item)
+
+    @property
+    def pending(self) -> int:
+        """缓冲中尚未写入 OS 的记录数。"""
+        return len(self._buffer)
+
+    def _should_flush(self) -> bool:
+        return (
+            len(self._buffer) >= self.flush_records
+            or self._buffered_bytes >= self.flush_bytes
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> None:
+        """把缓冲一次性写入 OS（不保证落盘）。"""
+        if self._buffer:
+            data = memoryview(b"".join(self._buffer))
+            while data:
+                # 无缓冲 FileIO.write 可能只写入一部分（磁盘满、被信号打断），剩余部分继续写
+                data = data[self._file.write(data) :]
+            self.written += len(self._buffer)
+            self._written_bytes += self._buffered_bytes
+            self._buffer.clear()
+            self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+
+    def commit(self) -> int:
+        """flush + fsync，返回已落盘记录数；写断点前必须调用。"""
+        self.flush()
+        if self.written > self.durable:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+            self.durable = self.written
+            self.durable_bytes = self._written_bytes
+        return self.durable
+
+    def close(self) -> None:
+        """提交剩余缓冲并关闭句柄。"""
+        if self._file.closed:
+            return
+        self.commit()
+        self._file.close()
+
+    def abort(self) -> None:
+        """丢弃未 flush 的缓冲并关闭句柄（模拟崩溃或放弃未提交数据）。"""
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        self._file.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+def truncate_torn_tail(path: Path, chunk: int = 64 * 1024) -> int:
+    """把文件截到最后一个换行之后，返回截掉的字节数；文件不存在、为空或以换行结尾时不改动。"""
+    if not path.exists():
+        return 0
+    with open(path, "r+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            f.truncate(pos)
+            os.fsync(f.fileno())
+    return end - pos
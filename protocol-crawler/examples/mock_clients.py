@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""pc 示例自检与基准共用的模拟客户端：分页游标链、offset / page 分页、时间窗口查询、流式大页、429 注入、服务端配额、dl 故障、协商缓存。"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+API_URL = "https://api.example.com/data"
+
+
+@dataclass
+class MockResponse:
+    """模拟 HTTP 响应对象。"""
+
+    status_code: int
+    payload: Dict[str, Any]
+    headers: Dict[str, str]
+
+    def json(self) -> Dict[str, Any]:
+        return self.payload
+
+
+class ServerQuota:
+    """服务端配额：令牌桶（每秒 rate 次，容量 burst），超出时返回整数秒的 Retry-After。"""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.allowed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def check(self) -> Optional[int]:
+        """放行返回 None，超额返回 Retry-After 秒数。"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.allowed += 1
+                return None
+            self.rejected += 1
+            return max(1, math.ceil((1 - self.tokens) / self.rate))
+
+
+def quota_response(quota: Optional[ServerQuota]) -> Optional[MockResponse]:
+    """超出服务端配额时的 429 响应。"""
+    retry_after = quota.check() if quota is not None else None
+    if retry_after is None:
+        return None
+    return MockResponse(status_code=429, payload={}, headers={"Retry-After": str(retry_after)})
+
+
+class MockClient:
+    """模拟客户端：第一页成功，第二页先 429 再成功，第三页成功结束；可选服务端配额。"""
+
+    def __init__(self, quota: Optional[ServerQuota] = None) -> None:
+        self.calls = 0
+        self.cursor_attempts: Dict[Optional[str], int] = {}
+        self.quota = quota
+
+    def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        self.calls += 1
+        throttled = quota_response(self.quota)
+        if throttled is not None:
+            return throttled
+        cursor = (params or {}).get("cursor")
+        self.cursor_attempts[cursor] = self.cursor_attempts.get(cursor, 0) + 1
+
+        if cursor is None:
+            return MockResponse(
+                status_code=200,
+                payload={
+                    "items": [{"id": 1}, {"id": 2}],
+                    "next_cursor": "c1",
+                },
+                headers={},
+            )
+
+        if cursor == "c1" and self.cursor_attempts[cursor] == 1:
+            return MockResponse(
+                status_code=429,
+                payload={},
+                headers={"Retry-After": "1"},
+            )
+
+        if cursor == "c1":
+            return MockResponse(
+                status_code=200,
+                payload={
+                    "items": [{"id": 3}],
+                    "next_cursor": "c2",
+                },
+                headers={},
+            )
+
+        if cursor == "c2":
+            return MockResponse(
+                status_code=200,
+                payload={
+                    "items": [{"id": 4}],
+                    "next_cursor": None,
+                },
+                headers={},
+            )
+
+        return MockResponse(status_code=404, payload={}, headers={})
+
+    def close(self) -> None:
+        """保持与真实客户端接口一致。"""
+
+
+class AsyncMockClient:
+    """
+    异步模拟客户端：每个 task 一条固定长度游标链，第 2 页首次请求返回 429（Retry-After 为 retry_after，
+    可为秒数或 HTTP 日期），并统计在途峰值；可选服务端配额。
+    """
+
+    def __init__(
+        self,
+        pages_per_task: int = 3,
+        latency: float = 0.005,
+        quota: Optional[ServerQuota] = None,
+        retry_after: str = "1",
+    ) -> None:
+        self.pages_per_task = pages_per_task
+        self.latency = latency
+        self.quota = quota
+        self.retry_after = retry_after
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.host_in_flight: Dict[str, int] = {}
+        self.host_peak: Dict[str, int] = {}
+        self.throttled: set = set()
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        host = urlsplit(url).netloc
+        self.calls += 1
+        self._enter(host)
+        try:
+            await asyncio.sleep(self.latency)
+            return quota_response(self.quota) or self._respond(params or {})
+        finally:
+            self.in_flight -= 1
+            self.host_in_flight[host] -= 1
+
+    def _enter(self, host: str) -> None:
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.host_in_flight[host] = self.host_in_flight.get(host, 0) + 1
+        self.host_peak[host] = max(self.host_peak.get(host, 0), self.host_in_flight[host])
+
+    def _respond(self, params: Dict[str, Any]) -> MockResponse:
+        task_id = params["task"]
+        cursor = params.get("cursor")
+        page = int(cursor.rsplit(":", 1)[1]) if cursor else 0
+
+        if page == 1 and task_id not in self.throttled:
+            self.throttled.add(task_id)
+            return MockResponse(status_code=429, payload={}, headers={"Retry-After": self.retry_after})
+
+        next_page = page + 1
+        next_cursor = f"{task_id}:{next_page}" if next_page < self.pages_per_task else None
+        return MockResponse(
+            status_code=200,
+            payload={"items": [{"id": f"{task_id}-{page}"}], "next_cursor": next_cursor},
+            headers={},
+        )
+
+    async def close(self) -> None:
+        """保持与真实异步客户端接口一致。"""
+
+
+class ChainMockClient:
+    """同步多 task 模拟客户端：每个 task 一条游标链，首页先返回 throttles[task] 次 429。"""
+
+    def __init__(self, throttles: Dict[str, int], pages_per_task: int = 4) -> None:
+        self.throttles = throttles
+        self.pages_per_task = pages_per_task
+        self.calls = 0
+        self.throttled: Dict[str, int] = {}
+
+    def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        self.calls += 1
+        params = params or {}
+        task_id = params["task"]
+        cursor = params.get("cursor")
+        page = int(cursor.rsplit(":", 1)[1]) if cursor else 0
+
+        if page == 0 and self.throttled.get(task_id, 0) < self.throttles.get(task_id, 0):
+            self.throttled[task_id] = self.throttled.get(task_id, 0) + 1
+            return MockResponse(status_code=429, payload={}, headers={"Retry-After": "1"})
+
+        next_page = page + 1
+        next_cursor = f"{task_id}:{next_page}" if next_page < self.pages_per_task else None
+        return MockResponse(
+            status_code=200,
+            payload={"items": [{"id": f"{task_id}-{page}"}], "next_cursor": next_cursor},
+            headers={},
+        )
+
+    def close(self) -> None:
+        """保持与真实客户端接口一致。"""
+
+
+class ProxyFaultClient:
+    """包装任意同步客户端：经 dead 集合中的 dl 发出的请求抛连接错误，并统计各 dl 的请求数。"""
+
+    def __init__(self, inner: Any, dead: set) -> None:
+        self.inner = inner
+        self.dead = dead
+        self.by_proxy: Dict[str, int] = {}
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        proxy = (kwargs.get("proxies") or {}).get("https")
+        self.by_proxy[proxy] = self.by_proxy.get(proxy, 0) + 1
+        if proxy in self.dead:
+            raise ConnectionError(f"dl 不可用：{proxy}")
+        return self.inner.get(url, params=params, headers=kwargs.get("headers"))
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ConditionalMockClient:
+    """
+    包装任意同步客户端：200 响应附带 ETag（响应体摘要）与 Last-Modified，校验头匹配时返回空包体的 304。
+
+    revisions[task] 递增即模拟该 task 的页面内容变化；body_bytes 统计实际下发的响应体字节数。
+    """
+
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.revisions: Dict[str, int] = {}
+        self.not_modified = 0
+        self.body_bytes = 0
+        self._modified_at: Dict[str, str] = {}  # ETag → 首次出现时间（HTTP 日期）
+
+    @property
+    def calls(self) -> int:
+        return self.inner.calls
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        return self._conditional(self.inner.get(url, params=params), params, kwargs.get("headers") or {})
+
+    def _conditional(
+        self, resp: MockResponse, params: Optional[Dict[str, Any]], headers: Dict[str, str]
+    ) -> MockResponse:
+        if resp.status_code != 200:
+            return resp
+        revision = self.revisions.get((params or {}).get("task"), 0)
+        payload = {**resp.payload, "revision": revision} if revision else resp.payload
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        last_modified = self._modified_at.setdefault(etag, formatdate(usegmt=True))
+        validators = {"ETag": etag, "Last-Modified": last_modified}
+        # If-None-Match 优先；只有缺失时才比较 If-Modified-Since（RFC 9110）
+        if_none_match = headers.get("If-None-Match")
+        if if_none_match == etag or (if_none_match is None and headers.get("If-Modified-Since") == last_modified):
+            self.not_modified += 1
+            return MockResponse(status_code=304, payload={}, headers=validators)
+        self.body_bytes += len(body)
+        return MockResponse(status_code=200, payload=payload, headers={**resp.headers, **validators})
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class AsyncConditionalMockClient(ConditionalMockClient):
+    """ConditionalMockClient 的异步版，包装异步客户端。"""
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        resp = await self.inner.get(url, params=params)
+        return self._conditional(resp, params, kwargs.get("headers") or {})
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+class FaultyAsyncClient:
+    """
+    包装异步客户端注入传输层故障：flaky 中的 task 每页首次请求抛出 ConnectionResetError（可重试）；
+    unavailable 中的 task 每页首次请求返回 503（可重试）；
+    fatal task 请求第 fatal_page 页时抛出 RuntimeError（客户端未处理的异常）。
+    """
+
+    def __init__(
+        self,
+        inner: Any,
+        flaky: set,
+        fatal: Optional[str] = None,
+        fatal_page: int = 1,
+        unavailable: Optional[set] = None,
+    ) -> None:
+        self.inner = inner
+        self.flaky = flaky
+        self.unavailable = unavailable or set()
+        self.fatal = fatal
+        self.fatal_page = fatal_page
+        self.resets = 0
+        self.unavailable_hits = 0
+        self._seen: set = set()
+        self._seen_unavailable: set = set()
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        params = params or {}
+        task_id, cursor = params.get("task"), params.get("cursor")
+        page = int(cursor.rsplit(":", 1)[1]) if cursor else 0
+        if task_id == self.fatal and page == self.fatal_page:
+            raise RuntimeError(f"{task_id} 第 {page} 页：客户端内部错误")
+        if task_id in self.flaky and (task_id, page) not in self._seen:
+            self._seen.add((task_id, page))
+            self.resets += 1
+            raise ConnectionResetError(f"{task_id} 第 {page} 页：连接被重置")
+        if task_id in self.unavailable and (task_id, page) not in self._seen_unavailable:
+            self._seen_unavailable.add((task_id, page))
+            self.unavailable_hits += 1
+            return MockResponse(status_code=503, payload={}, headers={})
+        return await self.inner.get(url, params=params, **kwargs)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+class PagedMockClient:
+    """
+    offset + limit 或 page + page_size 分页的模拟列表：共 total 条，最后一页不足一页，越界返回空列表。
+
+    with_total 时每页附带 total；throttle_pages 中的页首次请求返回 429。统计请求数与在途峰值。
+    """
+
+    def __init__(
+        self,
+        total: int,
+        latency: float = 0.01,
+        with_total: bool = False,
+        throttle_pages: Optional[set] = None,
+    ) -> None:
+        self.total = total
+        self.latency = latency
+        self.with_total = with_total
+        self.throttle_pages = set(throttle_pages or ())
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _respond(self, params: Dict[str, Any]) -> MockResponse:
+        size = int(params.get("limit", params.get("page_size", 20)))
+        offset = int(params["offset"]) if "offset" in params else (int(params["page"]) - 1) * size
+        with self._lock:
+            throttled = offset // size in self.throttle_pages
+            self.throttle_pages.discard(offset // size)
+        if throttled:
+            return MockResponse(status_code=429, payload={}, headers={"Retry-After": "1"})
+        items = [{"id": f"row-{i}"} for i in range(offset, min(offset + size, self.total))]
+        payload: Dict[str, Any] = {"items": items}
+        if self.with_total:
+            payload["total"] = self.total
+        return MockResponse(status_code=200, payload=payload, headers={})
+
+    def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        self._enter()
+        try:
+            time.sleep(self.latency)
+            return self._respond(params or {})
+        finally:
+            self._leave()
+
+    def close(self) -> None:
+        """保持与真实客户端接口一致。"""
+
+
+class AsyncPagedMockClient(PagedMockClient):
+    """PagedMockClient 的异步版。"""
+
+    async def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+            return self._respond(params or {})
+        finally:
+            self._leave()
+
+    async def close(self) -> None:
+        """保持与真实异步客户端接口一致。"""
+
+
+def skewed_timestamps(count: int, start: int, end: int, seed: int = 7) -> List[int]:
+    """时间密度偏斜的数据：越近越密（u^0.2 分布），另有 20% 集中在 1% 宽的突发窗口内。"""
+    rng = random.Random(seed)
+    span = end - start
+    burst_at = start + int(span * 0.3)
+    stamps = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            stamps.append(burst_at + int(rng.random() * span * 0.01))
+        else:
+            stamps.append(start + int(rng.random() ** 0.2 * (span - 1)))
+    return sorted(stamps)
+
+
+class AsyncTimeRangeMockClient:
+    """
+    按时间窗口查询的模拟接口（异步）：返回 start_time <= ts < end_time 的数据，page + limit 分页，带窗口内 total。
+
+    page_cap 为单次查询最多可翻的页数，超出返回空列表；每次请求延迟 latency + depth_latency × (page - 1)，
+    模拟深翻页越来越慢。统计请求数与在途峰值。
+    """
+
+    def __init__(
+        self, timestamps: List[int], latency: float = 0.01, page_cap: Optional[int] = None, depth_latency: float = 0.0
+    ) -> None:
+        self.timestamps = sorted(timestamps)
+        self.latency = latency
+        self.page_cap = page_cap
+        self.depth_latency = depth_latency
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _respond(self, params: Dict[str, Any]) -> MockResponse:
+        lo = bisect.bisect_left(self.timestamps, int(params.get("start_time", self.timestamps[0])))
+        hi = bisect.bisect_left(self.timestamps, int(params.get("end_time", self.timestamps[-1] + 1)))
+        size = int(params.get("limit", 20))
+        page = int(params.get("page", 1))
+        first = lo + (page - 1) * size
+        if self.page_cap is not None and page > self.page_cap:
+            first = hi
+        items = [{"id": f"t-{i}", "ts": self.timestamps[i]} for i in range(first, min(first + size, hi))]
+        return MockResponse(status_code=200, payload={"items": items, "total": hi - lo}, headers={})
+
+    async def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
+        params = params or {}
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency + self.depth_latency * (int(params.get("page", 1)) - 1))
+            return self._respond(params)
+        finally:
+            self.in_flight -= 1
+
+    async def close(self) -> None:
+        """保持与真实异步客户端接口一致。"""
+
+
+class StreamingMockResponse:
+    """响应体按片段生成的模拟响应：iter_content() 逐块产出，整页不驻留内存；content / json() 读取全部。"""
+
+    def __init__(self, pieces: Callable[[], Iterator[bytes]], headers: Optional[Dict[str, str]] = None) -> None:
+        self.status_code = 200
+        self.headers = headers or {}
+        self._pieces = pieces
+
+    def iter_content(self, chunk_size: Optional[int] = 65536) -> Iterator[bytes]:
+        if chunk_size is None:
+            yield from self._pieces()
+            return
+        pending = bytearray()
+        for piece in self._pieces():
+            pending += piece
+            while len(pending) >= chunk_size:
+                yield bytes(pending[:chunk_size])
+                del pending[:chunk_size]
+        if pending:
+            yield bytes(pending)
+
+    @property
+    def content(self) -> bytes:
+        return b"".join(self._pieces())
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class LargePageMockClient:
+    """
+    cursor 分页的大页接口：{"data": {"items": [...]}, "next_cursor": ...}，翻页字段在条目之后（流式时最后才拿到）。
+
+    每页 items_per_page 条、每条正文约 body_bytes 字节；stream=True 时返回 StreamingMockResponse，否则整页生成后返回。
+    broken_pages 中的页首次流式读取到一半时连接断开（ConnectionResetError）；supports_stream=False 时忽略 stream。
+    """
+
+    def __init__(
+        self,
+        pages: int = 3,
+        items_per_page: int = 1000,
+        body_bytes: int = 1000,
+        broken_pages: Optional[set] = None,
+        supports_stream: bool = True,
+    ) -> None:
+        self.pages = pages
+        self.supports_stream = supports_stream
+        self.broken_pages = set(broken_pages or ())
+        self.items_per_page = items_per_page
+        self.body = "lorem ipsum 内容 " * max(1, body_bytes // 20)
+        self.calls = 0
+
+    def item(self, page: int, index: int) -> Dict[str, Any]:
+        return {"id": f"p{page}-{index}", "title": f"条目 {page}-{index}", "body": self.body, "stats": {"n": index}}
+
+    def page_pieces(self, page: int) -> Iterator[bytes]:
+        yield b'{"data": {"items": ['
+        for i in range(self.items_per_page):
+            prefix = b"," if i else b""
+            yield prefix + json.dumps(self.item(page, i), ensure_ascii=False).encode("utf-8")
+        next_cursor = str(page + 1) if page + 1 < self.pages else None
+        yield b']}, "next_cursor": ' + json.dumps(next_cursor).encode("utf-8") + b"}"
+
+    def _broken_pieces(self, page: int) -> Iterator[bytes]:
+        for i, piece in enumerate(self.page_pieces(page)):
+            if i > self.items_per_page // 2:
+                raise ConnectionResetError("模拟断流")
+            yield piece
+
+    def get(self, _url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False, **_kwargs: Any) -> Any:
+        self.calls += 1
+        page = int((params or {}).get("cursor") or 0)
+        resp = StreamingMockResponse(lambda: self.page_pieces(page), {"Content-Type": "application/json"})
+        stream = stream and self.supports_stream
+        if stream and page in self.broken_pages:
+            self.broken_pages.discard(page)
+            return StreamingMockResponse(lambda: self._broken_pieces(page), resp.headers)
+        if stream:
+            return resp
+        return MockResponse(status_code=200, payload=resp.json(), headers=resp.headers)
+
+    def close(self) -> None:
+        """保持与真实客户端接口一致。"""
+
+
+class MockSession:
+    """模拟 curl_cffi 同步会话：首个请求付出一次握手耗时，之后复用连接；检测会话被多个线程同时使用。"""
+
+    def __init__(self, inner: Any, handshake: float = 0.02, latency: float = 0.0) -> None:
+        self.inner = inner
+        self.handshake = handshake
+        self.latency = latency
+        self.handshakes = 0
+        self.requests = 0
+        self.connected = False
+        self.closed = False
+        self._busy = False
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        if self.closed:
+            raise RuntimeError("会话已关闭")
+        if self._busy:
+            raise RuntimeError("同步会话被多个线程同时使用")
+        self._busy = True
+        try:
+            if not self.connected:
+                time.sleep(self.handshake)
+                self.handshakes += 1
+                self.connected = True
+            time.sleep(self.latency)
+            self.requests += 1
+            return self.inner.get(url, params=params, **kwargs)
+        finally:
+            self._busy = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class MockAsyncSession:
+    """模拟 curl_cffi 异步会话：并发协程共享一次握手（HTTP/2 多路复用），之后复用连接。"""
+
+    def __init__(self, inner: Any, handshake: float = 0.02) -> None:
+        self.inner = inner
+        self.handshake = handshake
+        self.handshakes = 0
+        self.requests = 0
+        self.closed = False
+        self._connected: Optional[asyncio.Future] = None
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> MockResponse:
+        if self.closed:
+            raise RuntimeError("会话已关闭")
+        if self._connected is None:
+            self._connected = asyncio.ensure_future(self._connect())
+        await self._connected
+        self.requests += 1
+        return await self.inner.get(url, params=params, **kwargs)
+
+    async def _connect(self) -> None:
+        await asyncio.sleep(self.handshake)
+        self.handshakes += 1
+
+    async def close(self) -> None:
+        self.closed = True
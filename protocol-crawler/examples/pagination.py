@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+pc 分页引擎：Offset / Page 分页的后续页参数可提前算出，按 K 页窗口并发请求、按页序产出结果。
+
+- detect_page_style() 由请求模板识别分页模式（offset + limit / page + page_size / 其余按 cursor 处理）
+- is_page_done() 对应 error-checkpoint.md 的终止条件：has_next_page=false、空数据、不足一页、达到 total
+- iter_pages()（线程池）/ aiter_pages()（asyncio）保持窗口内 K 个请求在途，结果按页序产出；
+  遇到终止页即停止，窗口中其余的推测请求取消（已发出的丢弃，计入 wasted）
+- 首页返回 total / total_pages 后不再请求超出末页的页码
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+CURSOR, OFFSET, PAGE = "cursor", "offset", "page"
+
+OFFSET_PARAMS = ("offset", "skip", "start")
+PAGE_PARAMS = ("page", "page_no", "pageNo", "page_num", "pn")
+SIZE_PARAMS = ("limit", "page_size", "pageSize", "per_page", "size", "count")
+
+
+@dataclass(frozen=True)
+class PageStyle:
+    """分页模式与参数：index 为从 start 起的第几页（0 起）。"""
+
+    mode: str
+    param: Optional[str] = None  # offset / page 参数名
+    size: int = 0  # 每页条数，未知为 0（无法按不足一页判断结束）
+    start: int = 0  # 模板中的起始 offset / 页码
+    size_param: Optional[str] = None  # 每页条数参数名
+
+    def params(self, template: Mapping[str, Any], index: int) -> Dict[str, Any]:
+        """第 index 页的请求参数。"""
+        params = dict(template)
+        if self.mode == OFFSET:
+            params[self.param] = self.start + index * self.size
+        elif self.mode == PAGE:
+            params[self.param] = self.start + index
+        return params
+
+    def last_index(self, payload: Mapping[str, Any]) -> Optional[int]:
+        """由 total / total_pages 推出的页数上限（index 不含），未返回总数时为 None。"""
+        total_pages = payload.get("total_pages")
+        total = payload_total(payload)
+        if total_pages is None and total is not None and self.size:
+            total_pages = math.ceil(total / self.size)
+        if total_pages is None:
+            return None
+        if self.mode == OFFSET:
+            skipped = self.start // self.size if self.size else 0
+        else:
+            # 页码从 1 起时 start=1 对应第一页
+            skipped = self.start - min(self.start, 1)
+        return max(0, int(total_pages) - skipped)
+
+
+def detect_page_style(template: Mapping[str, Any]) -> PageStyle:
+    """按请求模板中的参数名识别分页模式；模板含 cursor 类参数或无法识别时按 cursor 处理。"""
+    size_param = next((name for name in SIZE_PARAMS if name in template), None)
+    size = int(template[size_param]) if size_param else 0
+    offset_param = next((name for name in OFFSET_PARAMS if name in template), None)
+    if offset_param and size:
+        return PageStyle(OFFSET, offset_param, size, int(template[offset_param]), size_param)
+    page_param = next((name for name in PAGE_PARAMS if name in template), None)
+    if page_param:
+        return PageStyle(PAGE, page_param, size, int(template[page_param]), size_param)
+    return PageStyle(CURSOR, size=size, size_param=size_param)
+
+
+def payload_total(payload: Mapping[str, Any]) -> Optional[int]:
+    """响应中的总条数（total / total_count），未返回时为 None。"""
+    total = payload.get("total", payload.get("total_count"))
+    return None if total is None else int(total)
+
+
+def page_items(payload: Mapping[str, Any]) -> List[Any]:
+    items = payload.get("items") if "items" in payload else payload.get("data")
+    return items if isinstance(items, list) else []
+
+
+def is_page_done(style: PageStyle, payload: Mapping[str, Any], index: int) -> Tuple[bool, str]:
+    """判断第 index 页之后是否还有数据。"""
+    if not payload.get("has_next_page", True):
+        return True, "has_next_page=false"
+    items = page_items(payload)
+    if not items:
+        return True, "empty data"
+    if style.size and len(items) < style.size:
+        return True, "short page"
+    last = style.last_index(payload)
+    if last is not None and index + 1 >= last:
+        return True, "total reached"
+    return False, ""
+
+
+@dataclass
+class PageResult:
+    index: int
+    params: Dict[str, Any]
+    response: Any  # None 表示该页请求失败（重试耗尽），之后的页不再产出
+    payload: Optional[Dict[str, Any]] = None
+    done: bool = False
+    reason: str = ""
+
+
+@dataclass
+class WindowStats:
+    submitted: int = 0
+    cancelled: int = 0  # 停止时取消的请求（线程池中为尚未开始执行的；协程可能已发出）
+    used: int = 0  # 按页序产出的页数
+    reason: str = ""  # 停止原因
+    in_flight_peak: int = 0
+
+    @property
+    def wasted(self) -> int:
+        """越过末页、已完成或在途但结果被丢弃的推测请求数。"""
+        return self.submitted - self.cancelled - self.used
+
+
+class _Window:
+    """iter_pages / aiter_pages 共用的窗口状态：下一个要发出的 index 与已知末页。"""
+
+    def __init__(
+        self, style: PageStyle, template: Mapping[str, Any], window: int, start: int, stats: WindowStats
+    ) -> None:
+        if window < 1:
+            raise ValueError("window 至少为 1")
+        self.style = style
+        self.template = template
+        self.window = window
+        self.next_index = start
+        self.current = start
+        self.last: Optional[int] = None
+        self.stats = stats
+
+    def to_submit(self, in_flight: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        while in_flight < self.window and (self.last is None or self.next_index < self.last):
+            index = self.next_index
+            self.next_index += 1
+            in_flight += 1
+            self.stats.submitted += 1
+            self.stats.in_flight_peak = max(self.stats.in_flight_peak, in_flight)
+            yield index, self.style.params(self.template, index)
+
+    def result(self, response: Any) -> PageResult:
+        index = self.current
+        params = self.style.params(self.template, index)
+        self.current += 1
+        self.stats.used += 1
+        if response is None:
+            self.stats.reason = "fetch failed"
+            return PageResult(index, params, None, done=True, reason=self.stats.reason)
+        payload = response.json()
+        done, reason = is_page_done(self.style, payload, index)
+        last = self.style.last_index(payload)
+        if last is not None:
+            self.last = last if self.last is None else min(self.last, last)
+        if done:
+            self.stats.reason = reason
+        return PageResult(index, params, response, payload, done, reason)
+
+    def finished(self) -> bool:
+        """末页已知且已全部产出（末页恰好是整页、无终止标志时由此结束）。"""
+        if self.last is not None and self.current >= self.last:
+            self.stats.reason = self.stats.reason or "total reached"
+            return True
+        return False
+
+
+def iter_pages(
+    fetch: Callable[[Dict[str, Any]], Any],
+    style: PageStyle,
+    template: Mapping[str, Any],
+    executor: Executor,
+    window: int,
+    start: int = 0,
+    stats: Optional[WindowStats] = None,
+) -> Iterator[PageResult]:
+    """
+    线程池窗口：fetch(params) 在 executor 中执行，返回响应（有 json()）或 None（失败）。
+
+    结果按页序产出，最后一项 done=True（末页恰为整页且无终止标志时，由 total 推出的末页结束）；
+    fetch 抛出的异常在轮到该页时原样抛出。
+    """
+    stats = stats if stats is not None else WindowStats()
+    state = _Window(style, template, window, start, stats)
+    pending: Dict[int, Future] = {}
+    try:
+        while not state.finished():
+            for index, params in state.to_submit(len(pending)):
+                pending[index] = executor.submit(fetch, params)
+            page = state.result(pending.pop(state.current).result())
+            yield page
+            if page.done:
+                return
+    finally:
+        stats.cancelled += sum(1 for future in pending.values() if future.cancel())
+
+
+async def aiter_pages(
+    fetch: Callable[[Dict[str, Any]], Awaitable[Any]],
+    style: PageStyle,
+    template: Mapping[str, Any],
+    window: int,
+    start: int = 0,
+    stats: Optional[WindowStats] = None,
+) -> AsyncIterator[PageResult]:
+    """asyncio 窗口：语义同 iter_pages，停止时取消窗口中其余的请求；需迭代到结束（或异常），不要中途 break。"""
+    stats = stats if stats is not None else WindowStats()
+    state = _Window(style, template, window, start, stats)
+    pending: Dict[int, asyncio.Task] = {}
+    try:
+        while not state.finished():
+            for index, params in state.to_submit(len(pending)):
+                pending[index] = asyncio.ensure_future(fetch(params))
+            page = state.result(await pending.pop(state.current))
+            yield page
+            if page.done:
+                return
+    finally:
+        stats.cancelled += sum(1 for task in pending.values() if task.cancel())
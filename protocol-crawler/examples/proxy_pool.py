@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""pc dl 健康池：按 EWMA 延迟与成功率加权选择，失败 dl 隔离后指数间隔复检，统计跨运行持久化。"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# 视为 dl 本身故障的状态码（连接异常、超时由调用方直接 report_failure）
+PROXY_FAILURE_STATUS = frozenset({403, 407, 502, 503, 504})
+
+
+def proxy_key(proxy_url: str) -> str:
+    """持久化用的 dl 标识：URL 哈希，状态文件中不落明文凭据。"""
+    return hashlib.sha256(proxy_url.encode("utf-8")).hexdigest()[:16]
+
+
+def proxy_label(proxy_url: str) -> str:
+    """日志与统计用的显示名：去掉 user:pass 的 host:port。"""
+    parts = urlsplit(proxy_url)
+    return parts.hostname + (f":{parts.port}" if parts.port else "") if parts.hostname else proxy_key(proxy_url)
+
+
+class ProxyPoolExhausted(RuntimeError):
+    """全部 dl 都在隔离中；retry_in 为最早一个可复检的剩余秒数。"""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"所有 dl 均在隔离中，{retry_in:.0f}s 后可复检")
+        self.retry_in = retry_in
+
+
+@dataclass
+class ProxyStats:
+    """单个 dl 的健康统计。"""
+
+    latency: Optional[float] = None  # 成功请求耗时的 EWMA（秒）
+    success: float = 1.0  # 成功率 EWMA，乐观初值让新 dl 先获得流量
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    quarantines: int = 0  # 连续隔离次数，决定下次复检间隔
+    cooldown_until: float = 0.0  # 墙钟时间戳；非 0 表示隔离中，到期后放行一次复检请求
+
+    @property
+    def quarantined(self) -> bool:
+        return self.cooldown_until > 0
+
+
+class ProxyPool:
+    """
+    dl 健康池，线程安全；替代 proxy-management.md 中的 ProxyRotator。
+
+    - 选择权重 = 每次成功的期望耗时的倒数（失败按 failure_cost 秒计），慢 dl 与时好时坏的 dl 自动少分流量
+    - 连续失败 failure_threshold 次或成功率低于 min_success 即隔离，
+      隔离时长 base_cooldown × 2^(n-1)（封顶 max_cooldown），到期只放行一个复检请求
+    - 复检成功恢复分流，失败则隔离时长翻倍
+    - 统计以 URL 哈希为键原子写入 state_path，下次运行直接沿用
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        state_path: Optional[Path] = None,
+        alpha: float = 0.3,
+        success_alpha: float = 0.1,
+        failure_threshold: int = 3,
+        min_success: float = 0.3,
+        base_cooldown: float = 30.0,
+        max_cooldown: float = 1800.0,
+        failure_cost: float = 10.0,
+        min_latency: float = 0.01,
+        save_every: int = 50,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if not proxies:
+            raise ValueError("dl 列表为空")
+        self.proxies = list(dict.fromkeys(proxies))
+        self.state_path = state_path
+        # EWMA 平滑系数：延迟跟随快，成功率更平滑，偶发一次失败不致流量骤降
+        self.alpha = alpha
+        self.success_alpha = success_alpha
+        self.failure_threshold = failure_threshold
+        self.min_success = min_success
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        # 一次失败的估计代价（秒），默认取常见请求超时
+        self.failure_cost = failure_cost
+        self.min_latency = min_latency
+        self.save_every = save_every
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.stats: Dict[str, ProxyStats] = {proxy: ProxyStats() for proxy in self.proxies}
+        self._probing: set = set()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if state_path is not None:
+            self._load()
+
+    # ===== 选择 =====
+
+    def _weight(self, stats: ProxyStats, default_latency: float) -> float:
+        latency = max(stats.latency if stats.latency is not None else default_latency, self.min_latency)
+        expected = stats.success * latency + (1 - stats.success) * self.failure_cost
+        return (stats.success / expected) ** 2
+
+    def acquire(self) -> str:
+        """
+        选一个 dl：隔离到期的优先放行一次复检，其余按权重随机；全部隔离时抛 ProxyPoolExhausted。
+
+        取出的 dl 无论请求成败都必须 report_* 回报一次，复检名额在回报时才释放。
+        """
+        with self._lock:
+            now = self.clock()
+            for proxy in self.proxies:
+                stats = self.stats[proxy]
+                if stats.quarantined and now >= stats.cooldown_until and proxy not in self._probing:
+                    self._probing.add(proxy)
+                    return proxy
+
+            healthy = [proxy for proxy in self.proxies if not self.stats[proxy].quarantined]
+            if not healthy:
+                waiting = [self.stats[p].cooldown_until for p in self.proxies if p not in self._probing]
+                raise ProxyPoolExhausted(max(0.0, min(waiting) - now) if waiting else self.base_cooldown)
+            known = sorted(s.latency for s in self.stats.values() if s.latency is not None)
+            # 尚无延迟数据的 dl 按已知中位数估计
+            default_latency = known[len(known) // 2] if known else 1.0
+            weights = [self._weight(self.stats[proxy], default_latency) for proxy in healthy]
+            return self.rng.choices(healthy, weights=weights)[0]
+
+    # ===== 反馈 =====
+
+    def report_success(self, proxy: str, latency: float) -> None:
+        with self._lock:
+            stats = self.stats[proxy]
+            stats.requests += 1
+            stats.consecutive_failures = 0
+            stats.latency = latency if stats.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.latency
+            )
+            stats.success = self.success_alpha + (1 - self.success_alpha) * stats.success
+            if proxy in self._probing:
+                self._probing.discard(proxy)
+                stats.cooldown_until = 0.0
+                stats.quarantines = 0
+                stats.success = max(stats.success, 0.5)
+            self._mark_dirty()
+
+    def report_failure(self, proxy: str) -> None:
+        with self._lock:
+            stats = self.stats[proxy]
+            stats.requests += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.success = (1 - self.success_alpha) * stats.success
+            if proxy in self._probing:
+                self._probing.discard(proxy)
+                self._quarantine(stats)
+            elif not stats.quarantined and (
+                stats.consecutive_failures >= self.failure_threshold or stats.success < self.min_success
+            ):
+                self._quarantine(stats)
+            self._mark_dirty()
+
+    def report(self, proxy: str, ok: bool, latency: float) -> None:
+        if ok:
+            self.report_success(proxy, latency)
+        else:
+            self.report_failure(proxy)
+
+    def _quarantine(self, stats: ProxyStats) -> None:
+        stats.quarantines += 1
+        cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (stats.quarantines - 1))
+        stats.cooldown_until = self.clock() + cooldown
+
+    def _mark_dirty(self) -> None:
+        self._unsaved += 1
+        if self.state_path is not None and self._unsaved >= self.save_every:
+            self._save_locked()
+
+    # ===== 统计与持久化 =====
+
+    @property
+    def active_count(self) -> int:
+        """当前未隔离的 dl 数量。"""
+        with self._lock:
+            return sum(1 for stats in self.stats.values() if not stats.quarantined)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """各 dl 统计，键为去掉凭据的显示名。"""
+        with self._lock:
+            return {proxy_label(proxy): asdict(self.stats[proxy]) for proxy in self.proxies}
+
+    def save(self) -> None:
+        with self._lock:
+            self._save_locked()
+
+    def close(self) -> None:
+        if self.state_path is not None:
+            self.save()
+
+    def _save_locked(self) -> None:
+        if self.state_path is None:
+            return
+        data = {
+            "version": 1,
+            "proxies": {
+                proxy_key(proxy): {"label": proxy_label(proxy), **asdict(self.stats[proxy])}
+                for proxy in self.proxies
+            },
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self.state_path)
+        self._unsaved = 0
+
+    def _load(self) -> None:
+        """只恢复当前列表中仍存在的 dl；已移除的条目丢弃，新增的从初值开始。"""
+        if self.state_path is None or not self.state_path.exists():
+            return
+        saved = json.loads(self.state_path.read_text(encoding="utf-8")).get("proxies", {})
+        names = {field.name for field in fields(ProxyStats)}
+        for proxy in self.proxies:
+            entry = saved.get(proxy_key(proxy))
+            if entry is not None:
+                self.stats[proxy] = ProxyStats(**{k: v for k, v in entry.items() if k in names})
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""pc 自适应限速器：按 (host, 账号) 分桶的令牌桶，速率随 429 反馈做 AIMD 调整，同步与异步抓取共用。"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+BucketKey = Tuple[str, Optional[str]]  # (host, 账号)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 头转为秒数：支持秒数与 HTTP 日期两种格式，无法解析时返回 None。"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def get_header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    value = headers.get(name)
+    return value if value is not None else headers.get(name.lower())
+
+
+@dataclass
+class Ticket:
+    """一次放行凭证：请求完成后连同响应状态交回 RateLimiter.feedback()。"""
+
+    key: BucketKey
+    issued_at: float  # 实际放行时刻（限速器时钟）
+    waited: float
+
+
+class AdaptiveTokenBucket:
+    """
+    单个 (host, 账号) 的令牌桶。
+
+    - 取令牌不阻塞：不足时返回按当前速率需等待的时长，由调用方 sleep（同步）或 await（异步）后重试，
+      速率变化对排队中的请求立即生效
+    - AIMD：连续 success_window 次成功后速率加 increase；遇到 429 速率乘 decrease，
+      并在 Retry-After 期间暂停放行；降速之前放行的请求再返回 429 不重复降速
+    - 慢启动：首次遇到 429 之前每个成功窗口速率翻倍，尽快逼近配额，之后转为线性增加
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: float,
+        max_rate: float,
+        increase: float,
+        decrease: float,
+        success_window: int,
+        jitter: float,
+        clock: Callable[[], float],
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.success_window = success_window
+        self.jitter = jitter
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated_at = clock()  # 晚于当前时刻表示 Retry-After 暂停中
+        self.last_decrease = -math.inf
+        self.slow_start = True
+        self.successes = 0
+        self.granted = 0
+        self.throttled = 0
+        self.decreases = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def try_take(self) -> float:
+        """尝试取一个令牌：成功返回 0，否则返回至少还需等待的秒数。"""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now >= self.updated_at and self.tokens >= 1:
+                self.tokens -= 1
+                self.granted += 1
+                return 0.0
+            return max(0.0, self.updated_at - now) + max(0.0, 1 - self.tokens) / self.rate
+
+    def jitter_delay(self) -> float:
+        """放行后附加的随机抖动（拟人化节奏），为 0 时不抖动。"""
+        return random.uniform(0, self.jitter / self.rate) if self.jitter else 0.0
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            if self.successes >= self.success_window:
+                self._refill(self.clock())
+                grown = self.rate * 2 if self.slow_start else self.rate + self.increase
+                self.rate = min(self.max_rate, grown)
+                self.successes = 0
+
+    def on_throttle(self, issued_at: float, retry_after: Optional[float]) -> None:
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.throttled += 1
+            self.successes = 0
+            if retry_after and now + retry_after > self.updated_at:
+                # 暂停到 Retry-After 结束，恢复后从空桶开始，不会集中放行
+                self.updated_at = now + retry_after
+                self.tokens = min(self.tokens, 0.0)
+            if issued_at >= self.last_decrease:
+                self.slow_start = False
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.last_decrease = now
+                self.decreases += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "decreases": self.decreases,
+            }
+
+
+class RateLimiter:
+    """
+    按 (host, 账号) 分桶的自适应限速器，线程安全；同一实例可同时供同步与异步抓取使用。
+
+    用法：ticket = limiter.acquire(url) → 发请求 → limiter.feedback(ticket, status, headers)
+    默认速率对应 error-checkpoint.md 的 2-5s 间隔；max_rate 仍须遵守保守节奏原则。
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.3,
+        burst: int = 1,
+        min_rate: float = 0.02,
+        max_rate: float = 1.0,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+        success_window: int = 10,
+        jitter: float = 0.0,
+        retry_after_scale: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.success_window = success_window
+        self.jitter = jitter
+        # Retry-After 秒数缩放系数（自检时压缩等待时间）
+        self.retry_after_scale = retry_after_scale
+        self.clock = clock
+        self._buckets: Dict[BucketKey, AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: BucketKey) -> AdaptiveTokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = AdaptiveTokenBucket(
+                        self.rate, self.burst, self.min_rate, self.max_rate, self.increase,
+                        self.decrease, self.success_window, self.jitter, self.clock,
+                    )
+                    self._buckets[key] = bucket
+        return bucket
+
+    def acquire(self, url: str, account: Optional[str] = None) -> Ticket:
+        """同步等待放行。"""
+        key = (urlsplit(url).netloc, account)
+        bucket = self.bucket(key)
+        started = self.clock()
+        wait = bucket.try_take()
+        while wait > 0:
+            time.sleep(wait)
+            wait = bucket.try_take()
+        time.sleep(bucket.jitter_delay())
+        issued_at = self.clock()
+        return Ticket(key, issued_at, issued_at - started)
+
+    def try_acquire(self, url: str, account: Optional[str] = None) -> Tuple[Optional[Ticket], float]:
+        """非阻塞取令牌：放行返回 (ticket, 0)，否则返回 (None, 需等待秒数)，供调用方自行调度；不附加抖动。"""
+        key = (urlsplit(url).netloc, account)
+        wait = self.bucket(key).try_take()
+        if wait > 0:
+            return None, wait
+        return Ticket(key, self.clock(), 0.0), 0.0
+
+    async def acquire_async(self, url: str, account: Optional[str] = None) -> Ticket:
+        """异步等待放行：只挂起当前协程。"""
+        key = (urlsplit(url).netloc, account)
+        bucket = self.bucket(key)
+        started = self.clock()
+        wait = bucket.try_take()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = bucket.try_take()
+        await asyncio.sleep(bucket.jitter_delay())
+        issued_at = self.clock()
+        return Ticket(key, issued_at, issued_at - started)
+
+    def feedback(
+        self, ticket: Ticket, status_code: int, headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """回报响应：2xx/3xx 计入成功，429（或带 Retry-After 的 503）降速并暂停，其余状态不影响速率。"""
+        bucket = self._buckets[ticket.key]
+        retry_after = parse_retry_after(get_header(headers, "Retry-After"))
+        if status_code == 429 or (status_code == 503 and retry_after is not None):
+            scaled = None if retry_after is None else retry_after * self.retry_after_scale
+            bucket.on_throttle(ticket.issued_at, scaled)
+        elif 200 <= status_code < 400:
+            bucket.on_success()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各桶当前速率与计数，键为 host 或 host|账号。"""
+        with self._lock:
+            items = list(self._buckets.items())
+        return {
+            host if account is None else f"{host}|{account}": bucket.stats()
+            for (host, account), bucket in items
+        }
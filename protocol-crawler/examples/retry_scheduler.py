@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""pc 重试调度器：失败请求按退避时间停放在延迟堆中，等待期间继续处理其他 task。"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Callable, Generic, List, Mapping, Optional, Tuple, TypeVar
+
+from rate_limiter import get_header, parse_retry_after
+
+T = TypeVar("T")
+
+# 需要重试的状态码：429 限流 + 常见的临时性服务端错误
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def exponential_backoff(retry: int, base: float = 3.0, max_delay: float = 60.0) -> float:
+    """计算退避时间（error-checkpoint.md 的指数退避：3s 起，60s 封顶，30% 抖动）。"""
+    delay = min(base * (2 ** retry), max_delay)
+    jitter = random.uniform(0, delay * 0.3)
+    return delay + jitter
+
+
+def handle_429(headers: Optional[Mapping[str, str]]) -> float:
+    """429 退避：优先使用 Retry-After（秒数或 HTTP 日期），缺失时默认 60-90s 长退避。"""
+    retry_after = parse_retry_after(get_header(headers, "Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    return 60.0 + random.uniform(0, 30)
+
+
+def retry_delay(status_code: int, headers: Optional[Mapping[str, str]], retry: int) -> float:
+    """按响应选择退避策略：429 走 handle_429，其余可重试状态走指数退避。"""
+    if status_code == 429:
+        return handle_429(headers)
+    return exponential_backoff(retry)
+
+
+class RetryScheduler(Generic[T]):
+    """
+    单线程请求调度器：就绪请求与延迟重试统一放在按就绪时刻排序的最小堆中。
+
+    - submit() 立即就绪，defer() 在 delay 秒后就绪；同一时刻按提交顺序出堆（FIFO）
+    - pop() 只在堆中没有就绪请求时才 sleep 到最早的就绪时刻，
+      因此某个游标的退避不会阻塞其他 task
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self._heap: List[Tuple[float, int, T]] = []
+        self._seq = itertools.count()
+        self.deferred = 0
+        self.idle_seconds = 0.0  # 所有请求都在退避中、只能等待的累计时长
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def submit(self, item: T) -> None:
+        self.defer(item, 0.0)
+
+    def defer(self, item: T, delay: float) -> None:
+        if delay > 0:
+            self.deferred += 1
+        heapq.heappush(self._heap, (self.clock() + max(0.0, delay), next(self._seq), item))
+
+    def next_ready_in(self) -> Optional[float]:
+        """距最早就绪请求的秒数（已就绪为 0），堆为空返回 None。"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def pop(self) -> T:
+        """取出最早就绪的请求，必要时等待；堆为空时抛 IndexError。"""
+        if not self._heap:
+            raise IndexError("调度器中没有待处理请求")
+        wait = self.next_ready_in() or 0.0
+        if wait > 0:
+            self.idle_seconds += wait
+            self.sleep(wait)
+        return heapq.heappop(self._heap)[2]
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+pc 分段 JSONL 输出：按字节数 / 条数滚动，已关闭的段后台压缩（gzip；安装了 zstandard 时可选 zstd），
+manifest.json 记录每段的条数、首 / 末 id 与偏移。
+
+- 写入语义同 JsonlSink：write / write_many 进缓冲，commit() flush + fsync 后返回已落盘条数，写断点前调用
+- 活动段是普通 JSONL（data-000003.jsonl），commit() 后超过 max_bytes / max_records 才滚动，段边界总在提交处
+- 偏移为逻辑偏移：把各段按未压缩内容首尾相接看作一个 JSONL，durable_bytes 与 DedupIndex 的 data_size 都按它计；
+  iter_lines(path, offset) 直接跳过 offset 之前的整段，不解压
+- 压缩顺序：写临时文件并 fsync → 改名 → 更新 manifest → 删除明文段；任一步崩溃，下次打开时补做
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsonl_sink import JsonlSink
+from serializer import Serializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP, ZSTD = "gzip", "zstd"
+SUFFIXES = {GZIP: ".gz", ZSTD: ".zst"}
+MANIFEST = "manifest.json"
+COPY_CHUNK = 1 << 20
+
+
+@dataclass
+class SegmentPolicy:
+    """滚动与压缩策略；compression 为 "auto"（有 zstandard 用 zstd，否则 gzip）、"gzip"、"zstd" 或 None。"""
+
+    max_bytes: int = 64 << 20
+    max_records: Optional[int] = None
+    compression: Optional[str] = "auto"
+    level: Optional[int] = None  # 默认 gzip 6 / zstd 3
+
+
+def resolve_compression(name: Optional[str]) -> Optional[str]:
+    if name == "auto":
+        return ZSTD if zstandard is not None else GZIP
+    if name == ZSTD and zstandard is None:
+        raise ValueError("zstd 压缩需要 zstandard：pip install zstandard")
+    if name not in (None, GZIP, ZSTD):
+        raise ValueError(f"未知压缩方式：{name}")
+    return name
+
+
+def segment_name(index: int) -> str:
+    return f"data-{index:06d}.jsonl"
+
+
+class SegmentedSink:
+    """
+    分段版 JsonlSink（同一组方法与计数属性），path 为段目录：
+
+        sink = SegmentedSink(output_dir / "data", SegmentPolicy(max_bytes=64 << 20))
+        sink.write_many(items)
+        sink.commit()  # 之后再写断点
+
+    written / durable / fsync_count 为本次打开以来的累计值，durable_bytes 为全部段的逻辑字节数。
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        policy: Optional[SegmentPolicy] = None,
+        flush_records: int = 500,
+        flush_bytes: int = 1 << 20,
+        flush_interval: float = 1.0,
+        serializer: Optional[Serializer] = None,
+        id_field: str = "id",
+    ) -> None:
+        self.path = directory
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.policy = policy or SegmentPolicy()
+        self.compression = resolve_compression(self.policy.compression)
+        self.id_field = id_field
+        self._sink_options = {
+            "flush_records": flush_records,
+            "flush_bytes": flush_bytes,
+            "flush_interval": flush_interval,
+            "serializer": serializer,
+        }
+        self._lock = Lock()  # manifest 由写入线程与压缩线程共同修改
+        self._compressor = ThreadPoolExecutor(1, thread_name_prefix="pc-segment")
+        self._jobs: List[Future] = []
+        self._closed_written = 0  # 本次打开以来已滚动的段中写入的条数
+        self._closed_fsyncs = 0
+        self.rotations = 0
+        self._closed = False
+        if (directory / MANIFEST).exists():
+            self.manifest = load_manifest(directory)
+        else:
+            self.manifest = {"version": 1, "active": segment_name(1), "next": 2, "segments": []}
+            self._save_manifest()
+        self._closed_bytes = sum(entry["bytes"] for entry in self.segments)
+        self._recover()
+        self._open_active()
+
+    # ===== 写入（同 JsonlSink） =====
+
+    def write(self, item: Dict[str, Any]) -> None:
+        item_id = item.get(self.id_field)
+        if item_id is not None:
+            if self._first_id is None:
+                self._first_id = item_id
+            self._last_id = item_id
+        self._active.write(item)
+
+    def write_many(self, items: Iterable[Dict[str, Any]]) -> None:
+        for item in items:
+            self.write(item)
+
+    @property
+    def pending(self) -> int:
+        return self._active.pending
+
+    @property
+    def written(self) -> int:
+        return self._closed_written + self._active.written
+
+    @property
+    def durable(self) -> int:
+        return self._closed_written + self._active.durable
+
+    @property
+    def durable_bytes(self) -> int:
+        return self._closed_bytes + self._active.durable_bytes
+
+    @property
+    def fsync_count(self) -> int:
+        return self._closed_fsyncs + self._active.fsync_count
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        """已关闭的段（manifest 条目，按写入顺序）。"""
+        return self.manifest["segments"]
+
+    def flush(self) -> None:
+        self._active.flush()
+
+    def commit(self) -> int:
+        """flush + fsync，超过阈值时滚动到新段；返回已落盘记录数，写断点前必须调用。"""
+        self._raise_failed_jobs()
+        self._active.commit()
+        records = self._active_records + self._active.durable
+        limit = self.policy.max_records
+        if self._active.durable_bytes >= self.policy.max_bytes or (limit is not None and records >= limit):
+            self.rotate()
+        return self.durable
+
+    def rotate(self) -> None:
+        """提交并关闭活动段（为空时不动），后续写入进入新段。"""
+        self._active.commit()
+        records = self._active_records + self._active.durable
+        if records == 0:
+            return
+        entry = {
+            "file": self._active.path.name,
+            "records": records,
+            "first_id": self._first_id,
+            "last_id": self._last_id,
+            "offset": self._closed_bytes,
+            "bytes": self._active.durable_bytes,
+            "stored_bytes": self._active.durable_bytes,
+            "compression": None,
+        }
+        self._active.close()
+        self._closed_written += self._active.written
+        self._closed_fsyncs += self._active.fsync_count
+        self._closed_bytes += entry["bytes"]
+        with self._lock:
+            self.segments.append(entry)
+            self.manifest["active"] = segment_name(self.manifest["next"])
+            self.manifest["next"] += 1
+            self._save_manifest()
+        self.rotations += 1
+        self._open_active()
+        self._schedule(entry)
+
+    def close(self) -> None:
+        """提交活动段并等待后台压缩完成；活动段保持明文，下次打开继续追加。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._active.close()
+        self._compressor.shutdown(wait=True)
+        self._raise_failed_jobs()
+
+    def abort(self) -> None:
+        """丢弃未 flush 的缓冲并关闭（模拟崩溃）；已排队的压缩照常完成。"""
+        self._closed = True
+        self._active.abort()
+        self._compressor.shutdown(wait=True)
+
+    def __enter__(self) -> "SegmentedSink":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    # ===== 活动段 =====
+
+    def _open_active(self) -> None:
+        path = self.path / self.manifest["active"]
+        # 先由 JsonlSink 截掉崩溃留下的末尾半行，再逐行扫描恢复条数与首末 id（活动段不超过一个滚动阈值）
+        self._active = JsonlSink(path, **self._sink_options)
+        self._active_records, self._first_id, self._last_id = _scan(path, self.id_field)
+
+    # ===== 压缩 =====
+
+    def _schedule(self, entry: Dict[str, Any]) -> None:
+        if self.compression is not None and entry["compression"] is None:
+            self._jobs.append(self._compressor.submit(self._compress, entry))
+
+    def _compress(self, entry: Dict[str, Any]) -> None:
+        source = self.path / entry["file"]
+        target = source.with_name(source.name + SUFFIXES[self.compression])
+        tmp = target.with_name(target.name + ".tmp")
+        with open(source, "rb") as src, open(tmp, "wb") as dst:
+            _compress_stream(src, dst, self.compression, self.policy.level, source.name)
+            dst.flush()
+            os.fsync(dst.fileno())
+        tmp.replace(target)
+        with self._lock:
+            entry.update(file=target.name, compression=self.compression, stored_bytes=target.stat().st_size)
+            self._save_manifest()
+        source.unlink()
+
+    def _raise_failed_jobs(self) -> None:
+        done = [job for job in self._jobs if job.done()]
+        self._jobs = [job for job in self._jobs if not job.done()]
+        for job in done:
+            job.result()
+
+    # ===== manifest =====
+
+    def _save_manifest(self) -> None:
+        path = self.path / MANIFEST
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(path)
+
+    def _recover(self) -> None:
+        """补做上次崩溃时未完成的压缩：删除残留临时文件与已被压缩段替代的明文段，重新压缩仍为明文的段。"""
+        for tmp in self.path.glob("*.tmp"):
+            tmp.unlink()
+        for entry in self.segments:
+            if entry["compression"] is not None:
+                plain = self.path / entry["file"][: -len(SUFFIXES[entry["compression"]])]
+                if plain.exists():
+                    plain.unlink()
+            else:
+                self._schedule(entry)
+
+
+# ===== 读取（JSONL 文件或分段目录） =====
+
+
+def load_manifest(directory: Path) -> Dict[str, Any]:
+    return json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+
+
+def logical_size(path: Path) -> int:
+    """JSONL 文件的字节数，或分段目录的逻辑字节数（各段未压缩大小之和）。"""
+    if not path.is_dir():
+        return path.stat().st_size if path.exists() else 0
+    if not (path / MANIFEST).exists():
+        return 0
+    manifest = load_manifest(path)
+    active = path / manifest["active"]
+    return sum(entry["bytes"] for entry in manifest["segments"]) + (active.stat().st_size if active.exists() else 0)
+
+
+def iter_lines(path: Path, offset: int = 0) -> Iterator[bytes]:
+    """从逻辑偏移 offset（须在行首）起逐行读取 JSONL 文件或分段目录，offset 之前的整段直接跳过。"""
+    if not path.is_dir():
+        if path.exists():
+            with open(path, "rb") as f:
+                f.seek(offset)
+                yield from f
+        return
+    if not (path / MANIFEST).exists():
+        return
+    manifest = load_manifest(path)
+    parts: List[Tuple[int, Optional[int], str, Optional[str]]] = [
+        (entry["offset"], entry["bytes"], entry["file"], entry["compression"]) for entry in manifest["segments"]
+    ]
+    parts.append((sum(entry["bytes"] for entry in manifest["segments"]), None, manifest["active"], None))
+    for start, size, name, compression in parts:
+        if size is not None and start + size <= offset:
+            continue
+        if size is None and not (path / name).exists():
+            continue
+        with _open_segment(path / name, compression) as f:
+            _skip(f, offset - start, compression)
+            yield from f
+
+
+def _open_segment(path: Path, compression: Optional[str]) -> BinaryIO:
+    if compression is None and not path.exists():
+        # 读取 manifest 之后该段刚被后台压缩替换
+        for name, suffix in SUFFIXES.items():
+            if path.with_name(path.name + suffix).exists():
+                return _open_segment(path.with_name(path.name + suffix), name)
+    if compression == GZIP:
+        return gzip.open(path, "rb")
+    if compression == ZSTD:
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")))
+    return open(path, "rb")
+
+
+def _skip(f: BinaryIO, count: int, compression: Optional[str]) -> None:
+    if count <= 0:
+        return
+    if compression is None:
+        f.seek(count)
+        return
+    while count > 0:
+        chunk = f.read(min(count, COPY_CHUNK))
+        if not chunk:
+            return
+        count -= len(chunk)
+
+
+def _compress_stream(src: BinaryIO, dst: BinaryIO, compression: str, level: Optional[int], name: str) -> None:
+    if compression == ZSTD:
+        zstandard.ZstdCompressor(level=level or 3).copy_stream(src, dst)
+        return
+    # mtime=0：同样内容压缩结果一致
+    with gzip.GzipFile(filename=name, mode="wb", fileobj=dst, compresslevel=level or 6, mtime=0) as gz:
+        shutil.copyfileobj(src, gz, COPY_CHUNK)
+
+
+def _scan(path: Path, id_field: str) -> Tuple[int, Any, Any]:
+    """统计已有活动段的条数与首末 id（跳过无法解析的残缺行）。"""
+    records, first, last = 0, None, None
+    for raw in iter_lines(path):
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            continue
+        records += 1
+        item_id = item.get(id_field) if isinstance(item, dict) else None
+        if item_id is not None:
+            first = item_id if first is None else first
+            last = item_id
+    return records, first, last
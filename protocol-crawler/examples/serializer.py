@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+pc JSON 序列化后端：JSONL 输出与签名请求体共用，默认标准库，安装了 orjson / msgspec 时可切换。
+
+- line(obj)：JSONL 一行（含换行）。标准库后端与 json.dumps(obj, ensure_ascii=False) 逐字节一致；
+  快后端输出紧凑格式、解析结果相同（NaN / Infinity 写为 null），遇到不支持的对象回退标准库（报错也一致）
+- compact(obj, sort_keys)：签名敏感的紧凑格式，任何后端都与
+  json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=...).encode("utf-8") 逐字节一致
+- orjson 与标准库的差异只在浮点记法（1e16 / 1e+16、0.000025 / 2.5e-05）、NaN 和非 str 键上，
+  compact 先用 _portable() 检查，不满足时回退标准库
+- get_serializer("auto") 选已安装的最快后端
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class Serializer:
+    """标准库后端：复用编码器实例（json.dumps 传了参数时每次调用都会新建 JSONEncoder）。"""
+
+    name = "stdlib"
+
+    def __init__(self) -> None:
+        self._line = json.JSONEncoder(ensure_ascii=False).encode
+        self._compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        self._compact_sorted = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode
+
+    def line(self, obj: Any) -> bytes:
+        """JSONL 一行（utf-8，含换行）。"""
+        return (self._line(obj) + "\n").encode("utf-8")
+
+    def compact(self, obj: Any, sort_keys: bool = False) -> bytes:
+        """签名 / 请求体用的紧凑格式（utf-8）；.decode() 即 json.dumps 的结果。"""
+        return (self._compact_sorted if sort_keys else self._compact)(obj).encode("utf-8")
+
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    # datetime / dataclass 交给 default（未提供，即报错后回退标准库），与标准库同样拒绝
+    _OPTIONS = 0 if orjson is None else orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def line(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=self._OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:  # orjson.JSONEncodeError 是 TypeError 的子类：非 str 键、超 64 位整数等
+            return super().line(obj)
+
+    def compact(self, obj: Any, sort_keys: bool = False) -> bytes:
+        if _portable(obj):
+            try:
+                return orjson.dumps(obj, option=self._OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+            except TypeError:  # 孤立代理字符、循环引用：由标准库给出同样的报错
+                pass
+        return super().compact(obj, sort_keys)
+
+
+class MsgspecSerializer(Serializer):
+    """msgspec 只用于 JSONL 行；其浮点记法未逐一核对，compact 仍走标准库。"""
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._encode = msgspec.json.Encoder().encode
+
+    def line(self, obj: Any) -> bytes:
+        try:
+            return self._encode(obj) + b"\n"
+        except (TypeError, ValueError, OverflowError):
+            return super().line(obj)
+
+
+BACKENDS: Dict[str, Type[Serializer]] = {
+    "stdlib": Serializer,
+    "orjson": OrjsonSerializer,
+    "msgspec": MsgspecSerializer,
+}
+
+
+def available_backends() -> List[str]:
+    """已安装的后端，按速度从快到慢。"""
+    installed = {"stdlib": True, "orjson": orjson is not None, "msgspec": msgspec is not None}
+    return [name for name in ("orjson", "msgspec", "stdlib") if installed[name]]
+
+
+def get_serializer(name: str = "stdlib") -> Serializer:
+    """按名称创建后端；"auto" 取已安装的最快后端，指定的后端未安装时抛出 ValueError。"""
+    if name == "auto":
+        name = available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"未知序列化后端：{name}（可选 {', '.join(BACKENDS)}、auto）")
+    if name not in available_backends():
+        raise ValueError(f"序列化后端 {name} 未安装：pip install {name}")
+    return BACKENDS[name]()
+
+
+def _portable(obj: Any) -> bool:
+    """obj 只含 str 键的 dict、list / tuple、str、bool、None、64 位整数和普通记法范围内的有限浮点数。"""
+    kind = type(obj)
+    if kind is str or kind is bool or obj is None:
+        return True
+    if kind is int:
+        return -(1 << 63) <= obj < (1 << 64)
+    if kind is float:
+        # 标准库 repr 在指数 < -4 或 >= 16 时改用科学记数法，此区间内两者都是最短往返的普通记法
+        return obj == 0 or 1e-4 <= abs(obj) < 1e16  # NaN 比较为 False
+    if kind is dict:
+        for key, value in obj.items():
+            if type(key) is not str or not _portable(value):
+                return False
+        return True
+    if kind is list or kind is tuple:
+        for value in obj:
+            if not _portable(value):
+                return False
+        return True
+    return False
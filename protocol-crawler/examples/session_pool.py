@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+pc 会话池：按 (dl, impersonate, 账号) 复用 curl_cffi 会话，保留 keep-alive 的 TLS / HTTP/2 连接。
+
+- 同步 SessionPool：会话独占借出（curl_cffi Session 非线程安全），同一 key 并发时最多建 max_per_key 个
+- 异步 AsyncSessionPool：每个 key 一个 AsyncSession，协程间共享（curl_cffi 异步会话自身支持并发）
+- 总数上限按 LRU 淘汰空闲会话，空闲超过 idle_timeout 的会话关闭（服务端通常早已断开 keep-alive）
+- 每个 key 一个 CookieJar，同 key 的多个会话共享，会话被淘汰后重建时 cookies 仍在
+- stats() 统计借出次数、新建会话数（每次新建都要完整握手）与复用率
+"""
+
+from __future__ import annotations
+
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from http.cookiejar import CookieJar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class SessionKey(NamedTuple):
+    proxy: Optional[str]
+    impersonate: str = "chrome110"
+    account: Optional[str] = None
+
+
+SessionFactory = Callable[[SessionKey, CookieJar], Any]
+
+
+def _proxies(key: SessionKey) -> Optional[Dict[str, str]]:
+    return {"http": key.proxy, "https": key.proxy} if key.proxy else None
+
+
+def default_session_factory(key: SessionKey, jar: CookieJar) -> Any:
+    """新建 curl_cffi 同步会话，并挂上该 key 共享的 CookieJar。"""
+    from curl_cffi import requests as cffi_requests
+
+    session = cffi_requests.Session(impersonate=key.impersonate, proxies=_proxies(key))
+    session.cookies.jar = jar
+    return session
+
+
+def default_async_session_factory(key: SessionKey, jar: CookieJar) -> Any:
+    """新建 curl_cffi 异步会话，并挂上该 key 共享的 CookieJar。"""
+    from curl_cffi.requests import AsyncSession
+
+    session = AsyncSession(impersonate=key.impersonate, proxies=_proxies(key))
+    session.cookies.jar = jar
+    return session
+
+
+@dataclass
+class PoolStats:
+    leases: int = 0
+    created: int = 0
+    evicted_lru: int = 0
+    evicted_idle: int = 0
+    overflow: int = 0  # 达到上限且无空闲会话可淘汰时临时新建、归还即关闭的会话
+
+    @property
+    def reuse_rate(self) -> float:
+        """复用已有会话（免握手）的借出占比。"""
+        return 1 - self.created / self.leases if self.leases else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["reuse_rate"] = round(self.reuse_rate, 4)
+        return data
+
+
+class _Entry:
+    __slots__ = ("key", "session", "last_used", "overflow", "in_use")
+
+    def __init__(self, key: SessionKey, session: Any, now: float, overflow: bool = False) -> None:
+        self.key = key
+        self.session = session
+        self.last_used = now
+        self.overflow = overflow
+        self.in_use = 0
+
+
+class _BasePool:
+    def __init__(self, factory: SessionFactory, max_size: int, idle_timeout: float, clock: Callable[[], float]) -> None:
+        if max_size < 1:
+            raise ValueError("max_size 至少为 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.jars: Dict[SessionKey, CookieJar] = {}
+        self._stats = PoolStats()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def cookie_jar(self, key: SessionKey) -> CookieJar:
+        """该 key 共享的 CookieJar（可用于注入浏览器导出的 cookies）。"""
+        with self._lock:
+            return self._jar(key)
+
+    def _jar(self, key: SessionKey) -> CookieJar:
+        jar = self.jars.get(key)
+        if jar is None:
+            jar = self.jars[key] = CookieJar()
+        return jar
+
+    def _create(self, key: SessionKey, overflow: bool = False) -> _Entry:
+        self._stats.created += 1
+        if overflow:
+            self._stats.overflow += 1
+        return _Entry(key, self.factory(key, self._jar(key)), self.clock(), overflow)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._stats.as_dict()
+
+
+class SessionPool(_BasePool):
+    """
+    线程安全的同步会话池：with pool.lease(key) as session: session.get(...)
+
+    同一 key 最多 max_per_key 个会话：都被借出时等待归还，而不是为短暂的并发高峰反复新建、握手后又被淘汰；
+    握手远慢于单次请求时默认 1 个最划算，单请求耗时很长的场景可适当调大；
+    与 DemoCrawler(fanout=K) 同用时需 max_per_key >= K，否则构造 DemoCrawler 时抛 ValueError。
+    """
+
+    def __init__(
+        self,
+        factory: SessionFactory = default_session_factory,
+        max_size: int = 32,
+        max_per_key: int = 1,
+        idle_timeout: float = 90.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(factory, max_size, idle_timeout, clock)
+        self.max_per_key = max_per_key
+        self._idle: Dict[SessionKey, List[_Entry]] = {}  # 每个 key 的空闲会话，末尾最近使用
+        self._lru: "OrderedDict[int, _Entry]" = OrderedDict()  # 全部空闲会话，最久未用在前
+        self._per_key: Dict[SessionKey, int] = {}  # 每个 key 的会话数（空闲 + 借出）
+        self._total = 0  # 空闲 + 借出（不含 overflow）
+        self._returned = threading.Condition(self._lock)
+
+    @contextmanager
+    def lease(self, key: SessionKey) -> Iterator[Any]:
+        entry = self._checkout(key)
+        try:
+            yield entry.session
+        finally:
+            self._checkin(entry)
+
+    def _checkout(self, key: SessionKey) -> _Entry:
+        to_close: List[_Entry] = []
+        try:
+            with self._lock:
+                self._stats.leases += 1
+                while True:
+                    if self._closed:
+                        raise RuntimeError("会话池已关闭")
+                    to_close.extend(self._evict_idle_locked())
+                    stack = self._idle.get(key)
+                    if stack:
+                        entry = stack.pop()
+                        if not stack:
+                            del self._idle[key]
+                        del self._lru[id(entry)]
+                        return entry
+                    if self._per_key.get(key, 0) < self.max_per_key:
+                        break
+                    self._returned.wait()
+                if self._total >= self.max_size and self._lru:
+                    victim = self._pick_victim_locked()
+                    self._remove_idle_locked(victim)
+                    self._stats.evicted_lru += 1
+                    to_close.append(victim)
+                overflow = self._total >= self.max_size
+                entry = self._create(key, overflow)
+                self._per_key[key] = self._per_key.get(key, 0) + 1
+                if not overflow:
+                    self._total += 1
+                return entry
+        finally:
+            _close_all(to_close)
+
+    def _checkin(self, entry: _Entry) -> None:
+        with self._lock:
+            self._returned.notify_all()
+            if not (entry.overflow or self._closed):
+                entry.last_used = self.clock()
+                self._idle.setdefault(entry.key, []).append(entry)
+                self._lru[id(entry)] = entry
+                return
+            self._forget_locked(entry)
+        _close_all([entry])
+
+    def _pick_victim_locked(self) -> _Entry:
+        """优先淘汰同 key 有多个空闲会话中最久未用的一个，否则淘汰全局最久未用。"""
+        for entry in self._lru.values():
+            if len(self._idle[entry.key]) > 1:
+                return entry
+        return next(iter(self._lru.values()))
+
+    def _evict_idle_locked(self) -> List[_Entry]:
+        expired = []
+        deadline = self.clock() - self.idle_timeout
+        while self._lru:
+            entry = next(iter(self._lru.values()))
+            if entry.last_used > deadline:
+                break
+            self._remove_idle_locked(entry)
+            self._stats.evicted_idle += 1
+            expired.append(entry)
+        return expired
+
+    def _remove_idle_locked(self, entry: _Entry) -> None:
+        del self._lru[id(entry)]
+        stack = self._idle[entry.key]
+        stack.remove(entry)
+        if not stack:
+            del self._idle[entry.key]
+        self._forget_locked(entry)
+
+    def _forget_locked(self, entry: _Entry) -> None:
+        remaining = self._per_key[entry.key] - 1
+        if remaining:
+            self._per_key[entry.key] = remaining
+        else:
+            del self._per_key[entry.key]
+        if not entry.overflow:
+            self._total -= 1
+        self._returned.notify_all()
+
+    def evict_idle(self) -> int:
+        """关闭空闲超时的会话，返回关闭数量（借出时也会顺带执行）。"""
+        with self._lock:
+            expired = self._evict_idle_locked()
+        _close_all(expired)
+        return len(expired)
+
+    def close(self) -> None:
+        """关闭全部空闲会话；借出中的会话在归还时关闭，等待中的借出抛 RuntimeError。"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._lru.values())
+            for entry in idle:
+                self._remove_idle_locked(entry)
+        _close_all(idle)
+
+
+class AsyncSessionPool(_BasePool):
+    """异步会话池：async with pool.lease(key) as session: await session.get(...)；同一 key 的协程共享一个会话。"""
+
+    def __init__(
+        self,
+        factory: SessionFactory = default_async_session_factory,
+        max_size: int = 32,
+        idle_timeout: float = 90.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(factory, max_size, idle_timeout, clock)
+        self._sessions: "OrderedDict[SessionKey, _Entry]" = OrderedDict()  # 最久未用在前
+
+    @asynccontextmanager
+    async def lease(self, key: SessionKey) -> AsyncIterator[Any]:
+        entry, to_close = self._checkout(key)
+        await _aclose_all(to_close)
+        try:
+            yield entry.session
+        finally:
+            await _aclose_all(self._checkin(entry))
+
+    def _checkout(self, key: SessionKey) -> Tuple[_Entry, List[_Entry]]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("会话池已关闭")
+            self._stats.leases += 1
+            to_close = self._evict_locked(self.clock() - self.idle_timeout, idle_only=True)
+            entry = self._sessions.get(key)
+            if entry is None:
+                if len(self._sessions) >= self.max_size:
+                    to_close += self._evict_locked(None, idle_only=False)
+                entry = self._create(key, overflow=len(self._sessions) >= self.max_size)
+                if not entry.overflow:
+                    self._sessions[key] = entry
+            else:
+                self._sessions.move_to_end(key)
+            entry.in_use += 1
+            return entry, to_close
+
+    def _checkin(self, entry: _Entry) -> List[_Entry]:
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = self.clock()
+            if entry.in_use == 0 and (entry.overflow or self._closed):
+                if not entry.overflow:
+                    self._sessions.pop(entry.key, None)
+                return [entry]
+            return []
+
+    def _evict_locked(self, deadline: Optional[float], idle_only: bool) -> List[_Entry]:
+        """idle_only 时关闭空闲超时的会话；否则按 LRU 淘汰一个未在使用的会话。"""
+        evicted = []
+        for key, entry in list(self._sessions.items()):
+            if entry.in_use:
+                continue
+            if idle_only and entry.last_used > deadline:
+                continue
+            del self._sessions[key]
+            evicted.append(entry)
+            if idle_only:
+                self._stats.evicted_idle += 1
+            else:
+                self._stats.evicted_lru += 1
+                break
+        return evicted
+
+    async def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle = [entry for entry in self._sessions.values() if not entry.in_use]
+            for entry in idle:
+                del self._sessions[entry.key]
+        await _aclose_all(idle)
+
+
+def _close_all(entries: List[_Entry]) -> None:
+    for entry in entries:
+        entry.session.close()
+
+
+async def _aclose_all(entries: List[_Entry]) -> None:
+    for entry in entries:
+        result = entry.session.close()
+        if inspect.isawaitable(result):
+            await result
@@ -3,139 +3,82 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import random
 import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from email.utils import formatdate
 from pathlib import Path
-from typing import Any, Dict, Optional
-
-
-@dataclass
-class MockResponse:
-    """模拟 HTTP 响应对象。"""
-
-    status_code: int
-    payload: Dict[str, Any]
-    headers: Dict[str, str]
-
-    def json(self) -> Dict[str, Any]:
-        return self.payload
-
-
-class MockClient:
-    """模拟客户端：第一页成功，第二页先 429 再成功，第三页成功结束。"""
-
-    def __init__(self) -> None:
-        self.calls = 0
-        self.cursor_attempts: Dict[Optional[str], int] = {}
-
-    def get(self, _url: str, params: Optional[Dict[str, Any]] = None, **_kwargs: Any) -> MockResponse:
-        self.calls += 1
-        cursor = (params or {}).get("cursor")
-        self.cursor_attempts[cursor] = self.cursor_attempts.get(cursor, 0) + 1
-
-        if cursor is None:
-            return MockResponse(
-                status_code=200,
-                payload={
-                    "items": [{"id": 1}, {"id": 2}],
-                    "next_cursor": "c1",
-                },
-                headers={},
-            )
-
-        if cursor == "c1" and self.cursor_attempts[cursor] == 1:
-            return MockResponse(
-                status_code=429,
-                payload={},
-                headers={"Retry-After": "1"},
-            )
-
-        if cursor == "c1":
-            return MockResponse(
-                status_code=200,
-                payload={
-                    "items": [{"id": 3}],
-                    "next_cursor": "c2",
-                },
-                headers={},
-            )
-
+from typing import Any, Dict, List, Optional, Tuple
+
+from async_crawler import AsyncDemoCrawler, CrawlTask, new_task_progress
+from checkpoint_store import CheckpointStore
+from demo_crawler import DEFAULT_TASK, DemoCrawler
+from http_cache import HttpCache
+from json_stream import StreamExtractor
+from jsonl_sink import JsonlSink
+from mock_clients import (
+    API_URL,
+    AsyncMockClient,
+    AsyncConditionalMockClient,
+    AsyncPagedMockClient,
+    AsyncTimeRangeMockClient,
+    ChainMockClient,
+    ConditionalMockClient,
+    FaultyAsyncClient,
+    LargePageMockClient,
+    MockAsyncSession,
+    MockClient,
+    MockResponse,
+    MockSession,
+    PagedMockClient,
+    ProxyFaultClient,
+    ServerQuota,
+    skewed_timestamps,
+)
+from proxy_pool import ProxyPool
+from rate_limiter import RateLimiter
+from segment_sink import SegmentedSink, SegmentPolicy, iter_lines, load_manifest
+from serializer import Serializer, available_backends, get_serializer
+from session_pool import AsyncSessionPool, SessionKey, SessionPool
+from task_queue import DONE, TaskQueue, run_worker
+from time_shards import ShardPlanner, ShardStats
+
+
+class SimulatedCrash(RuntimeError):
+    """模拟进程在两次 flush 之间崩溃。"""
+
+
+class CrashingCrawler(DemoCrawler):
+    """写入 c2 断点前崩溃：c1 页数据仍在缓冲中，随崩溃丢失。"""
+
+    def _save_checkpoint(self, task_id: str, cursor: Optional[str], *args: Any) -> None:
         if cursor == "c2":
-            return MockResponse(
-                status_code=200,
-                payload={
-                    "items": [{"id": 4}],
-                    "next_cursor": None,
-                },
-                headers={},
-            )
+            self.sink.abort()
+            self.dedup.close()
+            self.checkpoint.abort()
+            raise SimulatedCrash("模拟崩溃")
+        super()._save_checkpoint(task_id, cursor, *args)
+
 
-        return MockResponse(status_code=404, payload={}, headers={})
+class BrokenClient:
+    """每个请求都抛出非 OSError 的异常（如客户端内部解析出错）。"""
+
+    def get(self, _url: str, **_kwargs: Any) -> Any:
+        raise ValueError("模拟客户端内部错误")
 
     def close(self) -> None:
         """保持与真实客户端接口一致。"""
 
 
-class DemoCrawler:
-    """最小可运行爬虫，覆盖分页、429 重试、输出与断点写入。"""
-
-    def __init__(self, output_dir: Path, checkpoint_file: Path) -> None:
-        self.client = MockClient()
-        self.output_dir = output_dir
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.checkpoint_file = checkpoint_file
-        self.results = []
-        self.max_retries = 3
-
-    def run(self) -> None:
-        cursor: Optional[str] = None
-        while True:
-            data = self._fetch_page(cursor)
-            if data is None:
-                break
-
-            items = data.get("items", [])
-            self._save_items(items)
-
-            cursor = data.get("next_cursor")
-            if cursor is None:
-                break
-            self._save_checkpoint(cursor)
-
-    def _fetch_page(self, cursor: Optional[str]) -> Optional[Dict[str, Any]]:
-        params: Dict[str, Any] = {"limit": 20}
-        if cursor:
-            params["cursor"] = cursor
-
-        resp = self.client.get("https://api.example.com/data", params=params)
-        if resp.status_code == 200:
-            return resp.json()
-
-        if resp.status_code == 429:
-            for attempt in range(1, self.max_retries + 1):
-                retry_after = int(resp.headers.get("Retry-After", "1")) * attempt
-                time.sleep(retry_after * 0.01)
-                resp = self.client.get("https://api.example.com/data", params=params)
-                if resp.status_code != 429:
-                    break
-            if resp.status_code == 429:
-                return None
-            return resp.json()
-
-        return None
-
-    def _save_items(self, items: list[Dict[str, Any]]) -> None:
-        output_file = self.output_dir / "data.jsonl"
-        with output_file.open("a", encoding="utf-8") as f:
-            for item in items:
-                f.write(json.dumps(item, ensure_ascii=False) + "\n")
-        self.results.extend(items)
-
-    def _save_checkpoint(self, cursor: str) -> None:
-        with self.checkpoint_file.open("w", encoding="utf-8") as f:
-            json.dump({"cursor": cursor, "count": len(self.results)}, f, ensure_ascii=False)
+def load_task_checkpoint(checkpoint_file: Path, task_id: str) -> Dict[str, Any]:
+    """通过 snapshot + WAL 重放读取单个 task 断点。"""
+    store = CheckpointStore(checkpoint_file)
+    state = store.get_task(task_id) or {}
+    store.close()
+    return state
 
 
 def assert_smoke_result(output_dir: Path, checkpoint_file: Path) -> None:
@@ -151,9 +94,835 @@ def assert_smoke_result(output_dir: Path, checkpoint_file: Path) -> None:
     if not checkpoint_file.exists():
         raise RuntimeError("缺少 checkpoint.json 文件")
 
-    checkpoint = json.loads(checkpoint_file.read_text(encoding="utf-8"))
-    if checkpoint.get("cursor") != "c2":
-        raise RuntimeError(f"断点游标异常，期望 c2，实际 {checkpoint.get('cursor')}")
+    checkpoint = load_task_checkpoint(checkpoint_file, DEFAULT_TASK)
+    if not checkpoint.get("completed") or checkpoint.get("cursor") is not None or checkpoint.get("count") != 4:
+        raise RuntimeError(f"末页未写完成断点：{checkpoint}")
+
+
+def assert_task_completion(root: Path) -> None:
+    """已完成的 task 恢复时不再请求；404 等不可重试状态记为失败，断点保留该页游标且不标记完成。"""
+    done = DemoCrawler(output_dir=root / "output", checkpoint_file=root / "checkpoint.json")
+    done.run(resume=True)
+    done.close()
+    if done.client.calls != 0 or done.failed:
+        raise RuntimeError(f"已完成的 task 恢复后仍在抓取：请求 {done.client.calls} 次")
+
+    checkpoint_file = root / "gone" / "checkpoint.json"
+    store = CheckpointStore(checkpoint_file)
+    store.update_task(DEFAULT_TASK, {"cursor": "c9", "count": 0, "retry_count": 0})
+    store.close()
+    gone = DemoCrawler(output_dir=root / "gone" / "output", checkpoint_file=checkpoint_file)
+    gone.run(resume=True)
+    gone.close()
+    state = load_task_checkpoint(checkpoint_file, DEFAULT_TASK)
+    if gone.failed != {DEFAULT_TASK: 404} or gone.client.calls != 1:
+        raise RuntimeError(f"不可重试状态未记为失败：{gone.failed}，请求 {gone.client.calls} 次")
+    if state.get("cursor") != "c9" or state.get("completed") or state.get("last_error") != "HTTP 404":
+        raise RuntimeError(f"失败 task 断点异常：{state}")
+
+
+def read_jsonl_ids(data_file: Path) -> List[Any]:
+    """读取 JSONL 中全部记录 id。"""
+    lines = data_file.read_text(encoding="utf-8").split("\n")  # U+2028 等字符在 JSONL 中原样写出，不能按 splitlines 切分
+    return [json.loads(line)["id"] for line in lines if line.strip()]
+
+
+def assert_crash_consistency(root: Path) -> None:
+    """模拟两次 flush 之间崩溃，校验断点不超前于落盘数据，且恢复后条数一致。"""
+    output_dir = root / "crash-output"
+    checkpoint_file = root / "crash-checkpoint.json"
+
+    crawler = CrashingCrawler(output_dir=output_dir, checkpoint_file=checkpoint_file)
+    try:
+        crawler.run()
+        raise RuntimeError("崩溃注入未生效")
+    except SimulatedCrash:
+        pass
+
+    checkpoint = load_task_checkpoint(checkpoint_file, DEFAULT_TASK)
+    durable_ids = read_jsonl_ids(output_dir / "data.jsonl")
+    if checkpoint["count"] != len(durable_ids):
+        raise RuntimeError(f"断点超前于落盘数据：断点 {checkpoint['count']} 条，文件 {len(durable_ids)} 条")
+
+    resumed = DemoCrawler(output_dir=output_dir, checkpoint_file=checkpoint_file)
+    resumed.run(resume=True)
+    resumed.close()
+
+    ids = read_jsonl_ids(output_dir / "data.jsonl")
+    if ids != [1, 2, 3, 4]:
+        raise RuntimeError(f"崩溃恢复后数据异常：{ids}")
+
+    # 从头重跑一遍：去重索引应拦截全部已写入记录
+    rerun = DemoCrawler(output_dir=output_dir, checkpoint_file=checkpoint_file)
+    rerun.run()
+    rerun.close()
+    ids = read_jsonl_ids(output_dir / "data.jsonl")
+    if ids != [1, 2, 3, 4] or rerun.results:
+        raise RuntimeError(f"重跑后去重失效：{ids}")
+
+
+def assert_torn_tail(root: Path) -> None:
+    """上次 flush 只部分落盘留下末尾半行：重开时截掉半行，恢复写入的记录不会接在其后、也不会被去重索引误判已写入。"""
+    output_dir = root / "torn-output"
+    checkpoint_file = root / "torn-checkpoint.json"
+    output_dir.mkdir(parents=True)
+    durable = b'{"id": 1}\n{"id": 2}\n'
+    (output_dir / "data.jsonl").write_bytes(durable + b'{"id": 3, "x":')
+    store = CheckpointStore(checkpoint_file)
+    store.update_task(DEFAULT_TASK, {"cursor": "c1", "count": 2, "retry_count": 0})
+    store.close()
+
+    crawler = DemoCrawler(output_dir=output_dir, checkpoint_file=checkpoint_file)
+    crawler.run(resume=True)
+    crawler.close()
+    data = (output_dir / "data.jsonl").read_bytes()
+    if not data.startswith(durable) or read_jsonl_ids(output_dir / "data.jsonl") != [1, 2, 3, 4]:
+        raise RuntimeError(f"末尾半行未修复：{data!r}")
+
+
+def assert_checkpoint_wal(root: Path) -> int:
+    """校验 WAL 断点：单次更新写入量与 task 总数无关，崩溃后 snapshot + WAL 重放可恢复。"""
+    path = root / "wal" / "progress.json"
+    store = CheckpointStore(path, compact_every=300)
+    expected: Dict[str, Dict[str, Any]] = {}
+    for page in range(1, 3):
+        for i in range(500):
+            task_id = f"task_{i:04d}"
+            state = {"cursor": f"{task_id}:{page}", "page": page, "saved": page * 20, "completed": page == 2}
+            store.update_task(task_id, state)
+            expected[task_id] = state
+    per_update = store.bytes_written / 1000
+    store.abort()
+
+    recovered = CheckpointStore(path)
+    for task_id, state in expected.items():
+        got = recovered.get_task(task_id) or {}
+        if any(got.get(key) != value for key, value in state.items()):
+            raise RuntimeError(f"WAL 重放结果异常：{task_id} {got}")
+    recovered.close()
+
+    # 压缩后 WAL 为空，崩溃撕裂的正是首行：重开时须清掉半行，之后追加的进度才能在下次重放中恢复
+    torn = CheckpointStore(root / "wal-torn" / "progress.json")
+    torn.update_task("t", {"cursor": "c1"})
+    torn.close()
+    with open(torn.wal_path, "wb") as f:
+        f.write(b'{"task_id": "t", "state": {"cur')
+    reopened = CheckpointStore(torn.path)
+    for cursor in ("c2", "c3", "c4"):
+        reopened.update_task("t", {"cursor": cursor})
+    reopened.abort()
+    restored = CheckpointStore(torn.path)
+    cursor = (restored.get_task("t") or {}).get("cursor")
+    restored.close()
+    if cursor != "c4":
+        raise RuntimeError(f"WAL 首行撕裂后续写的进度丢失：恢复到 {cursor}")
+    if per_update > 256:
+        raise RuntimeError(f"单次断点写入量过大：{per_update:.0f} 字节")
+    return int(per_update)
+
+
+def build_async_tasks(count: int, hosts: int) -> List[CrawlTask]:
+    """构造分布在多个 host 上的 task 列表。"""
+    return [
+        CrawlTask(
+            task_id=f"task_{i:03d}",
+            url=f"https://h{i % hosts}.example.com/data",
+            params={"task": f"task_{i:03d}"},
+        )
+        for i in range(count)
+    ]
+
+
+def run_async_crawl(root: Path, tasks: List[CrawlTask], max_in_flight: int, per_host: int) -> float:
+    """按给定并发配置跑一次异步引擎，校验结果并返回耗时。"""
+    client = AsyncMockClient()
+    crawler = AsyncDemoCrawler(
+        client=client,
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        max_in_flight=max_in_flight,
+        per_host=per_host,
+        retry_scale=0.001,
+    )
+    started = time.perf_counter()
+    asyncio.run(crawler.run(tasks))
+    elapsed = time.perf_counter() - started
+
+    expected = len(tasks) * client.pages_per_task
+    lines = (root / "output" / "data.jsonl").read_text(encoding="utf-8").splitlines()
+    if len(lines) != expected:
+        raise RuntimeError(f"异步输出条数异常，期望 {expected} 条，实际 {len(lines)} 条")
+    if client.peak_in_flight > max_in_flight:
+        raise RuntimeError(f"全局在途超限：{client.peak_in_flight} > {max_in_flight}")
+    if max(client.host_peak.values()) > per_host:
+        raise RuntimeError(f"单 host 在途超限：{client.host_peak} > {per_host}")
+
+    progress = json.loads((root / "checkpoint.json").read_text(encoding="utf-8"))
+    pending = [tid for tid, state in progress["tasks"].items() if not state["completed"]]
+    if len(progress["tasks"]) != len(tasks) or pending:
+        raise RuntimeError(f"异步断点异常，未完成 task：{pending}")
+    return elapsed
+
+
+def assert_async_scaling(root: Path) -> float:
+    """校验异步引擎吞吐随并发配置提升，返回加速比。"""
+    tasks = build_async_tasks(count=16, hosts=4)
+    serial = run_async_crawl(root / "async-serial", tasks, max_in_flight=1, per_host=1)
+    parallel = run_async_crawl(root / "async-parallel", tasks, max_in_flight=8, per_host=2)
+    speedup = serial / parallel
+    if speedup < 3:
+        raise RuntimeError(f"并发加速不足：串行 {serial:.3f}s，并发 {parallel:.3f}s")
+    return speedup
+
+
+def assert_async_faults(root: Path) -> int:
+    """
+    异步引擎的传输层故障：连接重置与 503 在 task 内退避重试、HTTP 日期格式的 Retry-After 可解析；
+    某个 task 抛出未处理异常时，其余 task 先被取消并退出，之后才关闭输出与断点。返回重试成功的连接重置次数。
+    """
+    tasks = build_async_tasks(count=6, hosts=2)
+    retry_after = formatdate(time.time() - 1, usegmt=True)
+    client = FaultyAsyncClient(
+        AsyncMockClient(retry_after=retry_after),
+        flaky={t.task_id for t in tasks[::2]},
+        unavailable={t.task_id for t in tasks[1::2]},
+    )
+    crawler = AsyncDemoCrawler(
+        client=client,
+        output_dir=root / "async-faults" / "output",
+        checkpoint_file=root / "async-faults" / "checkpoint.json",
+        retry_scale=0.001,
+    )
+    asyncio.run(crawler.run(tasks))
+    store = CheckpointStore(root / "async-faults" / "checkpoint.json")
+    incomplete = store.list_incomplete_tasks()
+    retry_counts = {t.task_id: (store.get_task(t.task_id) or {}).get("retry_count") for t in tasks}
+    store.close()
+    if len(crawler.results) != 18 or incomplete or client.unavailable_hits != 9:
+        raise RuntimeError(
+            f"连接重置 / 503 后未重试完成：{len(crawler.results)} 条，{client.resets} 次重置，"
+            f"{client.unavailable_hits} 次 503"
+        )
+    # 重试次数按页计，成功写出一页即清零，不会随预取的下一页在整个 task 内累加
+    if any(count != 0 for count in retry_counts.values()):
+        raise RuntimeError(f"重试次数未按页清零：{retry_counts}")
+
+    crawler = AsyncDemoCrawler(
+        client=FaultyAsyncClient(AsyncMockClient(latency=0.02), flaky=set(), fatal="task_000"),
+        output_dir=root / "async-fatal" / "output",
+        checkpoint_file=root / "async-fatal" / "checkpoint.json",
+        retry_scale=0.001,
+    )
+    late: List[str] = []
+    save_checkpoint = crawler._save_checkpoint
+
+    def guarded(task_id: str, state: Dict[str, Any]) -> None:
+        if crawler.sink._file.closed:
+            late.append(task_id)
+        save_checkpoint(task_id, state)
+
+    crawler._save_checkpoint = guarded
+
+    async def run_fatal() -> int:
+        try:
+            await crawler.run(tasks)
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("task 抛出的异常未传到 run() 调用方")
+        # 除当前协程外不应再有仍在运行的抓取协程
+        await asyncio.sleep(0.05)
+        return len(asyncio.all_tasks()) - 1
+
+    leftover = asyncio.run(run_fatal())
+    if leftover or late:
+        raise RuntimeError(f"run() 关闭输出后仍有 {leftover} 个协程在运行，关闭后写断点 {late}")
+    return client.resets
+
+
+def assert_rate_limiter(quota_rate: float = 50.0, seconds: float = 1.5) -> float:
+    """同步线程与 asyncio 协程共用一个限速器打同一个配额，校验速率收敛到配额附近，返回成功速率占配额比例。"""
+    quota = ServerQuota(quota_rate, burst=5)
+    client = MockClient(quota=quota)
+    limiter = RateLimiter(
+        rate=10.0, max_rate=quota_rate * 10, increase=quota_rate / 20, success_window=5, retry_after_scale=0.01
+    )
+    counts = {"sync": 0, "async": 0, "throttled": 0}
+    deadline = time.monotonic() + seconds
+
+    def record(path: str, status: int) -> None:
+        counts[path if status == 200 else "throttled"] += 1
+
+    def sync_loop() -> None:
+        while time.monotonic() < deadline:
+            ticket = limiter.acquire(API_URL)
+            resp = client.get(API_URL)
+            limiter.feedback(ticket, resp.status_code, resp.headers)
+            record("sync", resp.status_code)
+
+    async def async_loop() -> None:
+        while time.monotonic() < deadline:
+            ticket = await limiter.acquire_async(API_URL)
+            resp = client.get(API_URL)
+            limiter.feedback(ticket, resp.status_code, resp.headers)
+            record("async", resp.status_code)
+
+    thread = threading.Thread(target=sync_loop)
+    thread.start()
+    asyncio.run(async_loop())
+    thread.join()
+
+    ok = counts["sync"] + counts["async"]
+    stats = limiter.stats()["api.example.com"]
+    if not counts["sync"] or not counts["async"]:
+        raise RuntimeError(f"同步/异步路径未共用限速器：{counts}")
+    if stats["decreases"] == 0 or counts["throttled"] > 0.15 * (ok + counts["throttled"]):
+        raise RuntimeError(f"限速器未按 429 调整速率：{counts} {stats}")
+    ratio = ok / seconds / quota_rate
+    if ratio < 0.5:
+        raise RuntimeError(f"限速器吞吐过低：配额的 {ratio:.0%}")
+    return ratio
+
+
+def run_chain_crawl(
+    root: Path, throttles: Dict[str, int], resume: bool = False, backoff_scale: float = 0.1
+) -> Tuple[DemoCrawler, float]:
+    """用 ChainMockClient 跑一组 task；限速器放宽且不因 429 暂停，只校验重试调度。"""
+    crawler = DemoCrawler(
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        client=ChainMockClient(throttles),
+        rate_limiter=RateLimiter(rate=1000.0, burst=50, min_rate=1000.0, max_rate=1000.0, retry_after_scale=0.0),
+        backoff_scale=backoff_scale,
+    )
+    tasks = [CrawlTask(task_id, API_URL, {"task": task_id}) for task_id in throttles]
+    started = time.perf_counter()
+    crawler.run_tasks(tasks, resume=resume)
+    elapsed = time.perf_counter() - started
+    crawler.close()
+    return crawler, elapsed
+
+
+def assert_retry_scheduler(root: Path) -> Tuple[float, float, float]:
+    """
+    混合 429 / 200 游标：总耗时应接近最长的单条退避链，而不是各链退避之和；
+    重试耗尽的 task 重试次数写入断点，恢复后不会从 0 重新计数。
+    """
+    throttles = {"t0": 3, "t1": 2, "t2": 1, "t3": 0, "t4": 2, "t5": 1}
+    backoff = 0.1  # Retry-After: 1 按 0.1 缩放
+    crawler, elapsed = run_chain_crawl(root / "retry-mixed", throttles, backoff_scale=backoff)
+    longest = max(throttles.values()) * backoff
+    serial = sum(throttles.values()) * backoff
+
+    lines = (root / "retry-mixed" / "output" / "data.jsonl").read_text(encoding="utf-8").splitlines()
+    if len(lines) != len(throttles) * crawler.client.pages_per_task or crawler.failed:
+        raise RuntimeError(f"重试调度输出异常：{len(lines)} 条，失败 task {crawler.failed}")
+    if elapsed > longest + 0.25 or elapsed > serial * 0.6:
+        raise RuntimeError(f"退避阻塞了其他 task：耗时 {elapsed:.2f}s，最长链 {longest:.2f}s，串行 {serial:.2f}s")
+
+    stuck_root = root / "retry-stuck"
+    stuck, _ = run_chain_crawl(stuck_root, {"stuck": 99}, backoff_scale=0.01)
+    state = load_task_checkpoint(stuck_root / "checkpoint.json", "stuck")
+    if stuck.failed != {"stuck": 429} or state.get("retry_count") != stuck.max_retries:
+        raise RuntimeError(f"重试次数未写入断点：{state}")
+    resumed, _ = run_chain_crawl(stuck_root, {"stuck": 99}, resume=True, backoff_scale=0.01)
+    if resumed.client.calls != 1 or resumed.failed != {"stuck": 429}:
+        raise RuntimeError(f"恢复后重试次数被清零：请求 {resumed.client.calls} 次")
+    return elapsed, longest, serial
+
+
+def assert_proxy_pool(root: Path) -> Dict[str, int]:
+    """DemoCrawler 经 dl 池抓取：失效 dl 失败后不再分到流量，数据完整，统计持久化且不含凭据。"""
+    good, dead = "http://u:pw@good.example.net:8001", "http://u:pw@dead.example.net:8002"
+    state_path = root / "proxy" / "proxy_stats.json"
+    pool = ProxyPool([good, dead], state_path=state_path, base_cooldown=60.0)
+    throttles = {f"p{i}": 0 for i in range(8)}
+    client = ProxyFaultClient(ChainMockClient(throttles), dead={dead})
+    crawler = DemoCrawler(
+        output_dir=root / "proxy" / "output",
+        checkpoint_file=root / "proxy" / "checkpoint.json",
+        client=client,
+        proxy_pool=pool,
+    )
+    crawler.run_tasks([CrawlTask(task_id, API_URL, {"task": task_id}) for task_id in throttles])
+    crawler.close()
+
+    lines = (root / "proxy" / "output" / "data.jsonl").read_text(encoding="utf-8").splitlines()
+    if len(lines) != len(throttles) * 4 or crawler.failed:
+        raise RuntimeError(f"dl 池抓取输出异常：{len(lines)} 条，失败 task {crawler.failed}")
+    if not 0 < client.by_proxy.get(dead, 0) <= pool.failure_threshold:
+        raise RuntimeError(f"失效 dl 仍在分到流量：{client.by_proxy}")
+
+    reloaded = ProxyPool([good, dead], state_path=state_path)
+    if reloaded.stats[dead].failures != client.by_proxy[dead] or reloaded.stats[good].requests != client.by_proxy[good]:
+        raise RuntimeError("dl 统计未持久化")
+    if "pw@" in state_path.read_text(encoding="utf-8"):
+        raise RuntimeError("dl 状态文件包含凭据")
+
+    # 复检请求抛出非 OSError 异常时 dl 同样要回报，否则一直占着复检名额，隔离再到期也不会被选中
+    now = [0.0]
+    probe_pool = ProxyPool([dead], base_cooldown=1.0, failure_threshold=1, clock=lambda: now[0])
+    probe_pool.report_failure(dead)
+    now[0] = 2.0
+    broken = DemoCrawler(
+        output_dir=root / "proxy-probe" / "output",
+        checkpoint_file=root / "proxy-probe" / "checkpoint.json",
+        client=BrokenClient(),
+        proxy_pool=probe_pool,
+    )
+    try:
+        broken._request(CrawlTask("probe", API_URL), {})
+        raise RuntimeError("客户端异常被吞掉")
+    except ValueError:
+        pass
+    broken.close()
+    now[0] = 10.0
+    if probe_pool.stats[dead].quarantines != 2 or probe_pool.acquire() != dead:
+        raise RuntimeError("复检异常后 dl 未回报，不再被选中")
+    return {"good": client.by_proxy[good], "dead": client.by_proxy.get(dead, 0)}
+
+
+def assert_session_pool(root: Path) -> Dict[str, float]:
+    """
+    会话池：同步爬虫按账号复用会话、多线程下会话独占借出且同 key 共享 CookieJar、
+    LRU / 空闲淘汰生效、异步爬虫的协程共享会话；返回同步与异步的复用率。
+    """
+    sessions: List[MockSession] = []
+    jars: Dict[SessionKey, set] = {}
+    chain = ChainMockClient({f"s{i}": 0 for i in range(8)})
+
+    def factory(key: SessionKey, jar: Any) -> MockSession:
+        jars.setdefault(key, set()).add(id(jar))
+        sessions.append(MockSession(chain, handshake=0.005))
+        return sessions[-1]
+
+    pool = SessionPool(factory, max_size=2)
+    crawler = DemoCrawler(
+        output_dir=root / "session" / "output",
+        checkpoint_file=root / "session" / "checkpoint.json",
+        client=chain,
+        session_pool=pool,
+    )
+    tasks = [CrawlTask(f"s{i}", API_URL, {"task": f"s{i}"}, account=f"acc{i % 2}") for i in range(8)]
+    crawler.run_tasks(tasks)
+    sync_stats = pool.stats()
+    if sync_stats["created"] != 2 or len(crawler.results) != 32:
+        raise RuntimeError(f"同步会话未按账号复用：{sync_stats}")
+
+    # 8 个线程争用 3 个 key：会话独占借出，同 key 等待归还；总数上限 2 个，超出按 LRU 淘汰或临时新建
+    def hammer(worker: int) -> None:
+        for i in range(20):
+            with pool.lease(SessionKey(None, "chrome110", f"acc{(worker + i) % 3}")) as session:
+                session.get(API_URL, params={"task": "s0"})
+
+    threads = [threading.Thread(target=hammer, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    crawler.close()
+    stats = pool.stats()
+    if any(len(ids) != 1 for ids in jars.values()) or not all(session.closed for session in sessions):
+        raise RuntimeError(f"CookieJar 未按 key 共享或会话未关闭：{stats}")
+    if stats["evicted_lru"] == 0 or stats["leases"] != 32 + 160:
+        raise RuntimeError(f"会话池 LRU 统计异常：{stats}")
+
+    # 分页窗口与会话池同用：max_per_key 小于 fanout 时拒绝，按 fanout 配置后窗口内各页不排队等同一个会话
+    paged = PagedMockClient(total=200, latency=0.01)
+    try:
+        DemoCrawler(
+            output_dir=root / "session-window-small" / "output",
+            checkpoint_file=root / "session-window-small" / "checkpoint.json",
+            session_pool=SessionPool(lambda key, jar: MockSession(paged, handshake=0.0)),
+            fanout=4,
+        )
+    except ValueError:
+        pass
+    else:
+        raise RuntimeError("会话池 max_per_key 小于 fanout 时未拒绝")
+    window_pool = SessionPool(lambda key, jar: MockSession(paged, handshake=0.0), max_per_key=4)
+    crawler = DemoCrawler(
+        output_dir=root / "session-window" / "output",
+        checkpoint_file=root / "session-window" / "checkpoint.json",
+        session_pool=window_pool,
+        fanout=4,
+    )
+    crawler.run_tasks([CrawlTask("offset", API_URL, {"offset": 0, "limit": 20})])
+    crawler.close()
+    if paged.peak_in_flight < 2 or len(crawler.results) != 200:
+        raise RuntimeError(f"会话池下分页窗口未并发：在途峰值 {paged.peak_in_flight}，{window_pool.stats()}")
+
+    now = [0.0]
+    idle_pool = SessionPool(lambda key, jar: MockSession(chain), idle_timeout=30.0, clock=lambda: now[0])
+    for account in ("a", "b"):
+        with idle_pool.lease(SessionKey(None, account=account)):
+            pass
+    now[0] = 31.0
+    if idle_pool.evict_idle() != 2:
+        raise RuntimeError(f"空闲会话未淘汰：{idle_pool.stats()}")
+
+    async_sessions: List[MockAsyncSession] = []
+    async_client = AsyncMockClient()
+
+    def async_factory(key: SessionKey, jar: Any) -> MockAsyncSession:
+        async_sessions.append(MockAsyncSession(async_client, handshake=0.005))
+        return async_sessions[-1]
+
+    async_pool = AsyncSessionPool(async_factory)
+    async_crawler = AsyncDemoCrawler(
+        client=async_client,
+        output_dir=root / "session-async" / "output",
+        checkpoint_file=root / "session-async" / "checkpoint.json",
+        max_in_flight=8,
+        retry_scale=0.001,
+        session_pool=async_pool,
+    )
+    asyncio.run(async_crawler.run(build_async_tasks(count=16, hosts=4)))
+    async_stats = async_pool.stats()
+    if len(async_sessions) != 1 or async_sessions[0].handshakes != 1 or not async_sessions[0].closed:
+        raise RuntimeError(f"异步协程未共享会话：{async_stats}")
+    return {"sync": sync_stats["reuse_rate"], "async": async_stats["reuse_rate"]}
+
+
+def run_cached_crawl(root: Path, client: ConditionalMockClient, tasks: List[CrawlTask]) -> Dict[str, Any]:
+    """同一输出目录与缓存目录上跑一轮，返回本轮缓存统计（每轮新建 HttpCache，覆盖索引持久化）。"""
+    cache = HttpCache(root / "cache")
+    crawler = DemoCrawler(
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        client=client,
+        http_cache=cache,
+    )
+    crawler.run_tasks(tasks)
+    crawler.close()
+    if crawler.failed:
+        raise RuntimeError(f"缓存抓取失败：{crawler.failed}")
+    return cache.stats()
+
+
+def assert_http_cache(root: Path) -> Dict[str, Any]:
+    """
+    协商缓存：重爬时未变页返回 304 并沿用缓存游标，只有内容变化的 task 重新下载；
+    数据不重复、磁盘占用受 max_bytes 约束、异步引擎同样生效；返回重爬统计。
+    """
+    throttles = {f"h{i}": 0 for i in range(8)}
+    tasks = [CrawlTask(task_id, API_URL, {"task": task_id}) for task_id in throttles]
+    client = ConditionalMockClient(ChainMockClient(throttles))
+    cold = run_cached_crawl(root / "cache", client, tasks)
+    cold_bytes = client.body_bytes
+    if cold["misses"] != 32 or cold["entries"] != 32:
+        raise RuntimeError(f"首轮未缓存全部页面：{cold}")
+
+    client.revisions["h3"] = 1
+    warm = run_cached_crawl(root / "cache", client, tasks)
+    warm_bytes = client.body_bytes - cold_bytes
+    if warm["hits"] != 28 or warm["changed"] != 4 or warm["misses"] != 0 or client.not_modified != 28:
+        raise RuntimeError(f"重爬未按校验器命中缓存：{warm}")
+    if warm_bytes * 4 > cold_bytes or len(read_jsonl_ids(root / "cache" / "output" / "data.jsonl")) != 32:
+        raise RuntimeError(f"重爬下载 {warm_bytes} 字节（首轮 {cold_bytes}）或输出重复")
+
+    small = HttpCache(root / "cache-small", max_bytes=4 * 1024)
+    for i in range(64):
+        body = {"items": [{"id": i, "text": "x" * 200}], "next_cursor": None}
+        small.resolve(f"k{i}", MockResponse(200, body, {"ETag": f'"{i}"'}))
+    small.close()
+    on_disk = sum(path.stat().st_size for path in small.bodies.iterdir())
+    if small.size_bytes > 4 * 1024 or on_disk != small.size_bytes or small.stats()["evicted"] == 0:
+        raise RuntimeError(f"缓存未按 LRU 淘汰：{small.stats()}，磁盘 {on_disk} 字节")
+
+    async_client = AsyncConditionalMockClient(AsyncMockClient())
+    crawled = []
+    for attempt in range(3):
+        async_cache = HttpCache(root / "cache-async" / "cache")
+        # 每轮新的断点文件、从头重爬；第二轮写入新目录，第三轮写回第一轮的目录
+        async_crawler = AsyncDemoCrawler(
+            client=async_client,
+            output_dir=root / "cache-async" / f"output-{attempt % 2}",
+            checkpoint_file=root / "cache-async" / f"checkpoint-{attempt}.json",
+            retry_scale=0.001,
+            http_cache=async_cache,
+        )
+        asyncio.run(async_crawler.run(build_async_tasks(count=4, hosts=2)))
+        crawled.append(sorted(item["id"] for item in async_crawler.results))
+    # 新输出目录下 304 页也要写出完整条目；写回已有目录时 304 页的条目由去重索引过滤
+    if async_cache.stats()["hits"] != 12 or not crawled[0] or crawled[1] != crawled[0] or crawled[2]:
+        raise RuntimeError(f"异步重爬未命中缓存或输出缺条目：{async_cache.stats()}，第三轮写出 {len(crawled[2])} 条")
+    if sorted(read_jsonl_ids(root / "cache-async" / "output-0" / "data.jsonl")) != crawled[0]:
+        raise RuntimeError("异步重爬写回同一目录后出现重复条目")
+    return {**warm, "bytes_ratio": warm_bytes / cold_bytes}
+
+
+def run_paged_crawl(root: Path, fanout: int, throttle_pages: set) -> Tuple[DemoCrawler, PagedMockClient, float]:
+    client = PagedMockClient(total=250, latency=0.02, throttle_pages=throttle_pages)
+    crawler = DemoCrawler(
+        output_dir=root / "output",
+        checkpoint_file=root / "checkpoint.json",
+        client=client,
+        rate_limiter=RateLimiter(rate=1000.0, burst=20, max_rate=1000.0, retry_after_scale=0.01),
+        fanout=fanout,
+    )
+    started = time.perf_counter()
+    crawler.run_tasks([CrawlTask("offset", API_URL, {"offset": 0, "limit": 20})])
+    elapsed = time.perf_counter() - started
+    crawler.close()
+    return crawler, client, elapsed
+
+
+def assert_pagination(root: Path) -> Dict[str, float]:
+    """
+    分页窗口：offset 分页 K 页并发、结果按页序写出、不足一页即停且推测请求有限；
+    page + total 分页在异步引擎中按 total 停止；cursor 链开启写线程后结果不变。
+    """
+    expected = [f"row-{i}" for i in range(250)]
+    serial, _, serial_elapsed = run_paged_crawl(root / "page-serial", 1, set())
+    windowed, client, elapsed = run_paged_crawl(root / "page-window", 4, {3})
+    stats = windowed.window_stats["offset"]
+    if read_jsonl_ids(root / "page-window" / "output" / "data.jsonl") != expected or windowed.failed:
+        raise RuntimeError(f"窗口抓取输出乱序或缺失：失败 {windowed.failed}")
+    if stats.reason != "short page" or stats.used != 13 or stats.wasted > 3 or not 2 <= client.peak_in_flight <= 4:
+        raise RuntimeError(f"窗口未按终止条件停止：{stats}，在途峰值 {client.peak_in_flight}")
+    state = load_task_checkpoint(root / "page-window" / "checkpoint.json", "offset")
+    if not state["completed"] or state["cursor"] is not None or state["count"] != 250:
+        raise RuntimeError(f"窗口末页未写完成断点：{state}")
+    if read_jsonl_ids(root / "page-serial" / "output" / "data.jsonl") != expected or elapsed * 2 > serial_elapsed:
+        raise RuntimeError(f"窗口未并发：{elapsed:.2f}s，逐页 {serial_elapsed:.2f}s")
+
+    async_client = AsyncPagedMockClient(total=100, latency=0.01, with_total=True)
+    async_crawler = AsyncDemoCrawler(
+        client=async_client,
+        output_dir=root / "page-async" / "output",
+        checkpoint_file=root / "page-async" / "checkpoint.json",
+        per_host=8,
+        fanout=8,
+    )
+    asyncio.run(async_crawler.run([CrawlTask("page", API_URL, {"page": 1, "page_size": 25})]))
+    async_stats = async_crawler.window_stats["page"]
+    if [item["id"] for item in async_crawler.results] != expected[:100] or async_stats.reason != "total reached":
+        raise RuntimeError(f"异步 page 分页异常：{async_stats}")
+    state = load_task_checkpoint(root / "page-async" / "checkpoint.json", "page")
+    if not state["completed"] or state["saved"] != 100:
+        raise RuntimeError(f"异步窗口断点异常：{state}")
+
+    pipelined = DemoCrawler(
+        output_dir=root / "pipeline" / "output",
+        checkpoint_file=root / "pipeline" / "checkpoint.json",
+        client=ChainMockClient({f"p{i}": i % 2 for i in range(8)}),
+        pipeline=True,
+    )
+    pipelined.run_tasks([CrawlTask(f"p{i}", API_URL, {"task": f"p{i}"}) for i in range(8)])
+    pipelined.close()
+    if len(read_jsonl_ids(root / "pipeline" / "output" / "data.jsonl")) != 32 or pipelined.failed:
+        raise RuntimeError("写线程流水线输出异常")
+    return {"speedup": serial_elapsed / elapsed, "wasted": stats.wasted, "peak": client.peak_in_flight}
+
+
+def run_sharded_crawl(root: Path, client: AsyncTimeRangeMockClient) -> Tuple[AsyncDemoCrawler, ShardStats]:
+    planner = ShardPlanner(initial_shards=4, concurrency=4, page_cap=5)
+    crawler = AsyncDemoCrawler(client, root / "output", root / "checkpoint.json", per_host=4, sharder=planner)
+    asyncio.run(crawler.run([CrawlTask("orders", API_URL, {"start_time": 0, "end_time": 10_000, "page": 1})]))
+    return crawler, planner.stats["orders"]
+
+
+def assert_time_shards(root: Path) -> ShardStats:
+    """
+    时间窗口分片：偏斜数据下过密窗口二分到翻页上限以内、稀疏窗口合并，数据不缺不重；
+    每个分片在断点中单独一项，续跑沿用分片计划，只重抓未完成的分片。
+    """
+    timestamps = skewed_timestamps(600, 0, 10_000)
+    crawler, stats = run_sharded_crawl(root / "shards", AsyncTimeRangeMockClient(timestamps, page_cap=5))
+    ids = sorted(item["id"] for item in crawler.results)
+    if ids != sorted(f"t-{i}" for i in range(600)) or stats.capped:
+        raise RuntimeError(f"分片抓取数据缺失或重复：{len(ids)} 条，{stats}")
+    if not (stats.splits and stats.merges) or stats.shards < 4:
+        raise RuntimeError(f"偏斜数据未触发二分 / 合并：{stats}")
+
+    store = CheckpointStore(root / "shards" / "checkpoint.json")
+    plan = store.get_task("orders")["plan"]
+    shard_states = {f"orders@{lo}-{hi}": store.get_task(f"orders@{lo}-{hi}") for lo, hi, _ in plan}
+    if any(total > 100 or shard_states[f"orders@{lo}-{hi}"]["saved"] != total for lo, hi, total in plan):
+        raise RuntimeError(f"分片条数超过翻页上限或断点与计划不符：{plan}")
+    lo, hi, total = max(plan, key=lambda row: row[2])
+    store.update_task(f"orders@{lo}-{hi}", new_task_progress())
+    store.close()
+
+    client = AsyncTimeRangeMockClient(timestamps, page_cap=5)
+    resumed, resumed_stats = run_sharded_crawl(root / "shards", client)
+    # 只重抓被重置的分片（每页 20 条，末页可能多探一页）；其条目已写出过，由去重索引过滤
+    if not resumed_stats.resumed or resumed_stats.probes or not 0 < client.calls <= -(-total // 20) + 1:
+        raise RuntimeError(f"分片续跑未按断点恢复：{resumed_stats}，请求 {client.calls} 次")
+    ids = read_jsonl_ids(root / "shards" / "output" / "data.jsonl")
+    if resumed.results or sorted(ids) != sorted(f"t-{i}" for i in range(600)):
+        raise RuntimeError(f"分片续跑写出重复条目：新写出 {len(resumed.results)} 条，文件共 {len(ids)} 条")
+    return stats
+
+
+def assert_task_queue(root: Path) -> int:
+    """
+    租约队列：过期租约转给其他 worker 并带上进度，原持有者的续租 / 完成标记被拒绝，完成只记一次；
+    多个 worker 线程共同消费直到队列清空。
+    """
+    now = [1000.0]
+    queue = TaskQueue(root / "queue.db", lease_seconds=10, clock=lambda: now[0])
+    if queue.enqueue((f"q{i}", {"task": f"q{i}"}) for i in range(6)) != 6 or queue.enqueue([("q0", {})]):
+        raise RuntimeError("重复入队未被忽略")
+    first = queue.acquire("w1")[0]
+    queue.save_progress(first, {"cursor": "2", "page": 2})
+    now[0] += 11
+    second = queue.acquire("w2")[0]
+    if second.task_id != "q0" or second.progress != {"cursor": "2", "page": 2} or second.token != first.token + 1:
+        raise RuntimeError(f"过期租约未转交或进度丢失：{second}")
+    if queue.heartbeat(first) or queue.complete(first) or queue.save_progress(first, {}):
+        raise RuntimeError("被接手后原持有者仍能续租 / 标记完成")
+    if not queue.complete(second) or queue.complete(second):
+        raise RuntimeError("完成标记不是恰好一次")
+
+    completed: List[int] = []
+    workers = [
+        threading.Thread(target=lambda w=w: completed.append(run_worker(queue, w, lambda lease: {"ok": True})))
+        for w in ("w3", "w4")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if sum(completed) != 5 or queue.counts()[DONE] != 6 or queue.get("q0")["owner"] != "w2":
+        raise RuntimeError(f"多 worker 消费异常：{queue.counts()}，完成 {completed}")
+    queue.close()
+    return sum(completed) + 1
+
+
+def assert_json_stream(root: Path) -> int:
+    """
+    流式提取：逐字节喂入时条目与翻页字段同整页解析一致；DemoCrawler 流式抓取大页，
+    中途断流的页重试后输出与整页解析抓取相同（已写出的条目由去重索引过滤）。
+    """
+    raw = b"".join(LargePageMockClient(pages=2, items_per_page=50, body_bytes=100).page_pieces(0))
+    extractor = StreamExtractor("data.items[*]", ("next_cursor",))
+    items = [item for i in range(len(raw)) for item in extractor.feed(raw[i : i + 1])] + extractor.close()
+    if items != json.loads(raw)["data"]["items"] or extractor.meta != {"next_cursor": "1"}:
+        raise RuntimeError(f"逐字节流式提取结果与整页解析不一致：{extractor.meta}")
+    assert_stream_numbers(random.Random(7))
+
+    outputs = {}
+    for mode, streaming in (("full", False), ("stream", True)):
+        # 不支持流式的客户端返回整页响应，按同一条目路径整页解析
+        client = LargePageMockClient(
+            3, items_per_page=300, body_bytes=500, broken_pages={1}, supports_stream=streaming
+        )
+        crawler = DemoCrawler(
+            output_dir=root / f"json-{mode}" / "output",
+            checkpoint_file=root / f"json-{mode}" / "checkpoint.json",
+            client=client,
+            stream_items="data.items[*]",
+            stream_chunk=4096,
+        )
+        crawler.run_tasks([CrawlTask("big", API_URL, {})])
+        crawler.close()
+        outputs[mode] = read_jsonl_ids(root / f"json-{mode}" / "output" / "data.jsonl")
+        if crawler.failed or client.calls != (4 if streaming else 3):
+            raise RuntimeError(f"{mode} 抓取异常：失败 {crawler.failed}，请求 {client.calls} 次")
+    if outputs["stream"] != outputs["full"] or len(outputs["stream"]) != 900:
+        raise RuntimeError(f"流式抓取输出与整页解析不同：{len(outputs['stream'])} / {len(outputs['full'])}")
+    return len(outputs["stream"])
+
+
+def assert_stream_numbers(rng: random.Random, rounds: int = 300) -> None:
+    """条目与翻页字段为浮点 / 指数 / 负数时，在随机分块边界（含数字中间）切开喂入，结果与 json.loads 一致。"""
+    numbers = [0, -7, 12345, 2.5, -0.125, 1e-7, 6.02e23, -3.5e-12, 1e300]
+    for _ in range(rounds):
+        items = [rng.choice(numbers) if rng.random() < 0.6 else {"v": rng.choice(numbers)} for _ in range(8)]
+        body = {"data": {"items": items, "total": rng.choice(numbers)}, "next_cursor": rng.choice(numbers)}
+        raw = json.dumps(body, separators=(",", ":") if rng.random() < 0.5 else (", ", ": ")).encode("utf-8")
+        cuts = sorted(rng.sample(range(1, len(raw)), rng.randint(1, 12)))
+        extractor = StreamExtractor("data.items[*]", ("next_cursor", "data.total"))
+        got = [item for a, b in zip([0, *cuts], [*cuts, len(raw)]) for item in extractor.feed(raw[a:b])]
+        got += extractor.close()
+        expected = json.loads(raw)
+        meta = {"next_cursor": expected["next_cursor"], "data.total": expected["data"]["total"]}
+        if got != expected["data"]["items"] or extractor.meta != meta:
+            raise RuntimeError(f"随机分块流式提取与 json.loads 不一致：{raw!r} 切分于 {cuts}")
+
+
+def assert_serializer(root: Path) -> List[str]:
+    """各已安装后端：compact 与 json.dumps 紧凑格式逐字节一致（含需回退的浮点 / 键），JSONL 行解析结果一致。"""
+    record = {
+        "id": "note_1",
+        "title": "标题 😀 \u2028\x00\x1f\"\\/\t",
+        "author": {"uid": 2**63 - 1, "verified": True, "bio": None},
+        "stats": {"ratio": 0.4375, "score": 1e15, "tiny": 1e-4, "neg": -0.0},
+        "tags": ["a", "中文"],
+        "pair": (1, 2),
+    }
+    fallbacks = [{"tiny": 2.5e-05}, {"big": 1e16}, {"nan": float("nan")}, {1: "int key"}, {"huge": 2**64}]
+    stdlib = Serializer()
+    for name in available_backends():
+        backend = get_serializer(name)
+        for obj in [record, *fallbacks]:
+            for sort_keys in (False, True):
+                expected = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys)
+                if backend.compact(obj, sort_keys=sort_keys) != expected.encode("utf-8"):
+                    raise RuntimeError(f"{name} 紧凑格式与标准库不一致：{obj}")
+        if json.loads(backend.line(record)) != json.loads(stdlib.line(record)):
+            raise RuntimeError(f"{name} JSONL 行解析结果与标准库不一致")
+    if stdlib.line(record) != (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"):
+        raise RuntimeError("标准库后端 JSONL 行与 json.dumps 不一致")
+
+    sink = JsonlSink(root / "serializer" / "data.jsonl", serializer=get_serializer("auto"))
+    sink.write_many({"id": i, "body": record} for i in range(100))
+    sink.close()
+    if read_jsonl_ids(sink.path) != list(range(100)):
+        raise RuntimeError("快后端写出的 JSONL 读回不一致")
+    return available_backends()
+
+
+def assert_segments(root: Path) -> int:
+    """
+    分段输出：按条数滚动、已关闭的段压缩，manifest 条数 / 首末 id / 偏移与内容一致，按段偏移读取跳过之前的段；
+    删除去重索引后跨压缩段重建，重跑无新增；上次未压缩的明文段在重开时补压缩。
+    """
+    expected = [f"row-{i}" for i in range(250)]
+    data_dir = root / "segments" / "output" / "data"
+
+    def crawl() -> DemoCrawler:
+        crawler = DemoCrawler(
+            output_dir=root / "segments" / "output",
+            checkpoint_file=root / "segments" / "checkpoint.json",
+            client=PagedMockClient(250, latency=0),
+            segments=SegmentPolicy(max_records=60, compression="gzip"),
+        )
+        crawler.run_tasks([CrawlTask("offset", API_URL, {"offset": 0, "limit": 20})])
+        crawler.close()
+        return crawler
+
+    first = crawl()
+    segments = load_manifest(data_dir)["segments"]
+    if [json.loads(raw)["id"] for raw in iter_lines(data_dir)] != expected or first.sink.rotations != 4:
+        raise RuntimeError(f"分段输出内容异常：滚动 {first.sink.rotations} 次")
+    bounds = [(entry["records"], entry["first_id"], entry["last_id"]) for entry in segments]
+    if bounds != [(60, expected[i * 60], expected[i * 60 + 59]) for i in range(4)]:
+        raise RuntimeError(f"manifest 段信息与内容不一致：{bounds}")
+    if any(entry["compression"] != "gzip" for entry in segments) or not (data_dir / "data-000005.jsonl").exists():
+        raise RuntimeError("已关闭的段未压缩或活动段缺失")
+    if json.loads(next(iter_lines(data_dir, segments[2]["offset"])))["id"] != "row-120":
+        raise RuntimeError("按段偏移读取未从该段开头开始")
+    (root / "segments" / "output" / "data.idx").unlink()
+    again = crawl()
+    if again.results or len(list(iter_lines(data_dir))) != 250:
+        raise RuntimeError("去重索引跨压缩段重建后重跑仍写入重复数据")
+
+    plain_dir = root / "segments-plain"
+    sink = SegmentedSink(plain_dir, SegmentPolicy(max_records=5, compression=None))
+    for i in range(12):
+        sink.write({"id": i})
+        sink.commit()
+    sink.close()
+    SegmentedSink(plain_dir, SegmentPolicy(max_records=5, compression="gzip")).close()
+    recovered = load_manifest(plain_dir)["segments"]
+    if [entry["compression"] for entry in recovered] != ["gzip", "gzip"] or len(list(plain_dir.glob("*.jsonl"))) != 1:
+        raise RuntimeError("重开时未补压缩明文段")
+    if [json.loads(raw)["id"] for raw in iter_lines(plain_dir)] != list(range(12)):
+        raise RuntimeError("补压缩后内容不一致")
+    return len(segments)
 
 
 def main() -> None:
@@ -164,10 +933,60 @@ def main() -> None:
 
         crawler = DemoCrawler(output_dir=output_dir, checkpoint_file=checkpoint_file)
         crawler.run()
-        crawler.client.close()
+        crawler.close()
         assert_smoke_result(output_dir, checkpoint_file)
+        assert_task_completion(root)
+        assert_crash_consistency(root)
+        assert_torn_tail(root)
+        per_update = assert_checkpoint_wal(root)
+        speedup = assert_async_scaling(root)
+        resets = assert_async_faults(root)
+        quota_ratio = assert_rate_limiter()
+        retry_elapsed, retry_longest, retry_serial = assert_retry_scheduler(root)
+        proxy_calls = assert_proxy_pool(root)
+        reuse = assert_session_pool(root)
+        cache_stats = assert_http_cache(root)
+        paging = assert_pagination(root)
+        shards = assert_time_shards(root)
+        queued = assert_task_queue(root)
+        streamed = assert_json_stream(root)
+        backends = assert_serializer(root)
+        segment_count = assert_segments(root)
 
     print("SMOKE PASS: 写入 4 条数据，分页与重试逻辑验证通过")
+    print("SMOKE PASS: flush 间隙崩溃后断点未超前于落盘数据，恢复后 4 条数据无缺失，重跑无重复")
+    print(f"SMOKE PASS: WAL 断点单次写入约 {per_update} 字节，崩溃后 snapshot + WAL 重放恢复 500 个 task")
+    print(f"SMOKE PASS: 异步引擎 16 个 task 并发完成，加速 {speedup:.1f}x，host/全局并发上限生效")
+    print(f"SMOKE PASS: 异步引擎 {resets} 次连接重置退避后完成，HTTP 日期 Retry-After 可解析，task 异常时先取消其余 task 再关闭")
+    print(f"SMOKE PASS: 自适应限速同步/异步共用，按 429 降速后吞吐达配额的 {quota_ratio:.0%}")
+    print(
+        f"SMOKE PASS: 延迟堆重试调度，混合 429/200 游标耗时 {retry_elapsed:.2f}s"
+        f"（最长链 {retry_longest:.2f}s，串行 {retry_serial:.2f}s），重试次数随断点恢复"
+    )
+    print(
+        f"SMOKE PASS: dl 池加权选择，失效 dl {proxy_calls['dead']} 次失败后不再分配，"
+        f"{proxy_calls['good']} 次请求经健康 dl 完成，统计持久化不含凭据"
+    )
+    print(
+        f"SMOKE PASS: 会话池按 (dl, impersonate, 账号) 复用，同步复用率 {reuse['sync']:.0%}、"
+        f"异步 {reuse['async']:.0%}，多线程独占借出、LRU / 空闲淘汰生效"
+    )
+    print(
+        f"SMOKE PASS: 协商缓存重爬命中率 {cache_stats['hit_rate']:.0%}（变化页重新下载），"
+        f"下载量为首轮的 {cache_stats['bytes_ratio']:.0%}，磁盘占用受上限约束"
+    )
+    print(
+        f"SMOKE PASS: offset 分页 {paging['peak']} 页并发窗口，按页序写出，加速 {paging['speedup']:.1f}x，"
+        f"越过末页的推测请求 {paging['wasted']} 个；page + total 异步窗口、cursor 写线程流水线通过"
+    )
+    print(
+        f"SMOKE PASS: 时间窗口分片 {shards.shards} 个（探测 {shards.probes} 次，二分 {shards.splits}、"
+        f"合并 {shards.merges}），偏斜数据不缺不重，按分片断点续跑"
+    )
+    print(f"SMOKE PASS: 租约队列 {queued} 个 task 各完成一次，过期租约带进度转交，原持有者的完成标记被拒绝")
+    print(f"SMOKE PASS: 大页流式提取 {streamed} 条，逐字节喂入与整页解析一致，断流页重试后不缺不重")
+    print(f"SMOKE PASS: 序列化后端 {' / '.join(backends)} 紧凑格式与 json.dumps 逐字节一致，JSONL 行解析一致")
+    print(f"SMOKE PASS: 分段输出滚动 {segment_count} 段并 gzip 压缩，manifest 与内容一致，去重索引跨段重建，明文段补压缩")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+pc 租约任务队列（SQLite）：多进程 / 多个 worker 从同一个队列领取 task，进程退出或卡死后 task 自动转给其他 worker。
+
+- acquire() 在 BEGIN IMMEDIATE 事务内领取 pending 或租约已过期的 task，发放租约并把 token 加 1
+- 持有期间 heartbeat() 续租；save_progress() 记录 task 进度（结构同进度文件 tasks 中的一项），转手后从该进度继续
+- complete() / release() 必须带当前 token（fencing token）：租约过期被他人接手后，原 worker 的完成标记被拒绝，
+  每个 task 只会被标记完成一次
+- 超过 max_attempts 次领取仍未完成的 task 标记为 dead，不再发放
+- 时钟用 time.time()：跨进程 / 跨机器共享 lease_until，lease_seconds 应远大于机器间时钟偏差；
+  多机共享时数据库需放在支持 POSIX 锁的文件系统上（NFS 等网络文件系统的锁不可靠）
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PENDING, LEASED, DONE, DEAD = "pending", "leased", "done", "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id     TEXT PRIMARY KEY,
+    payload     TEXT NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    owner       TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    token       INTEGER NOT NULL DEFAULT 0,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    progress    TEXT,
+    last_error  TEXT,
+    updated_at  REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_until);
+"""
+
+
+class LeaseLost(Exception):
+    """租约已过期并被其他 worker 接手，当前 worker 应停止处理该 task。"""
+
+
+@dataclass
+class Lease:
+    task_id: str
+    payload: Dict[str, Any]
+    token: int
+    worker: str
+    attempts: int
+    progress: Optional[Dict[str, Any]] = None  # 上一持有者保存的进度，首次领取为 None
+    lost: threading.Event = field(default_factory=threading.Event)  # 续租失败时置位
+
+
+class TaskQueue:
+    """
+    每个进程各自打开一个实例（同一实例可在本进程的多个线程间共享）：
+
+        queue.enqueue([("task_001", {"url": ...}), ...])
+        for lease in queue.acquire("worker-1"):
+            ...
+            queue.save_progress(lease, state)
+            queue.complete(lease, state)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = 30.0,
+        max_attempts: int = 5,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # isolation_level=None：自行控制事务，领取时用 BEGIN IMMEDIATE 先拿写锁再读，避免两个进程领到同一 task
+        self._conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # ===== 入队与领取 =====
+
+    def enqueue(self, tasks: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """批量入队，已存在的 task_id 跳过（可重复执行同一入队脚本），返回新增条数。"""
+        now = self.clock()
+        rows = [(task_id, json.dumps(payload, ensure_ascii=False), now) for task_id, payload in tasks]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO tasks (task_id, payload, updated_at) VALUES (?, ?, ?)", rows)
+            return conn.total_changes - before
+
+    def acquire(self, worker: str, limit: int = 1) -> List[Lease]:
+        """领取最多 limit 个 pending 或租约已过期的 task；没有可领取的 task 时返回空列表。"""
+        now = self.clock()
+        with self._transaction() as conn:
+            # 过期且领取次数已用完的 task 不再发放
+            conn.execute(
+                "UPDATE tasks SET state = ?, owner = NULL, last_error = COALESCE(last_error, 'lease expired'),"
+                " updated_at = ? WHERE state = ? AND lease_until < ? AND attempts >= ?",
+                (DEAD, now, LEASED, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT task_id, payload, token, attempts, progress FROM tasks"
+                " WHERE state = ? OR (state = ? AND lease_until < ?) ORDER BY rowid LIMIT ?",
+                (PENDING, LEASED, now, limit),
+            ).fetchall()
+            leases = []
+            for task_id, payload, token, attempts, progress in rows:
+                conn.execute(
+                    "UPDATE tasks SET state = ?, owner = ?, lease_until = ?, token = ?, attempts = ?, updated_at = ?"
+                    " WHERE task_id = ?",
+                    (LEASED, worker, now + self.lease_seconds, token + 1, attempts + 1, now, task_id),
+                )
+                leases.append(
+                    Lease(task_id, json.loads(payload), token + 1, worker, attempts + 1, _loads(progress))
+                )
+            return leases
+
+    # ===== 持有期间 =====
+
+    def heartbeat(self, lease: Lease) -> bool:
+        """续租；返回 False 表示租约已被他人接手（或 task 已结束）。"""
+        return self._update_leased(lease, "lease_until = ?", (self.clock() + self.lease_seconds,))
+
+    def save_progress(self, lease: Lease, progress: Dict[str, Any]) -> bool:
+        """记录进度并顺带续租；返回 False 时不要继续写出（接手者会从其最后读到的进度重做）。"""
+        progress_json = json.dumps(progress, ensure_ascii=False)
+        return self._update_leased(
+            lease, "progress = ?, lease_until = ?", (progress_json, self.clock() + self.lease_seconds)
+        )
+
+    def complete(self, lease: Lease, progress: Optional[Dict[str, Any]] = None) -> bool:
+        """标记完成；同一 task 只有持有当前 token 的 worker 能成功一次。"""
+        sets, values = "state = ?, last_error = NULL", [DONE]
+        if progress is not None:
+            sets += ", progress = ?"
+            values.append(json.dumps(progress, ensure_ascii=False))
+        return self._update_leased(lease, sets, tuple(values))
+
+    def release(self, lease: Lease, error: Optional[str] = None) -> bool:
+        """放弃租约（处理失败），task 回到 pending；领取次数已用完时标记为 dead。"""
+        state = DEAD if lease.attempts >= self.max_attempts else PENDING
+        return self._update_leased(lease, "state = ?, owner = NULL, lease_until = 0, last_error = ?", (state, error))
+
+    def _update_leased(self, lease: Lease, sets: str, values: Tuple[Any, ...]) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE tasks SET {sets}, updated_at = ? WHERE task_id = ? AND token = ? AND state = ?",
+                (*values, self.clock(), lease.task_id, lease.token, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def keep_alive(self, lease: Lease, interval: Optional[float] = None) -> Iterator[Lease]:
+        """后台线程每 interval（默认租期的 1/3）续租一次；续租失败时置位 lease.lost 并停止。"""
+        interval = interval if interval is not None else self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                if not self.heartbeat(lease):
+                    lease.lost.set()
+                    return
+
+        thread = threading.Thread(target=beat, name=f"lease-{lease.task_id}", daemon=True)
+        thread.start()
+        try:
+            yield lease
+        finally:
+            stop.set()
+            thread.join()
+
+    # ===== 查询 =====
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, owner, token, attempts, progress, last_error FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        state, owner, token, attempts, progress, last_error = row
+        return {
+            "state": state,
+            "owner": owner,
+            "token": token,
+            "attempts": attempts,
+            "progress": _loads(progress),
+            "last_error": last_error,
+        }
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的 task 数（租约已过期的仍计为 leased，下一次 acquire 时回收）。"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, DEAD: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _loads(raw: Optional[str]) -> Optional[Dict[str, Any]]:
+    return json.loads(raw) if raw else None
+
+
+def run_worker(
+    queue: TaskQueue,
+    worker: str,
+    handle: Callable[[Lease], Optional[Dict[str, Any]]],
+    poll_interval: float = 0.2,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """
+    worker 主循环：领取 → 持续续租 → handle(lease) → 标记完成，返回本 worker 成功标记完成的 task 数。
+
+    handle 返回最终进度；抛出 LeaseLost 时直接放弃（接手者会重做），其他异常释放租约等待重试。
+    队列中只剩其他 worker 持有的 task 时继续轮询（其租约可能过期），全部结束后退出。
+    """
+    completed = 0
+    while stop is None or not stop.is_set():
+        leases = queue.acquire(worker)
+        if not leases:
+            counts = queue.counts()
+            if not counts[PENDING] and not counts[LEASED]:
+                break
+            time.sleep(poll_interval)
+            continue
+        lease = leases[0]
+        with queue.keep_alive(lease):
+            try:
+                progress = handle(lease)
+            except LeaseLost:
+                continue
+            except Exception as exc:  # noqa: BLE001 — 任意处理失败都应释放租约
+                queue.release(lease, repr(exc))
+                continue
+        if queue.complete(lease, progress):
+            completed += 1
+    return completed
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+pc 时间窗口分片：把 start_time/end_time（或 min_id/max_id）的大区间切成子窗口并行抓取。
+
+- 先按 initial_shards 等分，逐窗口以每页 1 条探测 total（并发）
+- total 超过目标条数（单次查询的翻页上限 page_cap × 每页条数，或为均衡并发按总量算出的目标）时二分，递归探测
+- 相邻的稀疏窗口合并到目标条数以内，减少只有几条数据的窗口各占一轮请求
+- 每个分片是独立的 task（task_id = 根 task_id@lo-hi），在进度文件 tasks 中各有一项，续跑按分片恢复；
+  分片计划记录在根 task 的条目中，续跑时沿用，不再探测
+- 响应不带 total 时无法判断密度，按原窗口整体抓取
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from checkpoint_store import CheckpointStore
+from pagination import PageStyle
+
+TIME_PARAMS = ("start_time", "end_time")
+ID_PARAMS = ("min_id", "max_id")
+
+Count = Callable[[Dict[str, Any]], Awaitable[Optional[int]]]
+
+
+@dataclass(frozen=True)
+class Shard:
+    lo: int
+    hi: int  # 不含
+    total: Optional[int] = None  # 探测到的条数，未知为 None
+
+
+def shard_id(root_id: str, shard: Shard) -> str:
+    """分片在进度文件 tasks 中的键。"""
+    return f"{root_id}@{shard.lo}-{shard.hi}"
+
+
+@dataclass
+class ShardStats:
+    probes: int = 0
+    splits: int = 0
+    merges: int = 0
+    capped: int = 0  # 已无法再分、条数仍超过翻页上限的窗口（超出部分取不到）
+    shards: int = 0
+    target: int = 0
+    resumed: bool = False
+
+
+class ShardPlanner:
+    """
+    供 AsyncDemoCrawler(sharder=...) 使用：task 参数同时含 start_param / end_param 时按分片展开。
+
+    窗口为整数区间（Unix 秒或自增 ID）[lo, hi)；接口的结束参数含端点（如 max_id）时设 inclusive_end。
+    """
+
+    def __init__(
+        self,
+        start_param: str = TIME_PARAMS[0],
+        end_param: str = TIME_PARAMS[1],
+        initial_shards: int = 16,
+        concurrency: int = 8,
+        page_cap: Optional[int] = None,
+        target_items: Optional[int] = None,
+        min_width: int = 1,
+        inclusive_end: bool = False,
+    ) -> None:
+        if initial_shards < 1 or min_width < 1:
+            raise ValueError("initial_shards / min_width 至少为 1")
+        self.start_param = start_param
+        self.end_param = end_param
+        self.initial_shards = initial_shards
+        # 期望同时推进的分片数：目标条数取总量 / (2 × concurrency)，分片数约为并发的两倍，尾部更均衡
+        self.concurrency = concurrency
+        # 单次查询最多可翻的页数（如深翻页限制），超过的窗口必须二分
+        self.page_cap = page_cap
+        self.target_items = target_items
+        self.min_width = min_width
+        self.inclusive_end = inclusive_end
+        self.stats: Dict[str, ShardStats] = {}
+
+    def applies(self, task: Any) -> bool:
+        return self.start_param in task.params and self.end_param in task.params
+
+    def window(self, params: Mapping[str, Any]) -> Tuple[int, int]:
+        lo, hi = int(params[self.start_param]), int(params[self.end_param])
+        return lo, hi + 1 if self.inclusive_end else hi
+
+    def window_params(self, lo: int, hi: int) -> Dict[str, int]:
+        return {self.start_param: lo, self.end_param: hi - 1 if self.inclusive_end else hi}
+
+    # ===== 展开 task =====
+
+    async def shard(
+        self, task: Any, template: Mapping[str, Any], style: PageStyle, count: Count, checkpoint: CheckpointStore
+    ) -> List[Any]:
+        """把根 task 展开为分片 task；count(params) 发出探测请求并返回 total（失败或未返回为 None）。"""
+        lo, hi = self.window(task.params)
+        stats = self.stats[task.task_id] = ShardStats()
+        shards = self._saved_plan(checkpoint.get_task(task.task_id), lo, hi)
+        if shards is not None:
+            stats.resumed = True
+        else:
+            probe = {**template}
+            if style.size_param:
+                probe[style.size_param] = 1
+
+            async def probe_window(a: int, b: int) -> Optional[int]:
+                stats.probes += 1
+                return await count({**probe, **self.window_params(a, b)})
+
+            shards = await self.plan(lo, hi, probe_window, style.size, stats)
+            # 根 task 本身不再抓取，标记完成；进度在各分片的条目中
+            rows = [[s.lo, s.hi, s.total] for s in shards]
+            checkpoint.update_task(task.task_id, {"plan": rows, "completed": True})
+        stats.shards = len(shards)
+        return [
+            replace(task, task_id=shard_id(task.task_id, s), params={**task.params, **self.window_params(s.lo, s.hi)})
+            for s in shards
+        ]
+
+    @staticmethod
+    def _saved_plan(state: Optional[Dict[str, Any]], lo: int, hi: int) -> Optional[List[Shard]]:
+        rows = (state or {}).get("plan")
+        if not rows or rows[0][0] != lo or rows[-1][1] != hi:
+            # 窗口参数改了，旧计划作废
+            return None
+        return [Shard(*row) for row in rows]
+
+    # ===== 规划 =====
+
+    async def plan(
+        self,
+        lo: int,
+        hi: int,
+        count: Callable[[int, int], Awaitable[Optional[int]]],
+        page_size: int = 0,
+        stats: Optional[ShardStats] = None,
+    ) -> List[Shard]:
+        """等分探测 → 过密二分 → 稀疏合并；任一窗口探测不到 total 时返回整个窗口。"""
+        stats = stats if stats is not None else ShardStats()
+        if hi <= lo:
+            return [Shard(lo, hi, 0)]
+        step = max(self.min_width, math.ceil((hi - lo) / self.initial_shards))
+        bounds = list(range(lo, hi, step)) + [hi]
+        windows = list(zip(bounds, bounds[1:]))
+        totals = await asyncio.gather(*(count(a, b) for a, b in windows))
+        if any(total is None for total in totals):
+            return [Shard(lo, hi)]
+
+        target = stats.target = self._target(sum(totals), page_size)
+
+        async def resolve(a: int, b: int, total: int) -> List[Shard]:
+            if total <= target:
+                return [Shard(a, b, total)]
+            if b - a <= self.min_width:
+                if self.page_cap and page_size and total > self.page_cap * page_size:
+                    stats.capped += 1
+                return [Shard(a, b, total)]
+            stats.splits += 1
+            mid = a + max(self.min_width, (b - a) // 2)
+            left, right = await asyncio.gather(count(a, mid), count(mid, b))
+            if left is None or right is None:
+                return [Shard(a, b, total)]
+            parts = await asyncio.gather(resolve(a, mid, left), resolve(mid, b, right))
+            return parts[0] + parts[1]
+
+        resolved = await asyncio.gather(*(resolve(a, b, t) for (a, b), t in zip(windows, totals)))
+        return self._merge_sparse([shard for part in resolved for shard in part], target, stats)
+
+    def _target(self, total: int, page_size: int) -> int:
+        """单个分片的目标条数：不超过翻页上限，未指定时按总量与并发均分（至少一页）。"""
+        cap = self.page_cap * page_size if self.page_cap and page_size else None
+        if self.target_items is not None:
+            target = self.target_items
+        else:
+            target = max(page_size or 1, math.ceil(total / (2 * self.concurrency)))
+        return min(target, cap) if cap else target
+
+    @staticmethod
+    def _merge_sparse(shards: List[Shard], target: int, stats: ShardStats) -> List[Shard]:
+        """从左到右合并相邻窗口，合并后条数不超过 target。"""
+        merged: List[Shard] = []
+        for shard in shards:
+            last = merged[-1] if merged else None
+            if last is not None and last.hi == shard.lo and last.total + shard.total <= target:
+                merged[-1] = Shard(last.lo, shard.hi, last.total + shard.total)
+                stats.merges += 1
+            else:
+                merged.append(shard)
+        return merged
@@ -6,6 +6,9 @@
 - 读取/验证对齐锁状态
 - 锁过期检测
 - 锁清理
+- 多会话并发写入：读改写全程持有 `<文件>.lock` 咨询锁（fcntl/msvcrt），等待有上限
+- 大文件：流式哈希（内存有上限），只读取/原地改写文件末尾的锁块
+- 常驻监听：inotify（或轮询）发现变更后只重新验证该文件，状态写入 JSON 文件供廉价查询
 
 使用方式：
   # 写入锁
@@ -19,18 +22,43 @@
   
   # 验证锁是否有效（未过期）
   python alignment_lock.py verify --target prd --max-age 30
+
+  # 批量验证多个项目（单进程线程池，JSONL 输出，未变化的文件免重新哈希）
+  python alignment_lock.py verify --target both --roots-from roots.txt --hash-cache lock_cache.json
+
+  # 常驻监听：文件变化时只重新验证该文件，状态写入 docs/.alignment_status.json
+  python alignment_lock.py watch --target both
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import re
+import stat
 import sys
-from dataclasses import dataclass
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 按文件路径加载（importlib spec_from_file_location）时脚本目录不在 sys.path 中，cmd_watch 导入的 lock_watch 需手动加入
+_SCRIPTS_DIR = str(Path(__file__).resolve().parent)
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
 
 
 # ============ 常量定义 ============
@@ -44,6 +72,21 @@ LOCK_KEYS = (
     "ALIGNMENT_HASH:",   # 新增：对齐内容哈希（用于检测变更）
 )
 
+# 并发写入：等待咨询锁的默认上限（秒）与重试间隔上限
+LOCK_TIMEOUT = 10.0
+LOCK_POLL_MAX = 0.01
+
+# 批量验证：哈希缓存格式版本；mtime 距今不足 2s 的文件不缓存（同一时间片内的修改无法区分）
+HASH_CACHE_VERSION = 1
+RACY_WINDOW_NS = 2_000_000_000
+
+# 大文件流式处理：每次读取的块大小；解析末尾锁块时初始读取的字节数
+STREAM_CHUNK = 1 << 20
+TAIL_WINDOW = 64 * 1024
+# 块内含这些子串时才逐行筛选锁行（覆盖全部 LOCK_KEYS 与简写标记）
+_LOCK_HINTS = ("ALIGNMENT_", "NEXT_ACTION:", "DO_NOT_REALIGN")
+_LOCK_MARKERS = ("ALREADY_ALIGNED_DO_NOT_REALIGN", "===ALIGNMENT_LOCKED===")
+
 # 用于上下文压缩时保留的标记（AI 必须识别）
 COMPRESSION_MARKERS = [
     "ALIGNMENT_LOCK: true",
@@ -101,18 +144,224 @@ class AlignmentLock:
         return "\n".join(parts)
 
 
+# ============ 并发控制 ============
+
+class LockTimeout(TimeoutError):
+    """等待文件咨询锁超时。"""
+
+
+def lock_path_for(path: Path) -> Path:
+    """目标文件对应的锁文件（目标文件会被原子替换，不能直接锁它本身）。"""
+    return path.with_name(path.name + ".lock")
+
+
+def _try_acquire(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _release(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = LOCK_TIMEOUT) -> Iterator[float]:
+    """
+    独占 path 的咨询锁，产出等待耗时（秒）；超过 timeout 抛出 LockTimeout。
+
+    非阻塞尝试 + 指数退避轮询，等待有上限，持锁进程崩溃时锁随文件描述符自动释放。
+    """
+    lock_path = lock_path_for(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        started = time.monotonic()
+        delay = 0.001
+        while not _try_acquire(fd):
+            waited = time.monotonic() - started
+            if waited >= timeout:
+                raise LockTimeout(f"等待文件锁超时（{timeout:.1f}s）：{lock_path}")
+            time.sleep(min(delay, LOCK_POLL_MAX, timeout - waited))
+            delay *= 2
+        try:
+            yield time.monotonic() - started
+        finally:
+            _release(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """写入同目录唯一临时文件并 fsync 后原子替换（并发写入互不覆盖临时文件）。"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = 0o644
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        # mkstemp 固定为 0600，替换前恢复原文件权限
+        os.chmod(tmp_name, mode)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
 # ============ 核心功能 ============
 
+class ContentHasher:
+    """
+    增量计算内容哈希，结果与整段文本一次性 splitlines + strip 后计算的哈希一致。
+
+    按块输入（除最后一块外须由完整行组成）；首部空白直接丢弃，尾部空白先记入分叉的
+    哈希对象，之后出现非空白字符才并入结果，从而不缓存内容也能复现 strip()。
+    同时收集锁行（is_lock_line），供解析锁状态与判断正文中是否夹带锁行。
+    """
+
+    def __init__(self) -> None:
+        self._digest = hashlib.md5()
+        self._pending: Optional[Any] = None  # 已输出内容 + 尚未确认的尾部空白
+        self._started = False
+        self._has_lines = False
+        self.lock_lines: List[str] = []
+
+    def update(self, block: str) -> None:
+        lines = block.splitlines()
+        if any(hint in block for hint in _LOCK_HINTS):
+            self.lock_lines.extend(line for line in lines if is_lock_line(line))
+            lines = [line for line in lines if not line.startswith(LOCK_KEYS)]
+        if not lines:
+            return
+        text = "\n".join(lines)
+        if self._has_lines:
+            text = "\n" + text
+        self._has_lines = True
+        self._feed(text)
+
+    def _feed(self, text: str) -> None:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+        core = text.rstrip()
+        if core:
+            if self._pending is not None:
+                self._digest, self._pending = self._pending, None
+            self._digest.update(core.encode("utf-8"))
+            text = text[len(core):]
+        if text:
+            if self._pending is None:
+                self._pending = self._digest.copy()
+            self._pending.update(text.encode("utf-8"))
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()[:8]
+
+
+def is_lock_line(line: str) -> bool:
+    """是否为锁相关行（含兼容简写标记）。"""
+    stripped = line.strip()
+    return stripped.startswith(LOCK_KEYS) or stripped in _LOCK_MARKERS
+
+
 def compute_content_hash(content: str) -> str:
-    """计算内容哈希（用于检测 PRD 变更）。"""
-    import hashlib
-    # 移除锁相关行后计算哈希
-    lines = []
-    for line in content.splitlines():
-        if not any(line.startswith(key) for key in LOCK_KEYS):
-            lines.append(line)
-    clean_content = "\n".join(lines).strip()
-    return hashlib.md5(clean_content.encode("utf-8")).hexdigest()[:8]
+    """计算内容哈希（用于检测 PRD 变更）：移除锁相关行后 strip，取 md5 前 8 位。"""
+    hasher = ContentHasher()
+    hasher.update(content)
+    return hasher.hexdigest()
+
+
+def iter_text_blocks(f: BinaryIO, end: Optional[int] = None) -> Iterator[str]:
+    """
+    从二进制文件当前位置读到 end（默认文件末尾），产出由完整行组成的文本块。
+
+    块边界对齐到换行，换行统一为 \\n（与文本模式读取一致）；内存占用为一个块加最长的一行。
+    """
+    remaining = None if end is None else end - f.tell()
+    carry = bytearray()
+    while remaining is None or remaining > 0:
+        size = STREAM_CHUNK if remaining is None else min(STREAM_CHUNK, remaining)
+        chunk = f.read(size)
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            carry += chunk
+            continue
+        carry += chunk[:cut]
+        yield _decode_block(bytes(carry))
+        carry = bytearray(chunk[cut:])
+    if carry:
+        yield _decode_block(bytes(carry))
+
+
+def _decode_block(data: bytes) -> str:
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def scan_file(f: BinaryIO) -> tuple[AlignmentLock, str]:
+    """流式读取整个文件，解析锁状态并计算内容哈希（内存占用与文件大小无关）。"""
+    hasher = ContentHasher()
+    for block in iter_text_blocks(f):
+        hasher.update(block)
+    return parse_lock("\n".join(hasher.lock_lines)), hasher.hexdigest()
+
+
+@dataclass
+class LockTail:
+    """文件末尾由锁行与空行组成的锁块（write_lock 总是把锁块追加在末尾）。"""
+    body_end: int     # 正文去掉尾部空白后的结束字节偏移
+    block_start: int  # 锁块起始字节偏移（行首）
+    lines: List[str]  # 锁块中的锁行
+
+
+def find_lock_tail(f: BinaryIO, size: int) -> LockTail:
+    """从文件末尾向前读取，定位末尾锁块；窗口内全是锁块时按倍数扩大窗口。"""
+    window = TAIL_WINDOW
+    while True:
+        start = max(0, size - window)
+        f.seek(start)
+        lines = f.read(size - start).splitlines(keepends=True)
+        offset = size
+        found: List[str] = []
+        for raw in reversed(lines):
+            line_start = offset - len(raw)
+            if line_start == start and start > 0:
+                break  # 窗口首行可能不完整
+            text = raw.decode("utf-8")
+            if not text.strip():
+                offset = line_start
+                continue
+            # 行内含 \f 等其他分行符时按正文处理（交给全文扫描判定）
+            if not is_lock_line(text) or len(text.splitlines()) > 1:
+                body_end = line_start + len(text.rstrip().encode("utf-8"))
+                return LockTail(body_end, offset, found[::-1])
+            found.append(text.strip())
+            offset = line_start
+        else:
+            return LockTail(0, 0, found[::-1])
+        window *= 4
 
 
 def parse_lock(content: str) -> AlignmentLock:
@@ -142,77 +391,184 @@ def parse_lock(content: str) -> AlignmentLock:
 
 def remove_lock_lines(content: str) -> str:
     """移除现有的锁相关行。"""
-    lines = []
-    for line in content.splitlines():
-        if any(line.strip().startswith(key) for key in LOCK_KEYS):
-            continue
-        if line.strip() in ("ALREADY_ALIGNED_DO_NOT_REALIGN", "===ALIGNMENT_LOCKED==="):
-            continue
-        lines.append(line)
-    return "\n".join(lines)
+    return "\n".join(line for line in content.splitlines() if not is_lock_line(line))
+
 
+def _replace_lock_block(path: Path, lock: Optional[AlignmentLock]) -> None:
+    """
+    把文件末尾的锁块替换为 lock 的锁块（lock 为 None 时移除），调用方须已持有文件锁。
+
+    只有锁块变化时原地截断到正文末尾再追加，不重写正文；正文中间也夹带锁行
+    （手工插入或旧格式）时回退为整文件读改写 + 原子替换。
+    """
+    with open(path, "r+b") as f:
+        tail = find_lock_tail(f, os.fstat(f.fileno()).st_size)
+        f.seek(0)
+        if lock is None:
+            # 清除无需哈希，只检查正文中是否夹带锁行
+            mixed = any(
+                any(hint in block for hint in _LOCK_HINTS) and any(map(is_lock_line, block.splitlines()))
+                for block in iter_text_blocks(f, tail.block_start)
+            )
+            suffix = "\n"
+        else:
+            hasher = ContentHasher()
+            for block in iter_text_blocks(f, tail.block_start):
+                hasher.update(block)
+            mixed = bool(hasher.lock_lines)
+            lock.content_hash = hasher.hexdigest()
+            suffix = ("\n\n" if tail.body_end else "") + lock.to_block() + "\n"
+        if not mixed:
+            f.seek(tail.body_end)
+            f.truncate()
+            f.write(suffix.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            return
+    
+    content = remove_lock_lines(path.read_text(encoding="utf-8")).rstrip()
+    if lock is None:
+        new_content = content + "\n"
+    else:
+        lock.content_hash = compute_content_hash(content)
+        new_content = (content + "\n\n" if content else "") + lock.to_block() + "\n"
+    atomic_write_text(path, new_content)
 
-def write_lock(path: Path, lock: AlignmentLock, create: bool = False) -> bool:
-    """写入对齐锁到文件。"""
+
+def write_lock(
+    path: Path, lock: AlignmentLock, create: bool = False, timeout: float = LOCK_TIMEOUT
+) -> bool:
+    """写入对齐锁到文件（读改写全程持有文件锁；已有文件只改写末尾锁块）。"""
     if not path.exists() and not create:
         return False
     
-    content = ""
-    if path.exists():
-        content = path.read_text(encoding="utf-8")
-        content = remove_lock_lines(content).rstrip()
-        # 计算内容哈希
-        lock.content_hash = compute_content_hash(content)
-    
-    # 拼接新内容
-    if content:
-        new_content = content + "\n\n" + lock.to_block() + "\n"
-    else:
-        new_content = lock.to_block() + "\n"
-    
-    # 原子写入
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(new_content, encoding="utf-8")
-    tmp.replace(path)
+    with file_lock(path, timeout):
+        # 持锁后再判断一次：等待期间文件可能已被删除
+        if path.exists():
+            _replace_lock_block(path, lock)
+        elif create:
+            atomic_write_text(path, lock.to_block() + "\n")
+        else:
+            return False
     
     return True
 
 
 def read_lock(path: Path) -> Optional[AlignmentLock]:
-    """读取对齐锁状态。"""
+    """读取对齐锁状态：优先只读文件末尾的锁块，末尾没有标准锁块时再全文扫描。"""
     if not path.exists():
         return None
-    content = path.read_text(encoding="utf-8")
-    return parse_lock(content)
+    with open(path, "rb") as f:
+        tail = find_lock_tail(f, os.fstat(f.fileno()).st_size)
+        if any(line.startswith("ALIGNMENT_LOCK:") for line in tail.lines):
+            return parse_lock("\n".join(tail.lines))
+        f.seek(0)
+        return scan_file(f)[0]
 
 
-def clear_lock(path: Path) -> bool:
-    """清除对齐锁。"""
+def clear_lock(path: Path, timeout: float = LOCK_TIMEOUT) -> bool:
+    """清除对齐锁（读改写全程持有文件锁；只截掉末尾锁块）。"""
     if not path.exists():
         return False
     
-    content = path.read_text(encoding="utf-8")
-    new_content = remove_lock_lines(content).rstrip() + "\n"
-    
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(new_content, encoding="utf-8")
-    tmp.replace(path)
+    with file_lock(path, timeout):
+        if not path.exists():
+            return False
+        _replace_lock_block(path, None)
     
     return True
 
 
-def verify_lock(path: Path, max_age_days: int = 30) -> tuple[bool, str]:
+class HashCache:
     """
-    验证对齐锁是否有效。
-    
-    返回: (is_valid, message)
+    (路径, mtime_ns, size) → 锁状态与内容哈希的缓存。
+
+    文件未变化时只需一次 stat，不读取、不重新哈希；指定 path 时跨进程持久化（JSON）。
     """
-    lock = read_lock(path)
-    
-    if lock is None:
-        return False, "文件不存在"
-    
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()  # 批量验证时由多个线程共享
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None:
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != HASH_CACHE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def get(self, key: str, st: os.stat_result) -> Optional[tuple[AlignmentLock, str]]:
+        entry = self.entries.get(key)
+        hit = entry is not None and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not hit:
+            return None
+        return AlignmentLock(**entry["lock"]), entry["hash"]
+
+    def put(self, key: str, st: os.stat_result, lock: AlignmentLock, content_hash: str) -> None:
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        entry = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "lock": asdict(lock),
+            "hash": content_hash,
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        """原子写入缓存文件（无变化或未指定路径时跳过）。"""
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            payload = {"version": HASH_CACHE_VERSION, "entries": dict(self.entries)}
+        atomic_write_text(self.path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+        self._dirty = False
+
+
+def inspect_file(
+    path: Path, cache: Optional[HashCache] = None
+) -> Optional[tuple[AlignmentLock, str, bool]]:
+    """
+    只流式读取一次文件，得出 (锁状态, 当前内容哈希, 是否命中缓存)；文件不存在返回 None。
+    """
+    key = str(path)
+    if cache is not None:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        cached = cache.get(key, st)
+        if cached is not None:
+            return cached[0], cached[1], True
+    try:
+        with open(path, "rb") as f:
+            # 以打开后的 fstat 作为缓存键，读取期间的修改会改变 mtime，下次不会误命中
+            st = os.fstat(f.fileno())
+            lock, content_hash = scan_file(f)
+    except FileNotFoundError:
+        return None
+    if cache is not None:
+        cache.put(key, st, lock, content_hash)
+    return lock, content_hash, False
+
+
+def evaluate_lock(lock: AlignmentLock, current_hash: str, max_age_days: int = 30) -> tuple[bool, str]:
+    """根据已解析的锁与当前内容哈希判定锁是否有效。"""
     if not lock.is_locked:
         return False, "未发现对齐锁"
     
@@ -220,15 +576,29 @@ def verify_lock(path: Path, max_age_days: int = 30) -> tuple[bool, str]:
         return False, f"对齐锁已过期（超过 {max_age_days} 天）"
     
     # 可选：检查内容是否变更
-    if lock.content_hash and path.exists():
-        current_content = path.read_text(encoding="utf-8")
-        current_hash = compute_content_hash(current_content)
-        if current_hash != lock.content_hash:
-            return False, f"内容已变更（hash: {lock.content_hash} -> {current_hash}）"
+    if lock.content_hash and current_hash != lock.content_hash:
+        return False, f"内容已变更（hash: {lock.content_hash} -> {current_hash}）"
     
     return True, "对齐锁有效"
 
 
+def verify_lock(
+    path: Path, max_age_days: int = 30, cache: Optional[HashCache] = None
+) -> tuple[bool, str]:
+    """
+    验证对齐锁是否有效（文件只读取一次；传入 cache 时未变化的文件免读取）。
+    
+    返回: (is_valid, message)
+    """
+    state = inspect_file(path, cache)
+    
+    if state is None:
+        return False, "文件不存在"
+    
+    lock, current_hash, _cached = state
+    return evaluate_lock(lock, current_hash, max_age_days)
+
+
 # ============ CLI ============
 
 def get_paths(root: Path, target: str) -> list[Path]:
@@ -260,7 +630,12 @@ def cmd_set(args) -> int:
     
     updated = False
     for path in paths:
-        if write_lock(path, lock, args.create):
+        try:
+            written = write_lock(path, lock, args.create, timeout=args.lock_timeout)
+        except LockTimeout as e:
+            print(f"❌ {e}")
+            return 1
+        if written:
             print(f"✅ 已写入对齐锁: {path}")
             updated = True
         else:
@@ -287,6 +662,8 @@ def cmd_check(args) -> int:
 
 def cmd_verify(args) -> int:
     """验证对齐锁有效性。"""
+    if args.roots_from or args.roots_glob:
+        return cmd_verify_batch(args)
     root = args.root.resolve()
     paths = get_paths(root, args.target)
     
@@ -301,6 +678,72 @@ def cmd_verify(args) -> int:
     return 0 if all_valid else 1
 
 
+def read_roots(roots_from: Optional[str], roots_glob: Optional[str]) -> List[Path]:
+    """读取批量验证的项目根目录：文件每行一个（# 开头为注释，- 表示标准输入），或 glob 模式。"""
+    if roots_glob:
+        import glob
+        return [Path(p) for p in sorted(glob.glob(roots_glob, recursive=True)) if os.path.isdir(p)]
+    if roots_from == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(roots_from).read_text(encoding="utf-8").splitlines()
+    return [Path(line.strip()) for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def verify_record(root: Path, path: Path, max_age_days: int, cache: HashCache) -> Dict[str, Any]:
+    """批量验证单个文件，返回一条 JSONL 记录。"""
+    record: Dict[str, Any] = {"type": "file", "root": str(root), "path": str(path)}
+    try:
+        state = inspect_file(path, cache)
+    except (OSError, UnicodeDecodeError) as e:
+        record.update(valid=False, message=f"无法读取：{e}")
+        return record
+    if state is None:
+        record.update(valid=False, message="文件不存在")
+        return record
+    lock, current_hash, cached = state
+    is_valid, message = evaluate_lock(lock, current_hash, max_age_days)
+    record.update(
+        valid=is_valid,
+        message=message,
+        locked=lock.is_locked,
+        done_at=lock.done_at,
+        lock_hash=lock.content_hash,
+        current_hash=current_hash,
+        cached=cached,
+    )
+    return record
+
+
+def cmd_verify_batch(args) -> int:
+    """批量验证多个项目：单进程线程池，按输入顺序输出 JSONL，最后一行为汇总。"""
+    started = time.perf_counter()
+    roots = [root.resolve() for root in read_roots(args.roots_from, args.roots_glob)]
+    jobs = [(root, path) for root in roots for path in get_paths(root, args.target)]
+    cache = HashCache(args.hash_cache)
+    
+    valid = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        records = pool.map(lambda job: verify_record(job[0], job[1], args.max_age, cache), jobs)
+        for record in records:
+            valid += record["valid"]
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+    cache.save()
+    
+    summary = {
+        "type": "summary",
+        "roots": len(roots),
+        "files": len(jobs),
+        "valid": valid,
+        "invalid": len(jobs) - valid,
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0 if valid == len(jobs) else 1
+
+
 def cmd_clear(args) -> int:
     """清除对齐锁。"""
     root = args.root.resolve()
@@ -308,7 +751,12 @@ def cmd_clear(args) -> int:
     
     cleared = False
     for path in paths:
-        if clear_lock(path):
+        try:
+            removed = clear_lock(path, timeout=args.lock_timeout)
+        except LockTimeout as e:
+            print(f"❌ {e}")
+            return 1
+        if removed:
             print(f"🗑️ 已清除对齐锁: {path}")
             cleared = True
         else:
@@ -317,6 +765,23 @@ def cmd_clear(args) -> int:
     return 0 if cleared else 1
 
 
+def cmd_watch(args) -> int:
+    """监听目标文件并持续发布锁状态（实现见 lock_watch.py）。"""
+    from lock_watch import default_status_path, run_watch
+
+    root = args.root.resolve()
+    return run_watch(
+        root,
+        get_paths(root, args.target),
+        args.status_file or default_status_path(root),
+        max_age_days=args.max_age,
+        backend=args.backend,
+        interval=args.interval,
+        duration=args.duration,
+        log=lambda message: print(message, flush=True),
+    )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Alignment Lock Manager - 对齐锁管理器"
@@ -327,6 +792,12 @@ def main() -> int:
         default=Path.cwd(),
         help="项目根目录（默认：当前目录）",
     )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        default=LOCK_TIMEOUT,
+        help=f"并发写入时等待文件锁的上限秒数（默认：{LOCK_TIMEOUT:g}）",
+    )
     
     subparsers = parser.add_subparsers(dest="command", required=True)
     
@@ -348,8 +819,24 @@ def main() -> int:
     verify_parser = subparsers.add_parser("verify", help="验证对齐锁有效性")
     verify_parser.add_argument("--target", choices=["prd", "state", "both"], default="prd")
     verify_parser.add_argument("--max-age", type=int, default=30, help="最大有效天数（默认30天）")
+    roots_group = verify_parser.add_mutually_exclusive_group()
+    roots_group.add_argument("--roots-from", help="批量验证：项目根目录列表文件（每行一个，- 为标准输入）")
+    roots_group.add_argument("--roots-glob", help="批量验证：项目根目录 glob 模式（如 'projects/*'）")
+    verify_parser.add_argument("--workers", type=int, default=16, help="批量验证的线程数（默认16）")
+    verify_parser.add_argument("--hash-cache", type=Path, help="批量验证的哈希缓存文件（未变化的文件免重新哈希）")
     verify_parser.set_defaults(func=cmd_verify)
     
+    # watch 命令
+    watch_parser = subparsers.add_parser("watch", help="监听文件变更并持续发布锁状态")
+    watch_parser.add_argument("--target", choices=["prd", "state", "both"], default="both")
+    watch_parser.add_argument("--max-age", type=int, default=30, help="最大有效天数（默认30天）")
+    watch_parser.add_argument("--status-file", type=Path, help="状态文件（默认：docs/.alignment_status.json）")
+    watch_parser.add_argument("--backend", choices=["auto", "inotify", "poll"], default="auto",
+                              help="监听方式（默认 auto：优先 inotify，不可用时轮询）")
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="轮询间隔秒数（默认1）")
+    watch_parser.add_argument("--duration", type=float, default=0, help="运行指定秒数后退出（默认0：一直运行）")
+    watch_parser.set_defaults(func=cmd_watch)
+    
     # clear 命令
     clear_parser = subparsers.add_parser("clear", help="清除对齐锁")
     clear_parser.add_argument("--target", choices=["prd", "state", "both"], default="prd")
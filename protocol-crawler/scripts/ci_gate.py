@@ -3,15 +3,31 @@
 CI 门禁自动检查脚本
 
 对应 SKILL.md 步骤 6 的检查项。
-用法：python ci_gate.py <项目根目录>
+用法：python ci_gate.py <项目根目录> [--jobs N] [--no-cache] [--staged | --changed-since REF] [--format jsonl]
 返回：0 = 全部通过，1 = 存在不通过项
 """
 
 import os
 import sys
+import json
+import mmap
+import time
+import codecs
+import heapq
+import hashlib
 import argparse
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+# 按文件路径加载（importlib spec_from_file_location）时脚本目录不在 sys.path 中，同目录模块需手动加入
+_SCRIPTS_DIR = str(Path(__file__).resolve().parent)
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+
+from func_spans import SUPPORTED_SUFFIXES as FUNC_SUFFIXES, function_spans  # noqa: E402
+from git_scope import git_lines, staged_contents  # noqa: E402
 
 # ===== 配置 =====
 
@@ -40,84 +56,144 @@ TEMP_FILE_PATTERNS = {
     "scratch", "playground", "draft"
 }
 TEMP_EXTENSIONS = {".tmp", ".bak", ".swp", ".log"}
+MMAP_THRESHOLD = 1 << 20  # ≥ 1MB 的文件用 mmap 分块扫描，不整体读入内存
+SCAN_CHUNK = 1 << 20
+SNIFF_BYTES = 4096
+CACHE_FILENAME = ".ci_gate_cache.json"
+CACHE_VERSION = 2  # 检查逻辑变更时递增，使旧缓存整体失效
+RACY_WINDOW_NS = 2_000_000_000  # mtime 距今不足 2s 的文件不缓存，避免同一时间片内的修改被漏检
+
+
+# ===== 单次读取分析 =====
+
+@dataclass
+class FileAnalysis:
+    """单次读取文件得到的特征，供各检查项共享。"""
+    size: int = 0
+    line_count: int = 0
+    is_utf8: bool = True
+    has_nul: bool = False  # 前 4KB 是否含 NUL（二进制探测）
+    lines: Optional[List[str]] = None  # 仅在需要函数扫描时保留
+    digest: Optional[str] = None  # 内容哈希（仅在缓存启用哈希校验时计算）
+    error: Optional[str] = None  # 读取失败原因
+
+
+def _count_lines(chunk: bytes, prev_cr: bool) -> int:
+    """按通用换行（\n、\r、\r\n）计数，跨块的 \r\n 只算一次。"""
+    count = chunk.count(b"\n") + chunk.count(b"\r") - chunk.count(b"\r\n")
+    if prev_cr and chunk[:1] == b"\n":
+        count -= 1
+    return count
+
+
+def _split_lines(text: str) -> List[str]:
+    """与文本模式 readlines() 相同的切分（通用换行）。"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def _scan_chunks(
+    analysis: FileAnalysis, chunks: Iterator[bytes], keep_lines: bool, want_digest: bool
+) -> None:
+    """一次遍历完成行数、UTF-8 校验、NUL 探测、（可选的）文本保留与内容哈希。"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    hasher = hashlib.blake2b(digest_size=16) if want_digest else None
+    parts: List[str] = []
+    prev_cr = False
+    last = b""
+    for index, chunk in enumerate(chunks):
+        if index == 0:
+            analysis.has_nul = b"\x00" in chunk[:SNIFF_BYTES]
+        if hasher is not None:
+            hasher.update(chunk)
+        analysis.line_count += _count_lines(chunk, prev_cr)
+        if analysis.is_utf8:
+            try:
+                decoded = decoder.decode(chunk)
+                if keep_lines:
+                    parts.append(decoded)
+            except UnicodeDecodeError:
+                analysis.is_utf8 = False
+        if not analysis.is_utf8 and keep_lines:
+            parts.append(chunk.decode("utf-8", errors="replace"))
+        prev_cr = chunk[-1:] == b"\r"
+        last = chunk[-1:]
+
+    if analysis.is_utf8:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            analysis.is_utf8 = False
+    if last and last not in (b"\n", b"\r"):
+        analysis.line_count += 1  # 末行无换行符
+    if keep_lines:
+        analysis.lines = _split_lines("".join(parts))
+    if hasher is not None:
+        analysis.digest = hasher.hexdigest()
+
+
+def analyze_file(filepath: Path, keep_lines: bool = False, want_digest: bool = False) -> FileAnalysis:
+    """只打开、只读取一次文件，得出全部检查项所需的特征。"""
+    analysis = FileAnalysis()
+    try:
+        with open(filepath, "rb") as f:
+            analysis.size = os.fstat(f.fileno()).st_size
+            if analysis.size < MMAP_THRESHOLD or keep_lines:
+                _scan_chunks(analysis, iter([f.read()]), keep_lines, want_digest)
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    chunks = (mm[i:i + SCAN_CHUNK] for i in range(0, len(mm), SCAN_CHUNK))
+                    _scan_chunks(analysis, chunks, keep_lines, want_digest)
+    except Exception as e:
+        analysis.error = str(e)
+    return analysis
+
+
+def analyze_bytes(data: bytes, keep_lines: bool = False, want_digest: bool = False) -> FileAnalysis:
+    """分析内存中的文件内容（如 git 暂存区 blob），结果与 analyze_file 读取同样内容时一致。"""
+    analysis = FileAnalysis(size=len(data))
+    _scan_chunks(analysis, iter([data]), keep_lines, want_digest)
+    return analysis
 
 
-def check_file_lines(filepath: Path) -> List[str]:
+# ===== 单文件检查 =====
+
+def check_file_lines(filepath: Path, analysis: Optional[FileAnalysis] = None) -> List[str]:
     """检查 1: 单文件行数 ≤ MAX_FILE_LINES"""
     errors = []
-    try:
-        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-            line_count = sum(1 for _ in f)
-        if line_count > MAX_FILE_LINES:
-            errors.append(
-                f"  ❌ 文件超限：{line_count} 行（上限 {MAX_FILE_LINES}）→ 需拆分为多个模块"
-            )
-    except Exception as e:
-        errors.append(f"  ⚠️ 无法读取：{e}")
+    analysis = analysis or analyze_file(filepath)
+    if analysis.error is not None:
+        errors.append(f"  ⚠️ 无法读取：{analysis.error}")
+        return errors
+    if analysis.line_count > MAX_FILE_LINES:
+        errors.append(
+            f"  ❌ 文件超限：{analysis.line_count} 行（上限 {MAX_FILE_LINES}）→ 需拆分为多个模块"
+        )
     return errors
 
 
-def check_function_lines(filepath: Path) -> List[str]:
-    """检查 2: 单函数行数 ≤ MAX_FUNC_LINES（仅 Python）"""
+def check_function_lines(filepath: Path, analysis: Optional[FileAnalysis] = None) -> List[str]:
+    """检查 2: 单函数行数 ≤ MAX_FUNC_LINES（Python 用 ast，JS/TS/Go/Rust/Java 用花括号匹配）"""
     errors = []
-    if filepath.suffix != ".py":
+    suffix = filepath.suffix.lower()
+    if suffix not in FUNC_SUFFIXES:
         return errors
 
-    try:
-        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
-    except Exception:
+    if analysis is None or analysis.lines is None:
+        analysis = analyze_file(filepath, keep_lines=True)
+    if analysis.error is not None or analysis.lines is None:
+        return errors
+    # 全文不超过上限时任何函数都不可能超限，跳过解析
+    if len(analysis.lines) <= MAX_FUNC_LINES:
         return errors
 
-    func_name = None
-    func_start = 0
-    func_indent = 0
-
-    for i, line in enumerate(lines):
-        stripped = line.rstrip()
-        if not stripped:
-            continue
-
-        # 检测函数定义
-        lstripped = stripped.lstrip()
-        indent = len(stripped) - len(lstripped)
-
-        if lstripped.startswith("def ") or lstripped.startswith("async def "):
-            # 如果已有函数在追踪中，先结束它
-            if func_name is not None:
-                func_len = i - func_start
-                if func_len > MAX_FUNC_LINES:
-                    errors.append(
-                        f"  ❌ 函数超限：{func_name}() 第{func_start + 1}-{i}行"
-                        f"（{func_len}行，上限 {MAX_FUNC_LINES}）→ 需拆分"
-                    )
-
-            # 提取函数名
-            name_part = lstripped.split("(")[0]
-            func_name = name_part.replace("def ", "").replace("async ", "").strip()
-            func_start = i
-            func_indent = indent
-
-        elif func_name is not None and indent <= func_indent and not lstripped.startswith("#"):
-            # 函数结束（缩进回退到函数级别或更低）
-            if not lstripped.startswith("@"):  # 装饰器不算结束
-                func_len = i - func_start
-                if func_len > MAX_FUNC_LINES:
-                    errors.append(
-                        f"  ❌ 函数超限：{func_name}() 第{func_start + 1}-{i}行"
-                        f"（{func_len}行，上限 {MAX_FUNC_LINES}）→ 需拆分"
-                    )
-                func_name = None
-
-    # 处理文件末尾的函数
-    if func_name is not None:
-        func_len = len(lines) - func_start
-        if func_len > MAX_FUNC_LINES:
-            errors.append(
-                f"  ❌ 函数超限：{func_name}() 第{func_start + 1}-{len(lines)}行"
-                f"（{func_len}行，上限 {MAX_FUNC_LINES}）→ 需拆分"
-            )
-
+    for span in function_spans("\n".join(analysis.lines), suffix, min_length=MAX_FUNC_LINES):
+        errors.append(
+            f"  ❌ 函数超限：{span.name}() 第{span.start}-{span.end}行"
+            f"（{span.length}行，上限 {MAX_FUNC_LINES}）→ 需拆分"
+        )
     return errors
 
 
@@ -134,16 +210,12 @@ def check_filename(filepath: Path) -> List[str]:
     return errors
 
 
-def check_encoding(filepath: Path) -> List[str]:
-    """检查 6: 文件编码 UTF-8"""
+def check_encoding(filepath: Path, analysis: Optional[FileAnalysis] = None) -> List[str]:
+    """检查 6: 文件编码 UTF-8（全文件校验）"""
     errors = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            f.read(4096)  # 只读前 4KB 检测
-    except UnicodeDecodeError:
+    analysis = analysis or analyze_file(filepath)
+    if analysis.error is None and not analysis.is_utf8:
         errors.append(f"  ❌ 文件编码非 UTF-8 → 需转换为 UTF-8")
-    except Exception:
-        pass
     return errors
 
 
@@ -250,38 +322,322 @@ def check_directory_structure(project_root: Path) -> List[str]:
     return errors
 
 
-def is_likely_text_file(filepath: Path) -> bool:
-    """判断文件是否可能是文本文件。"""
-    suffix = filepath.suffix.lower()
-    if suffix in BINARY_EXTENSIONS:
-        return False
+def _name_suffix(name: str) -> str:
+    """与 Path(name).suffix.lower() 等价，避免逐文件构造 Path。"""
+    i = name.rfind(".")
+    return name[i:].lower() if 0 < i < len(name) - 1 else ""
+
 
+def needs_binary_sniff(filepath: Path) -> bool:
+    """无后缀或未知后缀的文件需按内容探测是否为二进制。"""
+    suffix = filepath.suffix.lower()
     # 对常见文本后缀快速放行，减少二进制探测开销
-    if suffix in CODE_EXTENSIONS or suffix in TEXT_LIKE_EXTENSIONS:
-        return True
+    return suffix not in CODE_EXTENSIONS and suffix not in TEXT_LIKE_EXTENSIONS
 
-    # 无后缀或未知后缀：按内容做轻量探测
-    try:
-        with open(filepath, "rb") as f:
-            chunk = f.read(4096)
-    except OSError:
-        return False
 
-    if b"\x00" in chunk:
-        return False
-    return True
+def _should_check_name(name: str, all_text_files: bool) -> bool:
+    suffix = _name_suffix(name)
+    if all_text_files:
+        return suffix not in BINARY_EXTENSIONS
+    return suffix in CODE_EXTENSIONS
 
 
 def should_check_file(filepath: Path, all_text_files: bool) -> bool:
-    """判断当前文件是否应纳入检查范围。"""
-    suffix = filepath.suffix.lower()
-    if all_text_files:
-        return is_likely_text_file(filepath)
-    return suffix in CODE_EXTENSIONS
+    """按后缀判断当前文件是否应纳入检查范围（内容探测在单次读取分析中完成）。"""
+    return _should_check_name(filepath.name, all_text_files)
 
 
-def scan_project(project_root: Path, all_text_files: bool = False) -> Tuple[int, int, int, List[str]]:
-    """扫描项目，返回 (总文件数, 通过数, 失败数, 项目级错误列表)。"""
+def _walk_files(top: str) -> Iterator[Tuple[str, str]]:
+    """与 os.walk(top) 相同顺序产出 (文件路径, 文件名)（先本层文件，再逐个子目录）。"""
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            yield entry.path, entry.name
+        # 过滤忽略目录；与 os.walk 默认行为一致，不进入目录符号链接
+        elif entry.name not in IGNORE_DIRS and not entry.name.startswith("."):
+            subdirs.append(entry)
+
+    for entry in subdirs:
+        if not entry.is_symlink():
+            yield from _walk_files(entry.path)
+
+
+def iter_candidate_paths(project_root: Path, all_text_files: bool) -> Iterator[str]:
+    """按 os.walk 顺序产出需要检查的文件路径字符串（该顺序即报告顺序）。"""
+    for path, name in _walk_files(str(project_root)):
+        if name != CACHE_FILENAME and _should_check_name(name, all_text_files):
+            yield path
+
+
+def iter_candidate_files(project_root: Path, all_text_files: bool) -> Iterator[Path]:
+    """按 os.walk 顺序产出需要检查的文件。"""
+    for path in iter_candidate_paths(project_root, all_text_files):
+        yield Path(path)
+
+
+def _is_walked_rel(rel: str) -> bool:
+    """相对路径是否会被 _walk_files 遍历到（目录不在忽略列表且不以 . 开头）。"""
+    parts = rel.split("/")
+    return not any(part in IGNORE_DIRS or part.startswith(".") for part in parts[:-1])
+
+
+def git_changed_paths(
+    project_root: Path,
+    all_text_files: bool,
+    changed_since: Optional[str] = None,
+    staged: bool = False,
+) -> List[str]:
+    """
+    由 git diff --name-only 得出需要检查的文件路径（与 iter_candidate_paths 同样过滤）。
+
+    staged=True 取暂存区相对 HEAD 的变更（工作区中已删除的文件也纳入，内容由 git_scope.staged_contents 读取）；
+    changed_since 取工作区相对该 ref 的变更，并包含未跟踪文件。路径限定在 project_root 之内，已删除的文件不纳入。
+    """
+    # 非仓库目录下 git diff 会退化为 --no-index 比较，先确认处于工作区内
+    git_lines(project_root, "rev-parse", "--is-inside-work-tree")
+    # --relative：路径相对 project_root，且只列出其子树内的变更
+    diff_args = ["diff", "--name-only", "-z", "--relative", "--diff-filter=ACMRT"]
+    if staged:
+        rels = git_lines(project_root, *diff_args, "--cached")
+    else:
+        rels = git_lines(project_root, *diff_args, changed_since or "HEAD", "--")
+        rels += git_lines(project_root, "ls-files", "-z", "--others", "--exclude-standard")
+
+    paths = []
+    seen = set()
+    for rel in rels:
+        name = rel.rsplit("/", 1)[-1]
+        if rel in seen or name == CACHE_FILENAME or not _is_walked_rel(rel):
+            continue
+        seen.add(rel)
+        path = os.path.join(str(project_root), *rel.split("/"))
+        if _should_check_name(name, all_text_files) and (staged or os.path.isfile(path)):
+            paths.append(path)
+    return paths
+
+
+@dataclass
+class FileResult:
+    """单文件检查结果（可跨进程传递、可缓存）。"""
+    errors: Optional[List[str]]  # None = 探测为二进制，不计入扫描数
+    digest: Optional[str] = None
+    bytes_read: int = 0
+    timings: Optional[Dict[str, float]] = None  # 各检查项耗时（秒），"read" 为读取分析
+    cached: bool = False  # 结果来自缓存（不含耗时与读取量）
+
+
+def _timed(timings: Dict[str, float], name: str, check: Callable[..., List[str]], *args: Any) -> List[str]:
+    started = time.perf_counter()
+    errors = check(*args)
+    timings[name] = time.perf_counter() - started
+    return errors
+
+
+def check_file(
+    filepath: Union[str, Path], want_digest: bool = False, content: Optional[bytes] = None
+) -> FileResult:
+    """
+    只读取一次文件并执行全部单文件检查项（无输出，可在子进程中运行）。
+
+    未知后缀的文件探测到 NUL 字节时视为二进制，errors 为 None。
+    content 不为 None 时检查这段内容（如暂存区 blob）而不读取文件，文件名与后缀仍取自 filepath。
+    """
+    filepath = Path(filepath)
+    scan_functions = filepath.suffix.lower() in FUNC_SUFFIXES
+    started = time.perf_counter()
+    if content is None:
+        analysis = analyze_file(filepath, keep_lines=scan_functions, want_digest=want_digest)
+    else:
+        analysis = analyze_bytes(content, keep_lines=scan_functions, want_digest=want_digest)
+    timings = {"read": time.perf_counter() - started}
+    bytes_read = analysis.size if analysis.error is None else 0
+    if needs_binary_sniff(filepath) and (analysis.error is not None or analysis.has_nul):
+        return FileResult(errors=None, digest=analysis.digest, bytes_read=bytes_read, timings=timings)
+
+    file_errors = []
+    file_errors.extend(_timed(timings, "file_lines", check_file_lines, filepath, analysis))
+    file_errors.extend(_timed(timings, "filename", check_filename, filepath))
+    file_errors.extend(_timed(timings, "encoding", check_encoding, filepath, analysis))
+    if scan_functions:
+        file_errors.extend(_timed(timings, "function_lines", check_function_lines, filepath, analysis))
+    return FileResult(
+        errors=file_errors, digest=analysis.digest, bytes_read=bytes_read, timings=timings
+    )
+
+
+def collect_file_errors(filepath: Path) -> Optional[List[str]]:
+    """执行全部单文件检查项，返回错误列表（二进制文件返回 None）。"""
+    return check_file(filepath).errors
+
+
+def iter_file_results(
+    files: List[Union[str, Path]],
+    jobs: int = 1,
+    want_digest: bool = False,
+    contents: Optional[List[bytes]] = None,
+) -> Iterator[Tuple[Union[str, Path], FileResult]]:
+    """按输入顺序产出 (文件, 检查结果)；jobs > 1 时分发到进程池，顺序不变。contents 与 files 一一对应。"""
+    worker = partial(check_file, want_digest=want_digest)
+    if contents is None:
+        contents = [None] * len(files)
+    if jobs <= 1 or len(files) < 2:
+        for filepath, content in zip(files, contents):
+            yield filepath, worker(filepath, content=content)
+        return
+
+    # 延迟导入：串行与热缓存路径不承担 multiprocessing 的导入开销
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(files) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # map 按提交顺序返回结果，保证输出与串行模式一致
+        yield from zip(files, pool.map(_check_with_content, files, contents, [want_digest] * len(files),
+                                       chunksize=chunksize))
+
+
+def _check_with_content(filepath: Union[str, Path], content: Optional[bytes], want_digest: bool) -> FileResult:
+    return check_file(filepath, want_digest=want_digest, content=content)
+
+
+# ===== 增量缓存 =====
+
+def config_fingerprint() -> str:
+    """影响单文件检查结果的配置指纹；任一配置变化即令缓存失效。"""
+    payload = json.dumps([
+        CACHE_VERSION, MAX_FILE_LINES, MAX_FUNC_LINES, BANNED_SUFFIXES,
+        sorted(CODE_EXTENSIONS), sorted(TEXT_LIKE_EXTENSIONS),
+    ])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    单文件检查结果缓存（项目根目录 .ci_gate_cache.json）。
+
+    键为相对路径，(mtime_ns, size) 一致即复用；启用 use_hash 时，mtime 变化但内容哈希一致也复用
+    （如 git checkout 只改了 mtime）。全量扫描时缓存只保留本次扫描到的文件。
+    """
+
+    def __init__(self, path: Path, use_hash: bool = False, partial: bool = False) -> None:
+        self.path = path
+        self.use_hash = use_hash
+        self.partial = partial  # 只扫描了部分文件：保留未扫描文件的旧条目
+        self.entries = self._load()
+        self.fresh: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._now_ns = time.time_ns()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("config") != config_fingerprint():
+            return {}
+        return data.get("entries", {})
+
+    def lookup(self, rel: str, filepath: str, st: os.stat_result) -> Optional[FileResult]:
+        """命中返回缓存结果，未命中返回 None。"""
+        entry = self.entries.get(rel)
+        hit = entry is not None and entry["size"] == st.st_size and (
+            entry["mtime_ns"] == st.st_mtime_ns
+            or (self.use_hash and entry.get("digest") is not None
+                and analyze_file(Path(filepath), want_digest=True).digest == entry["digest"])
+        )
+        if not hit:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if entry["mtime_ns"] == st.st_mtime_ns:
+            self.fresh[rel] = entry
+        else:
+            self.store(rel, st, FileResult(errors=entry["errors"], digest=entry.get("digest")))
+        return FileResult(errors=entry["errors"], digest=entry.get("digest"), cached=True)
+
+    def store(self, rel: str, st: os.stat_result, result: FileResult) -> None:
+        """记录本次结果；mtime 过近的文件不缓存。"""
+        if self._now_ns - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        self._dirty = True
+        self.fresh[rel] = {
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "errors": result.errors,
+            "digest": result.digest,
+        }
+
+    def save(self) -> None:
+        """原子写入缓存文件（内容无变化时跳过；写入失败不影响门禁结果）。"""
+        if not self._dirty and (self.partial or len(self.fresh) == len(self.entries)):
+            return
+        entries = {**self.entries, **self.fresh} if self.partial else self.fresh
+        payload = {"version": CACHE_VERSION, "config": config_fingerprint(), "entries": entries}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+        except OSError:
+            pass
+
+
+def iter_cached_results(
+    files: List[str], root_len: int, jobs: int, cache: ResultCache
+) -> Iterator[Tuple[str, FileResult]]:
+    """先查缓存，只把未命中的文件送去检查；仍按 files 顺序产出结果。"""
+    plan = []
+    misses = []
+    for filepath in files:
+        rel = filepath[root_len:].replace(os.sep, "/")
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            st = None
+        result = cache.lookup(rel, filepath, st) if st is not None else None
+        plan.append((filepath, rel, st, result))
+        if result is None:
+            misses.append(filepath)
+
+    checked = iter_file_results(misses, jobs, want_digest=cache.use_hash)
+    for filepath, rel, st, result in plan:
+        if result is None:
+            _path, result = next(checked)
+            if st is not None:
+                cache.store(rel, st, result)
+        yield filepath, result
+    cache.save()
+
+
+def scan_project(
+    project_root: Path,
+    all_text_files: bool = False,
+    jobs: int = 1,
+    use_cache: bool = False,
+    cache_hash: bool = False,
+    files: Optional[List[str]] = None,
+    on_file: Optional[Callable[[str, FileResult], None]] = None,
+    contents: Optional[List[bytes]] = None,
+) -> Tuple[int, int, int, List[str]]:
+    """
+    扫描项目，返回 (总文件数, 通过数, 失败数, 项目级错误列表)；本身不输出任何内容。
+
+    files 为 None 时遍历整个项目；否则只对给定文件执行单文件检查（如 git 变更文件），
+    项目级检查照常执行一次。每个文件检查完成后立即以 (相对路径, 结果) 调用 on_file
+    （二进制文件 errors 为 None），由调用方决定输出格式。
+    contents 与 files 一一对应时检查这些内容（如暂存区 blob）而不读取工作区文件，也不使用缓存。
+    按文件路径加载本脚本并使用 jobs > 1 时，需先把模块登记到 sys.modules，子进程才能按模块名取到检查函数。
+    """
     total_files = 0
     pass_count = 0
     fail_count = 0
@@ -311,39 +667,54 @@ def scan_project(project_root: Path, all_text_files: bool = False) -> Tuple[int,
         all_errors.extend(structure_errors)
 
     # 文件级检查
-    has_oversize = False
-    for root, dirs, files in os.walk(project_root):
-        # 过滤忽略目录
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS and not d.startswith(".")]
-
-        for filename in files:
-            filepath = Path(root) / filename
-
-            if not should_check_file(filepath, all_text_files):
-                continue
-
-            total_files += 1
-            rel_path = filepath.relative_to(project_root)
-
-            file_errors = []
-            file_errors.extend(check_file_lines(filepath))
-            file_errors.extend(check_filename(filepath))
-            file_errors.extend(check_encoding(filepath))
-            if filepath.suffix.lower() == ".py":
-                file_errors.extend(check_function_lines(filepath))
-
-            if file_errors:
-                fail_count += 1
-                print(f"\n📄 {rel_path}")
-                for err in file_errors:
-                    print(err)
-                    if "文件超限" in err or "函数超限" in err:
-                        has_oversize = True
-            else:
-                pass_count += 1
+    partial_scan = files is not None
+    if files is None:
+        files = list(iter_candidate_paths(project_root, all_text_files))
+    root_len = len(os.path.join(str(project_root), ""))
+    if contents is not None:
+        results = iter_file_results(files, jobs, contents=contents)
+    elif use_cache:
+        cache = ResultCache(project_root / CACHE_FILENAME, use_hash=cache_hash, partial=partial_scan)
+        results = iter_cached_results(files, root_len, jobs, cache)
+    else:
+        results = iter_file_results(files, jobs)
+    for filepath, result in results:
+        if on_file is not None:
+            on_file(filepath[root_len:], result)
+        if result.errors is None:
+            continue  # 二进制文件
+        total_files += 1
+        if result.errors:
+            fail_count += 1
+        else:
+            pass_count += 1
+
+    return total_files, pass_count, fail_count, all_errors
+
+
+# ===== 输出 =====
+
+class TextReporter:
+    """人读输出：检查完即打印失败文件，结束时按需给出超限反作弊警告。"""
+
+    def __init__(self) -> None:
+        self.has_oversize = False
+
+    def error(self, message: str) -> None:
+        print(f"❌ {message}")
 
-    # 超限反作弊警告
-    if has_oversize:
+    def on_file(self, rel_path: str, result: FileResult) -> None:
+        if not result.errors:
+            return
+        print(f"\n📄 {rel_path}")
+        for err in result.errors:
+            print(err)
+            if "文件超限" in err or "函数超限" in err:
+                self.has_oversize = True
+
+    def finish(self) -> None:
+        if not self.has_oversize:
+            return
         print("\n" + "━" * 60)
         print("⛔ 反作弊警告：修复超限时只能通过合理拆分来解决！")
         print("   ❌ 严禁删除错误处理、重试、数据校验、日志等健壮性代码")
@@ -352,7 +723,87 @@ def scan_project(project_root: Path, all_text_files: bool = False) -> Tuple[int,
         print("   ✅ 正确做法：按职责拆分为多个模块/子函数")
         print("━" * 60)
 
-    return total_files, pass_count, fail_count, all_errors
+
+class JsonlReporter:
+    """
+    机器可读输出（--format jsonl）：每个文件检查完成即写出一行 file 记录，
+    结束时写出一行 summary 记录（总耗时、文件/秒、最慢文件与检查项）。
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, top: int = 10) -> None:
+        self.stream = stream or sys.stdout
+        self.top = top
+        self.started = time.perf_counter()
+        self.files = 0
+        self.bytes_read = 0
+        self.cache_hits = 0
+        self.check_totals: Dict[str, List[float]] = {}  # 检查项 → [累计秒数, 次数]
+        self._slowest: List[Tuple[float, str]] = []  # 小顶堆，只保留最慢的 top 个文件
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    def error(self, message: str) -> None:
+        self._write({"type": "error", "message": message})
+
+    def on_file(self, rel_path: str, result: FileResult) -> None:
+        timings = result.timings or {}
+        seconds = sum(timings.values())
+        rel_path = rel_path.replace(os.sep, "/")
+        self.files += 1
+        self.bytes_read += result.bytes_read
+        self.cache_hits += result.cached
+        for name, spent in timings.items():
+            total = self.check_totals.setdefault(name, [0.0, 0])
+            total[0] += spent
+            total[1] += 1
+        heapq.heappush(self._slowest, (seconds, rel_path))
+        if len(self._slowest) > self.top:
+            heapq.heappop(self._slowest)
+
+        if result.errors is None:
+            status = "binary"
+        else:
+            status = "fail" if result.errors else "pass"
+        self._write({
+            "type": "file",
+            "path": rel_path,
+            "status": status,
+            "errors": [err.strip() for err in result.errors or []],
+            "cached": result.cached,
+            "bytes_read": result.bytes_read,
+            "seconds": round(seconds, 6),
+            "checks": {name: round(spent, 6) for name, spent in timings.items()},
+        })
+
+    def summary(
+        self, total_files: int, pass_count: int, fail_count: int,
+        project_errors: List[str], exit_code: int,
+    ) -> None:
+        wall = time.perf_counter() - self.started
+        checks = sorted(self.check_totals.items(), key=lambda item: item[1][0], reverse=True)
+        self._write({
+            "type": "summary",
+            "exit_code": exit_code,
+            "scanned": total_files,
+            "passed": pass_count,
+            "failed": fail_count,
+            "project_errors": project_errors,
+            "records": self.files,
+            "cache_hits": self.cache_hits,
+            "bytes_read": self.bytes_read,
+            "wall_seconds": round(wall, 6),
+            "files_per_second": round(self.files / wall, 1) if wall > 0 else None,
+            "slowest_files": [
+                {"path": path, "seconds": round(seconds, 6)}
+                for seconds, path in sorted(self._slowest, reverse=True)
+            ],
+            "slowest_checks": [
+                {"check": name, "seconds": round(spent, 6), "calls": calls}
+                for name, (spent, calls) in checks
+            ],
+        })
 
 
 def main():
@@ -362,7 +813,7 @@ def main():
         epilog="""
 检查项：
   1. 单文件行数 ≤ 1000 行
-  2. 单函数行数 ≤ 200 行（仅 Python）
+  2. 单函数行数 ≤ 200 行（Python/JS/TS/Go/Rust/Java）
   3. 文件名禁止版本号后缀（_v2, _new, _old 等）
   4. 废弃代码检测（需人工判断）
   5. 注释语言检查（需人工判断）
@@ -374,6 +825,13 @@ def main():
 
 默认仅检查代码文件（.py/.js/.ts/...）。
 可加 --all-text-files 扩展到全部文本文件（.md/.json/.yaml/.toml/...）。
+大项目可加 --jobs N 用 N 个进程并行检查，输出与退出码与串行模式一致。
+单文件结果缓存在项目根目录 .ci_gate_cache.json（建议加入 .gitignore），
+未修改的文件直接复用上次结果；--no-cache 强制全量检查。
+pre-commit 可加 --staged（或 --changed-since origin/main）只检查 git 变更文件，
+项目级检查（.gitignore、根目录临时文件、目录结构）仍执行一次。
+--format jsonl 逐文件输出一行 JSON 记录（各检查项耗时、读取字节），最后一行为汇总记录，
+供看板追踪门禁耗时。
         """
     )
     parser.add_argument(
@@ -391,21 +849,87 @@ def main():
         action="store_true",
         help="检查全部文本文件（默认仅检查代码文件）"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="并行检查的进程数（默认 1 = 串行；0 = CPU 核数）"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="忽略并不写入结果缓存，强制全量检查"
+    )
+    parser.add_argument(
+        "--cache-hash",
+        action="store_true",
+        help="mtime 变化时再比对内容哈希，内容未变仍复用缓存"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "jsonl"],
+        default="text",
+        help="输出格式：text（默认，人读）或 jsonl（每文件一行记录 + 汇总记录，含耗时与读取量）"
+    )
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="只检查相对 git REF 有变更的文件（含未跟踪文件），项目级检查照常执行"
+    )
+    scope.add_argument(
+        "--staged",
+        action="store_true",
+        help="只检查 git 暂存区中的变更文件，读取暂存区内容而非工作区文件（pre-commit 场景）"
+    )
 
     args = parser.parse_args()
     project_root = Path(args.project_dir).resolve()
+    text = args.format == "text"
+    reporter = TextReporter() if text else JsonlReporter()
 
     if not project_root.exists():
-        print(f"❌ 目录不存在：{project_root}")
+        reporter.error(f"目录不存在：{project_root}")
         sys.exit(1)
 
-    print(f"🔍 CI 门禁检查：{project_root}")
-    print("=" * 60)
-    print(f"📌 检查范围：{'全部文本文件' if args.all_text_files else '代码文件（默认）'}")
-
+    if text:
+        print(f"🔍 CI 门禁检查：{project_root}")
+        print("=" * 60)
+        print(f"📌 检查范围：{'全部文本文件' if args.all_text_files else '代码文件（默认）'}")
+
+    files = None
+    contents = None
+    if args.staged or args.changed_since:
+        try:
+            files = git_changed_paths(
+                project_root, args.all_text_files, changed_since=args.changed_since, staged=args.staged
+            )
+            if args.staged:
+                # 检查将要提交的暂存区内容，而不是可能已再次修改的工作区文件
+                contents = staged_contents(project_root, files)
+        except RuntimeError as e:
+            reporter.error(str(e))
+            sys.exit(1)
+        if text:
+            scope_label = "git 暂存区" if args.staged else f"相对 {args.changed_since} 的变更"
+            print(f"📌 变更范围：{scope_label}（{len(files)} 个文件）")
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     total_files, pass_count, fail_count, project_errors = scan_project(
-        project_root, all_text_files=args.all_text_files
+        project_root,
+        all_text_files=args.all_text_files,
+        jobs=jobs,
+        use_cache=not args.no_cache,
+        cache_hash=args.cache_hash,
+        files=files,
+        on_file=reporter.on_file,
+        contents=contents,
     )
+    exit_code = 1 if fail_count > 0 else 0
+    if not text:
+        reporter.summary(total_files, pass_count, fail_count, project_errors, exit_code)
+        sys.exit(exit_code)
+    reporter.finish()
 
     # 项目级错误
     if project_errors:
@@ -425,12 +949,11 @@ def main():
     print(f"   4. 废弃代码：同功能是否只保留一份？")
     print(f"   5. 注释语言：是否使用中文、无人称？")
 
-    if fail_count > 0:
+    if exit_code:
         print(f"\n❌ 门禁未通过 — 请修复上述问题后重新运行")
-        sys.exit(1)
     else:
         print(f"\n✅ 自动检查项全部通过")
-        sys.exit(0)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+函数行范围分析（供 ci_gate 检查项 2 使用）
+
+- Python：ast 解析，按 lineno/end_lineno 得出精确范围；语法错误时回退到缩进启发式。
+  给定 min_length 时先做词法扫描找出跨行结构，按偏移求出每个函数的长度上界，只把上界超限的函数片段交给 ast
+- JS/TS/Go/Rust/Java：屏蔽字符串与注释后做花括号匹配，按函数头识别函数体
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+
+@dataclass
+class FunctionSpan:
+    """单个函数的行范围（1 起始，首尾行均包含）。"""
+    name: str
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+ANONYMOUS = "<anonymous>"
+# 含子语句的字段：body/orelse/finalbody，try 的 handlers，match 的 cases
+_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+# ===== Python =====
+
+def python_spans(text: str, min_length: int = 0) -> List[FunctionSpan]:
+    """ast 精确范围：def 行到函数体最后一行（含嵌套函数与方法）；只返回长度 > min_length 的函数。"""
+    if min_length > 0:
+        spans = _python_spans_prefiltered(text, min_length)
+        if spans is not None:
+            return spans
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError):
+        spans = python_spans_heuristic(text.splitlines())
+        return [span for span in spans if span.length > min_length]
+    spans = _collect_spans(tree, min_length, 0)
+    spans.sort(key=lambda span: span.start)
+    return spans
+
+
+def _collect_spans(tree: ast.AST, min_length: int, offset: int) -> List[FunctionSpan]:
+    spans = []
+    # 函数定义只可能出现在语句体中：只沿语句体下探，且跳过不足 min_length 行的语句
+    # （内层函数不会比外层语句更长）
+    stack: List[ast.AST] = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            end = node.end_lineno or node.lineno
+            spans.append(FunctionSpan(node.name, node.lineno + offset, end + offset))
+        for field in _BODY_FIELDS:
+            for child in getattr(node, field, ()):
+                end = getattr(child, "end_lineno", None)
+                if end is None or end - child.lineno + 1 > min_length:
+                    stack.append(child)
+    return spans
+
+
+def _quoted(q: str) -> str:
+    """q 引号的三引号串与单行串；前缀（r/b/f）不影响结尾判断，反斜杠转义（含续行）按两个字符跳过。"""
+    triple = q * 3 + "[^" + q + r"\\]*(?:(?:\\.|" + q + "(?!" + q * 2 + "))[^" + q + r"\\]*)*" + q * 3
+    single = q + "[^" + q + r"\\\n]*(?:\\.[^" + q + r"\\\n]*)*" + q
+    return triple + "|" + single
+
+
+def _line_quoted(q: str) -> str:
+    """不跨行的 q 引号单行串（不匹配三引号开头）。"""
+    return q + "(?!" + q * 2 + ")[^" + q + r"\\\n]*(?:\\[^\n][^" + q + r"\\\n]*)*" + q
+
+
+# 逻辑行扫描只关心跨行的结构：字符串、括号与续行。不跨行的结构（注释、单行串、内含普通字符与单行串的括号对）
+# 在正则内与普通字符一起吞掉，不逐个回到 Python（否则每个 token 一次循环，慢一倍）；各分支以不同的特殊字符开头，
+# 展开写法下没有歧义，不会回溯爆炸。未闭合的引号、不在行尾的反斜杠匹配为 bad，出现即放弃预筛；\Z 保证总能匹配
+_PLAIN = r"""[^#"'()\[\]{}\\\n]*"""
+_LINE_STRING = "(?:" + _line_quoted('"') + "|" + _line_quoted("'") + ")"
+_FLAT = "|".join(
+    opener + _PLAIN + "(?:" + _LINE_STRING + _PLAIN + ")*" + closer
+    for opener, closer in ((r"\(", r"\)"), (r"\[", r"\]"), (r"\{", r"\}"))
+)
+_SKIP = r"""[^#"'()\[\]{}\\]*"""
+_PY_TOKENS = re.compile(
+    _SKIP + "(?:(?:" + _FLAT + "|#[^\\n]*|" + _LINE_STRING + ")" + _SKIP + ")*(?:"
+    "(?P<str>" + _quoted('"') + "|" + _quoted("'") + ")"
+    r"|(?P<open>[(\[{])|(?P<close>[)\]}])|(?P<cont>\\\n)|(?P<bad>[" + "\"'\\\\" + r"])|(?P<end>\Z))",
+    re.S,
+)
+# 缩进只用空格时按偏移定位 def 行与函数上界：以字面量开头的正则走 re 的快速查找，`^` + re.M 则逐位置尝试，
+# 慢一个数量级。def 行先找 "def" 再核对行首；上界为缩进不超过 def 的非空、非注释行，连同前一个换行一起匹配
+_PY_DEF = re.compile(r"def[ \t]")
+_PY_DEF_PREFIX = re.compile(r"( *)(?:async[ \t]+)?")
+_PY_TAB_INDENT = re.compile(r"^ *\t", re.M)
+_DEDENT_CACHE: Dict[int, Pattern[str]] = {}
+
+
+def _dedent_pattern(indent: int) -> Pattern[str]:
+    pattern = _DEDENT_CACHE.get(indent)
+    if pattern is None:
+        pattern = _DEDENT_CACHE[indent] = re.compile(r"\n {0,%d}[^ \n#]" % indent)
+    return pattern
+
+
+def _python_spans_prefiltered(text: str, min_length: int) -> Optional[List[FunctionSpan]]:
+    """
+    只对长度上界超过 min_length 的函数做 ast 解析：def 行到下一个同级或更外层逻辑行之前即其上界。
+    逻辑行由词法扫描得出，括号内、字符串中缩进更浅的行不会被当成函数结束；def 行与上界都用正则
+    按偏移定位，不逐行处理。扫描不可靠（引号未闭合、括号不平衡、\r / \f / 制表符缩进）或片段解析
+    失败时返回 None，由调用方解析全文。
+    """
+    if "\r" in text or "\f" in text or ("\t" in text and _PY_TAB_INDENT.search(text)):
+        return None
+    joined = _joined_ranges(text)
+    if joined is None:
+        return None
+    joined_starts = [start for start, _ in joined]
+
+    def continued(pos: int) -> bool:
+        """pos 处开始的物理行是否属于上一逻辑行（在跨行的括号、字符串或续行之中）。"""
+        index = bisect_right(joined_starts, pos - 1) - 1
+        return index >= 0 and joined[index][1] >= pos
+
+    # (起始偏移, 上界偏移, 起始行, 缩进)：上界偏移为结束函数的逻辑行行首，到文件末尾时为 len(text)
+    candidates: List[Tuple[int, int, int, int]] = []
+    line, counted, covered = 0, 0, 0
+    for match in _PY_DEF.finditer(text):
+        if match.start() < covered:
+            continue  # 在上一个函数的范围内：嵌套函数不会比外层更长，超限时也已在外层片段中解析
+        start = text.rfind("\n", 0, match.start()) + 1
+        head = _PY_DEF_PREFIX.match(text, start, match.start())
+        if head.end() != match.start() or continued(start):
+            continue
+        line += text.count("\n", counted, start)
+        counted = start
+        indent = len(head.group(1))
+        pattern = _dedent_pattern(indent)
+        pos = text.find("\n", match.end())
+        bound = len(text)
+        while pos >= 0:
+            found = pattern.search(text, pos)
+            if found is None:
+                break
+            if not continued(found.start() + 1):
+                bound = found.start() + 1
+                break
+            pos = found.end()
+        covered = bound
+        if text.count("\n", start, bound) + (bound == len(text)) > min_length:
+            candidates.append((start, bound, line, indent))
+
+    spans: List[FunctionSpan] = []
+    for start, bound, line, indent in candidates:
+        # 缩进的 def 包进一个顶层 if 块，片段即可单独解析
+        prefix = "if 1:\n" if indent else ""
+        try:
+            tree = ast.parse(prefix + text[start:bound])
+        except (SyntaxError, ValueError, RecursionError):
+            return None
+        spans.extend(_collect_spans(tree, min_length, line - (1 if prefix else 0)))
+    spans.sort(key=lambda span: span.start)
+    return spans
+
+
+def _joined_ranges(text: str) -> Optional[List[Tuple[int, int]]]:
+    """跨行的括号、字符串与续行：按偏移排序的 (起始, 结束)，其间开始的物理行都不是逻辑行起点；词法状态不一致时返回 None。"""
+    joined: List[Tuple[int, int]] = []
+    depth = 0
+    opened = 0
+    for match in _PY_TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind == "end":
+            break
+        if kind == "open":
+            if depth == 0:
+                opened = match.start(kind)
+            depth += 1
+        elif kind == "close":
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and text.find("\n", opened, match.end()) >= 0:
+                joined.append((opened, match.end()))
+        elif kind == "bad":
+            return None
+        elif depth == 0 and (kind == "cont" or "\n" in match.group(kind)):
+            joined.append((match.start(kind), match.end()))
+    if depth != 0:
+        return None
+    return joined
+
+
+def python_spans_heuristic(lines: List[str]) -> List[FunctionSpan]:
+    """旧版缩进启发式：遇到同级或更外层的非注释行即视为函数结束（范围含尾随空行）。"""
+    spans = []
+    func_name = None
+    func_start = 0
+    func_indent = 0
+
+    for i, line in enumerate(lines):
+        stripped = line.rstrip()
+        if not stripped:
+            continue
+
+        lstripped = stripped.lstrip()
+        indent = len(stripped) - len(lstripped)
+
+        if lstripped.startswith("def ") or lstripped.startswith("async def "):
+            # 如果已有函数在追踪中，先结束它（嵌套 def 也会结束外层函数）
+            if func_name is not None:
+                spans.append(FunctionSpan(func_name, func_start + 1, i))
+            name_part = lstripped.split("(")[0]
+            func_name = name_part.replace("def ", "").replace("async ", "").strip()
+            func_start = i
+            func_indent = indent
+
+        elif func_name is not None and indent <= func_indent and not lstripped.startswith("#"):
+            if not lstripped.startswith("@"):  # 装饰器不算结束
+                spans.append(FunctionSpan(func_name, func_start + 1, i))
+                func_name = None
+
+    if func_name is not None:
+        spans.append(FunctionSpan(func_name, func_start + 1, len(lines)))
+    return spans
+
+
+# ===== 花括号语言 =====
+
+_COMMENTS = r"//[^\n]*|/\*.*?\*/"
+_DQ_STRING = r'"(?:\\.|[^"\\\n])*"'
+_SQ_STRING = r"'(?:\\.|[^'\\\n])*'"
+# JS 正则字面量：仅在运算符/分隔符之后出现的 /.../ 视为正则，避免与除号混淆
+_JS_REGEX = r"(?<=[=(,:!&|?{};\[])[ \t]*/(?![/*])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*"
+
+# 需要屏蔽的字符串、注释 token（按语言）
+_MASK_PATTERNS: Dict[str, Pattern[str]] = {
+    "js": re.compile(
+        "|".join([_COMMENTS, _DQ_STRING, _SQ_STRING, r"`(?:\\.|[^`\\])*`", _JS_REGEX]), re.S
+    ),
+    "go": re.compile("|".join([_COMMENTS, _DQ_STRING, _SQ_STRING, r"`[^`]*`"]), re.S),
+    "rust": re.compile(
+        "|".join([
+            _COMMENTS,
+            r'b?r(#*)".*?"\1',
+            r'b?"(?:\\.|[^"\\])*"',
+            # 字符字面量；生命周期 'a 没有闭合引号，不会被匹配
+            r"b?'(?:\\(?:x[0-9a-fA-F]{2}|u\{[0-9a-fA-F]*\}|.)|[^\\'\n])'",
+        ]),
+        re.S,
+    ),
+    "java": re.compile("|".join([_COMMENTS, r'""".*?"""', _DQ_STRING, _SQ_STRING]), re.S),
+}
+
+_STRUCTURE = re.compile(r"[{};]")
+_IDENT = r"[A-Za-z_$][\w$]*"
+_JS_FUNCTION = re.compile(rf"\bfunction\b\s*\*?\s*({_IDENT})?\s*(?:<[^()]*>\s*)?\(")
+_JS_ARROW_NAME = re.compile(
+    rf"({_IDENT})\s*[=:]\s*(?:async\s*)?(?:\([^()]*\)|{_IDENT})\s*(?::[^=]*)?=>\s*$", re.S
+)
+_ASSIGNED_NAME = re.compile(rf"({_IDENT})\s*[=:]\s*(?:async\s+)?function\b")
+_GO_FUNC = re.compile(r"\bfunc\s*(?:\([^()]*\)\s*)?([A-Za-z_]\w*)?\s*(?:\[[^\]]*\]\s*)?\(")
+_RUST_FN = re.compile(r"\bfn\s+([A-Za-z_]\w*)")
+_CALL_TAIL = re.compile(r"\)\s*(?:throws\s+[\w.,\s<>]+|:\s*[^(){}=;]+)?$", re.S)
+_NAME_BEFORE_PAREN = re.compile(rf"({_IDENT})\s*(?:<[^()]*>)?\s*$")
+_WORD_BEFORE = re.compile(rf"({_IDENT})\s*$")
+# 形如 name(...) { 但不是函数的语句
+_NOT_METHODS = {
+    "if", "for", "while", "switch", "catch", "with", "synchronized", "try",
+    "return", "function", "super", "this",
+}
+_NOT_METHOD_PREFIX = {"new", "record"}
+
+
+def mask_code(text: str, lang: str) -> str:
+    """把字符串与注释替换为等长空白（保留换行），其余字符位置不变。"""
+    def blank(m: "re.Match[str]") -> str:
+        token = m.group(0)
+        return " " * len(token) if "\n" not in token else re.sub(r"[^\n]", " ", token)
+
+    return _MASK_PATTERNS[lang].sub(blank, text)
+
+
+def _last_match(pattern: Pattern[str], header: str) -> Optional["re.Match[str]"]:
+    last = None
+    for last in pattern.finditer(header):
+        pass
+    return last
+
+
+def _method_name(header: str) -> Optional[Tuple[str, int]]:
+    """`name(...) {` / `name(...): T {` / `name(...) throws E {` 形式的方法名及其偏移。"""
+    tail = _CALL_TAIL.search(header)
+    if tail is None:
+        return None
+    depth = 0
+    for i in range(tail.start(), -1, -1):
+        ch = header[i]
+        if ch == ")":
+            depth += 1
+        elif ch == "(":
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        return None
+    m = _NAME_BEFORE_PAREN.search(header, 0, i)
+    if m is None or m.group(1) in _NOT_METHODS:
+        return None
+    prefix = _WORD_BEFORE.search(header, 0, m.start())
+    if prefix is not None and prefix.group(1) in _NOT_METHOD_PREFIX:
+        return None
+    return m.group(1), m.start(1)
+
+
+def _js_function(header: str) -> Optional[Tuple[str, int]]:
+    stripped = header.rstrip()
+    if stripped.endswith("=>"):
+        m = _JS_ARROW_NAME.search(stripped)
+        return (m.group(1), m.start(1)) if m else (ANONYMOUS, len(stripped) - 2)
+    m = _last_match(_JS_FUNCTION, header)
+    if m is not None:
+        if m.group(1):
+            return m.group(1), m.start(1)
+        assigned = _ASSIGNED_NAME.search(header, 0, m.end())
+        return (assigned.group(1), assigned.start(1)) if assigned else (ANONYMOUS, m.start())
+    return _method_name(header)
+
+
+def _go_statement_start(header: str) -> int:
+    """Go 无分号：括号外的换行即语句结束，只保留最后一条语句。"""
+    depth = 0
+    start = 0
+    for i, ch in enumerate(header):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth = max(0, depth - 1)
+        elif ch == "\n" and depth == 0 and header[start:i].strip():
+            start = i + 1
+    return start
+
+
+def _go_function(header: str) -> Optional[Tuple[str, int]]:
+    start = _go_statement_start(header)
+    m = _last_match(_GO_FUNC, header[start:])
+    if m is not None:
+        m_start = start + m.start()
+        name_start = start + m.start(1) if m.group(1) else m_start
+        return (m.group(1) or ANONYMOUS), name_start
+    return None
+
+
+def _rust_function(header: str) -> Optional[Tuple[str, int]]:
+    m = _last_match(_RUST_FN, header)
+    return (m.group(1), m.start(1)) if m else None
+
+
+def _java_function(header: str) -> Optional[Tuple[str, int]]:
+    stripped = header.rstrip()
+    if stripped.endswith("->"):
+        return ANONYMOUS, len(stripped) - 2
+    return _method_name(header)
+
+
+_HEADER_MATCHERS: Dict[str, Callable[[str], Optional[Tuple[str, int]]]] = {
+    "js": _js_function,
+    "go": _go_function,
+    "rust": _rust_function,
+    "java": _java_function,
+}
+
+
+def brace_spans(text: str, lang: str) -> List[FunctionSpan]:
+    """
+    花括号匹配：每个 `{` 之前、上一个 `{`/`}`/`;` 之后的文本为语句头，
+    语句头符合函数签名则该 `{` 开启函数体，与之匹配的 `}` 即函数结束。
+    """
+    masked = mask_code(text, lang)
+    matcher = _HEADER_MATCHERS[lang]
+    line_starts = [0]
+    line_starts.extend(m.end() for m in re.finditer("\n", masked))
+
+    def line_of(pos: int) -> int:
+        return bisect_right(line_starts, pos)
+
+    spans = []
+    stack: List[Optional[Tuple[str, int]]] = []
+    header_start = 0
+    for m in _STRUCTURE.finditer(masked):
+        token = m.group(0)
+        pos = m.start()
+        if token == "{":
+            found = matcher(masked[header_start:pos])
+            if found is not None:
+                name, offset = found
+                stack.append((name, line_of(header_start + offset)))
+            else:
+                stack.append(None)
+        elif token == "}" and stack:
+            opened = stack.pop()
+            if opened is not None:
+                spans.append(FunctionSpan(opened[0], opened[1], line_of(pos)))
+        header_start = m.end()
+
+    spans.sort(key=lambda span: span.start)
+    return spans
+
+
+# ===== 入口 =====
+
+BRACE_LANGUAGES = {
+    ".js": "js", ".jsx": "js", ".ts": "js", ".tsx": "js",
+    ".go": "go", ".rs": "rust", ".java": "java",
+}
+SUPPORTED_SUFFIXES = {".py", *BRACE_LANGUAGES}
+
+
+def function_spans(text: str, suffix: str, min_length: int = 0) -> List[FunctionSpan]:
+    """按后缀选择分析器，返回长度 > min_length 的函数；不支持的后缀返回空列表。"""
+    if suffix == ".py":
+        return python_spans(text, min_length)
+    lang = BRACE_LANGUAGES.get(suffix)
+    if lang is None:
+        return []
+    return [span for span in brace_spans(text, lang) if span.length > min_length]
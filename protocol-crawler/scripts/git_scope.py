@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+git 调用（供 ci_gate 的 --staged / --changed-since 使用）
+
+- git_lines：执行 git 命令，按 NUL 切分输出（配合 -z 取路径列表）
+- staged_contents：一次 git cat-file --batch 读出暂存区中的文件内容
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+
+def _run_git(project_root: Path, args: List[str], stdin: Optional[bytes] = None) -> bytes:
+    """在项目目录执行 git 命令，返回标准输出；无法执行或返回非 0 时抛出 RuntimeError。"""
+    try:
+        proc = subprocess.run(
+            ["git", "-C", str(project_root), *args],
+            input=stdin, capture_output=True, check=False,
+        )
+    except OSError as e:
+        raise RuntimeError(f"无法执行 git：{e}") from e
+    if proc.returncode != 0:
+        message = proc.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"git {args[0]} 失败：{message}")
+    return proc.stdout
+
+
+def git_lines(project_root: Path, *args: str) -> List[str]:
+    """在项目目录执行 git 命令，返回以 NUL 分隔的输出项。"""
+    out = _run_git(project_root, list(args))
+    return [item for item in out.decode("utf-8", errors="surrogateescape").split("\0") if item]
+
+
+def staged_contents(project_root: Path, files: List[str]) -> List[bytes]:
+    """
+    读出 files（project_root 下的绝对路径）在暂存区中的内容，与 files 一一对应。
+
+    pre-commit 检查的是将要提交的内容：暂存后工作区又有修改时，读工作区文件会放过超限的暂存版本。
+    """
+    root_len = len(os.path.join(str(project_root), ""))
+    rels = [path[root_len:].replace(os.sep, "/") for path in files]
+    # ":./路径" 按 -C 指定的目录解析为暂存区中的条目
+    specs = "".join(f":./{rel}\n" for rel in rels).encode("utf-8", errors="surrogateescape")
+    out = _run_git(project_root, ["cat-file", "--batch"], stdin=specs)
+
+    contents = []
+    pos = 0
+    for rel in rels:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        if len(header) != 3 or header[1] != b"blob":
+            raise RuntimeError(f"暂存区中没有该文件：{rel}")
+        size = int(header[2])
+        contents.append(out[end + 1:end + 1 + size])
+        pos = end + 1 + size + 1  # 内容之后还有一个换行
+    return contents
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+对齐锁监听（alignment_lock.py watch 的实现）
+
+- 监听 PRD/STATE：Linux 上用 inotify（ctypes 调用 libc，无第三方依赖），
+  其他平台、inotify 不可用或被监听目录被删除时回退为定时 stat 轮询
+- 只对发生变化的文件重新验证；锁过期按已解析的锁日期重新判定，不重读文件
+- 当前状态原子写入小 JSON 文件，查询只需读取该文件，无需启动 Python、重新哈希
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from alignment_lock import AlignmentLock, atomic_write_text, evaluate_lock, inspect_file
+
+STATUS_VERSION = 1
+STATUS_FILE_NAME = ".alignment_status.json"
+# 写入方往往连续产生多个事件（截断、追加、关闭）：静默 SETTLE 秒后再验证，最多推迟 MAX_SETTLE 秒
+SETTLE_SECONDS = 0.1
+MAX_SETTLE_SECONDS = 1.0
+# 无变更时定期重写状态文件：刷新心跳，并按日期重新判定锁是否过期
+HEARTBEAT_SECONDS = 60.0
+
+# inotify 事件位（<sys/inotify.h>）
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+    | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def default_status_path(root: Path) -> Path:
+    return root / "docs" / STATUS_FILE_NAME
+
+
+# ============ 变更监听 ============
+
+class InotifyWatcher:
+    """监听目标文件所在目录（原子替换会更换 inode，只监听文件本身会丢失后续事件）。"""
+
+    backend = "inotify"
+
+    def __init__(self, paths: List[Path]) -> None:
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True) if libc_name else None
+        if libc is None or not hasattr(libc, "inotify_init1"):
+            raise OSError("当前平台不支持 inotify")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        self.paths = list(paths)
+        self.targets: Dict[int, Dict[str, Path]] = {}
+        try:
+            for path in self.paths:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(path.parent), _WATCH_MASK)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"无法监听目录 {path.parent}：{os.strerror(errno)}")
+                self.targets.setdefault(wd, {})[path.name] = path
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def wait(self, timeout: float) -> Optional[Set[Path]]:
+        """等待至多 timeout 秒，返回发生变化的目标文件；被监听的目录失效时返回 None。"""
+        ready, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        changed: Set[Path] = set()
+        while ready:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = os.fsdecode(data[start:start + length].rstrip(b"\0"))
+                offset = start + length
+                if mask & _IN_Q_OVERFLOW:
+                    changed.update(self.paths)
+                elif mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                    return None
+                else:
+                    # 同目录下的状态文件、.lock、临时文件不在目标内，直接忽略
+                    path = self.targets.get(wd, {}).get(name)
+                    if path is not None:
+                        changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size
+
+
+class PollWatcher:
+    """定时 stat 轮询：(inode, mtime, ctime, size) 任一变化即视为变更。"""
+
+    backend = "poll"
+
+    def __init__(self, paths: List[Path], interval: float) -> None:
+        self.paths = list(paths)
+        self.interval = interval
+        self.signatures = {path: _signature(path) for path in self.paths}
+
+    def wait(self, timeout: float) -> Optional[Set[Path]]:
+        time.sleep(max(0.0, min(self.interval, timeout)))
+        changed = set()
+        for path in self.paths:
+            signature = _signature(path)
+            if signature != self.signatures[path]:
+                self.signatures[path] = signature
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+Watcher = Union[InotifyWatcher, PollWatcher]
+
+
+def open_watcher(paths: List[Path], backend: str, interval: float) -> Watcher:
+    """backend 为 auto 时优先 inotify，不可用则回退轮询；显式指定 inotify 时不可用直接报错。"""
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(paths)
+        except OSError:
+            if backend == "inotify":
+                raise
+    return PollWatcher(paths, interval)
+
+
+# ============ 状态维护与发布 ============
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class LockStatus:
+    """各目标文件最近一次读取的锁状态与内容哈希；发布时再按当前日期判定有效性。"""
+
+    def __init__(self, paths: List[Path], max_age_days: int) -> None:
+        self.paths = list(paths)
+        self.max_age_days = max_age_days
+        self.states: Dict[Path, Dict[str, Any]] = {}
+
+    def refresh(self, path: Path) -> None:
+        """重新读取并哈希单个文件（流式，内存占用与文件大小无关）。"""
+        entry: Dict[str, Any] = {"checked_at": _now()}
+        try:
+            state = inspect_file(path)
+        except (OSError, UnicodeDecodeError) as e:
+            entry["error"] = f"无法读取：{e}"
+        else:
+            if state is not None:
+                entry["lock"], entry["hash"] = state[0], state[1]
+        self.states[path] = entry
+
+    def record(self, path: Path) -> Dict[str, Any]:
+        entry = self.states[path]
+        record: Dict[str, Any] = {"path": str(path)}
+        lock: Optional[AlignmentLock] = entry.get("lock")
+        if "error" in entry:
+            record.update(valid=False, message=entry["error"])
+        elif lock is None:
+            record.update(valid=False, message="文件不存在")
+        else:
+            is_valid, message = evaluate_lock(lock, entry["hash"], self.max_age_days)
+            record.update(
+                valid=is_valid,
+                message=message,
+                locked=lock.is_locked,
+                done_at=lock.done_at,
+                lock_hash=lock.content_hash,
+                current_hash=entry["hash"],
+            )
+        record["checked_at"] = entry["checked_at"]
+        return record
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [self.record(path) for path in self.paths]
+
+
+class StatusPublisher:
+    """把状态原子写入 JSON 文件；内容未变化时只在心跳到期后重写。"""
+
+    def __init__(self, status_path: Path, root: Path, backend: str) -> None:
+        self.status_path = status_path
+        self.header = {
+            "version": STATUS_VERSION,
+            "root": str(root),
+            "pid": os.getpid(),
+            "backend": backend,
+            "started_at": _now(),
+        }
+        self.last_files: Optional[List[Dict[str, Any]]] = None
+        self.last_written = 0.0
+
+    def publish(self, files: List[Dict[str, Any]], running: bool = True) -> bool:
+        """写入状态文件，返回是否实际写入。"""
+        now = time.monotonic()
+        if running and files == self.last_files and now - self.last_written < HEARTBEAT_SECONDS:
+            return False
+        payload = dict(self.header)
+        payload.update(
+            running=running,
+            updated_at=_now(),
+            valid=all(record["valid"] for record in files),
+            files=files,
+        )
+        atomic_write_text(self.status_path, json.dumps(payload, ensure_ascii=False, indent=2) + "\n")
+        self.last_files = files
+        self.last_written = now
+        return True
+
+
+# ============ 主循环 ============
+
+def run_watch(
+    root: Path,
+    paths: List[Path],
+    status_path: Path,
+    max_age_days: int = 30,
+    backend: str = "auto",
+    interval: float = 1.0,
+    duration: float = 0.0,
+    log: Callable[[str], None] = print,
+) -> int:
+    """监听直到收到 SIGINT/SIGTERM（或运行满 duration 秒），退出前把状态标记为 running: false。"""
+    try:
+        watcher = open_watcher(paths, backend, interval)
+    except OSError as e:
+        log(f"❌ 无法启用 inotify：{e}")
+        return 1
+
+    status = LockStatus(paths, max_age_days)
+    for path in paths:
+        status.refresh(path)
+    publisher = StatusPublisher(status_path, root, watcher.backend)
+    publisher.publish(status.records())
+    log(f"👀 监听 {len(paths)} 个文件（{watcher.backend}），状态文件：{status_path}")
+
+    previous = signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+    deadline = time.monotonic() + duration if duration > 0 else None
+    pending: Set[Path] = set()
+    pending_since = 0.0
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            timeout = SETTLE_SECONDS if pending else HEARTBEAT_SECONDS
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+            changed = watcher.wait(timeout)
+            if changed is None:
+                log("⚠️ 被监听的目录已失效，改用轮询")
+                watcher.close()
+                watcher = PollWatcher(paths, interval)
+                publisher.header["backend"] = watcher.backend
+                changed = set(paths)
+            if changed:
+                if not pending:
+                    pending_since = time.monotonic()
+                pending |= changed
+                if time.monotonic() - pending_since < MAX_SETTLE_SECONDS:
+                    continue
+
+            for path in sorted(pending):
+                status.refresh(path)
+                record = status.record(path)
+                log(f"{'✅' if record['valid'] else '❌'} {path}: {record['message']}")
+            pending.clear()
+            publisher.publish(status.records())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        watcher.close()
+        publisher.publish(status.records(), running=False)
+    return 0